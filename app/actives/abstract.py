@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from datetime import date
+from typing import List, Optional, Sequence, Tuple
 
-from console import console
+from console import logger
 from price_handler import abstract_handler, tester_handler
 
 
@@ -28,9 +29,47 @@ class Active(ABC):
            Price of the active at the given observation time.
 
         Notes:
-            Maybe should periodically update the price of the active.
-            so when asked, it is already cached. Insted of getting
-            the value on demand.
+            To have the price already cached when asked, register the
+            portafolios holding the active in a `prefetch.PricePrefetcher`,
+            that refreshes their prices every day after the market close.
+        """
+        pass
+
+    @abstractmethod
+    def price_series(
+        self,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        **kwargs,
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Returns the prices of the active for a window or a list of dates.
+
+        All the prices come from a single fetch to the price handler.
+
+        Args:
+           from_date: Start date of the window (inclusive).
+           to_date: End date of the window (inclusive).
+           dates: Observation dates to consult price of. If given, the
+              window is ignored.
+
+        Returns:
+           Tuple of (dates, prices).
+        """
+        pass
+
+    @abstractmethod
+    def price_arrays(
+        self, from_date: date, to_date: date, **kwargs
+    ) -> Tuple[Sequence[int], Sequence[float]]:
+        """Returns the prices of the active for a window as flat arrays.
+
+        Args:
+           from_date: Start date of the window (inclusive).
+           to_date: End date of the window (inclusive).
+
+        Returns:
+           Tuple of (date ordinals, prices). Missing prices are NaN.
         """
         pass
 
@@ -57,27 +96,30 @@ class Active(ABC):
                        }
 
         """
-        console.log(
-            f"Getting differences for active {self.name}"
-            f" between {from_date} and {to_date}"
+        logger.debug(
+            "Getting differences for active %s between %s and %s",
+            self.name,
+            from_date,
+            to_date,
         )
 
         if from_date > to_date:
             raise ValueError("from_date must be < to_date")
 
-        _p_from = self.price(obs_date=from_date)
-        _p_to = self.price(obs_date=to_date)
+        _, (_p_from, _p_to) = self.price_series(dates=[from_date, to_date])
 
         if _p_from is None:
-            console.log(f"An error ocurred getting price from {from_date}")
+            logger.error("An error ocurred getting price from %s", from_date)
             return None
         if _p_to is None:
-            console.log(f"An error ocurred getting price from {to_date}")
+            logger.error("An error ocurred getting price from %s", to_date)
             return None
 
         delta = _p_to - _p_from
         delta_perc = delta / _p_from
-        console.log(f"price variaton: {_p_from} ({delta} [{round(delta_perc, 4)} %])")
+        logger.debug(
+            "price variaton: %s (%s [%s %%])", _p_from, delta, round(delta_perc, 4)
+        )
 
         return {
             "date_from": from_date,
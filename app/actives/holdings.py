@@ -0,0 +1,150 @@
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple, Type
+
+from actives.abstract import Active
+from actives.stock import Stock
+from price_handler import abstract_handler, tester_handler
+
+
+class _Table:
+    """Interned values, each one identified by its position (code)."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: list = []
+        self.codes: Dict[object, int] = {}
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if isinstance(value, str):
+                value = sys.intern(value)
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class Holdings:
+    """Compact positions of a portafolio, stored in typed arrays.
+
+    Each position takes a few bytes: its name and symbol are codes of a table
+    of interned strings, its active type and price handler are codes of small
+    tables, and its quantity is a float of an array. `Active` objects are only
+    built when a position is read (`holdings[i]`, iteration), so a portafolio
+    with 100k+ positions does not hold 100k+ objects.
+
+    It can be used in place of the list of actives of a `Portafolio`:
+        Portafolio(actives=Holdings(actives))
+
+    Args:
+        actives: Initial actives (1 unit of each).
+    """
+
+    __slots__ = (
+        "_strings",
+        "_types",
+        "_handlers",
+        "name_codes",
+        "symbol_codes",
+        "type_codes",
+        "handler_codes",
+        "quantities",
+    )
+
+    def __init__(self, actives: Iterable[Active] = ()):
+        self._strings = _Table()
+        self._types = _Table()
+        self._handlers = _Table()
+        self.name_codes = array("I")
+        self.symbol_codes = array("I")
+        self.type_codes = array("B")
+        self.handler_codes = array("H")
+        self.quantities = array("d")
+        for active in actives:
+            self.append(active)
+
+    def add(
+        self,
+        name: str,
+        symbol: str,
+        active_type: Type[Active] = Stock,
+        price_handler: abstract_handler.PriceHandler = tester_handler.TestPriceHandler,
+        quantity: float = 1.0,
+    ) -> None:
+        """Add a position without building its `Active` object.
+
+        Args:
+            name: Name of the active.
+            symbol: Symbol of the active.
+            active_type: Class of the active (e.g. `Stock`, `Crypto`).
+            price_handler: Price handler of the active.
+            quantity: Units held (can be fractional).
+        """
+        self.name_codes.append(self._strings.code(name))
+        self.symbol_codes.append(self._strings.code(symbol))
+        self.type_codes.append(self._types.code(active_type))
+        self.handler_codes.append(self._handlers.code(price_handler))
+        self.quantities.append(quantity)
+
+    def append(self, active: Active, quantity: float = 1.0) -> None:
+        """Add a position of `quantity` units of the active."""
+        self.add(
+            active.name, active.symbol, type(active), active.price_handler, quantity
+        )
+
+    def __len__(self) -> int:
+        return len(self.quantities)
+
+    def __getitem__(self, i: int) -> Active:
+        strings = self._strings.values
+        active_type = self._types.values[self.type_codes[i]]
+        return active_type(
+            name=strings[self.name_codes[i]],
+            symbol=strings[self.symbol_codes[i]],
+            price_handler=self._handlers.values[self.handler_codes[i]],
+        )
+
+    def __iter__(self) -> Iterator[Active]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def instruments(self) -> Tuple[List[Active], List[float]]:
+        """Distinct instruments (symbol, type and price handler) held.
+
+        Returns:
+            List with an active of each instrument and the total units held
+            of each one, in order of first appearance.
+        """
+        positions: Dict[Tuple[str, int, int], int] = {}
+        actives: List[Active] = []
+        quantities: List[float] = []
+        symbols = [symbol.upper() for symbol in self._strings.values]
+        keys = zip(
+            (symbols[code] for code in self.symbol_codes),
+            self.type_codes,
+            self.handler_codes,
+        )
+        for i, (key, quantity) in enumerate(zip(keys, self.quantities)):
+            j = positions.get(key)
+            if j is None:
+                positions[key] = len(actives)
+                actives.append(self[i])
+                quantities.append(quantity)
+            else:
+                quantities[j] += quantity
+        return actives, quantities
+
+    def nbytes(self) -> int:
+        """Bytes used by the arrays of the positions (without the tables)."""
+        return sum(
+            codes.itemsize * len(codes)
+            for codes in (
+                self.name_codes,
+                self.symbol_codes,
+                self.type_codes,
+                self.handler_codes,
+                self.quantities,
+            )
+        )
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from actives.abstract import Active
 from datetime import date
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 
 
 @dataclass
@@ -26,11 +26,53 @@ class Stock(Active):
         Returns:
            Price of the active at the given observation time.
         """
+        if obs_date is None:
+            obs_date = date.today()
+        _, _p = self.price_series(dates=[obs_date], **kwargs)
+        return _p[0]
 
-        _p = self.price_handler.get_active_price_by_date(
+    def price_series(
+        self,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        **kwargs,
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Returns the prices of the active for a window or a list of dates.
+
+        Args:
+           from_date: Start date of the window.
+           to_date: End date of the window.
+           dates: Observation dates to consult price of.
+
+        Returns:
+           Tuple of (dates, prices).
+        """
+        return self.price_handler.get_active_price_series(
+            symbol=self.symbol,
+            from_date=from_date,
+            to_date=to_date,
+            dates=dates,
+            active="stock",
+            **kwargs,
+        )
+
+    def price_arrays(
+        self, from_date: date, to_date: date, **kwargs
+    ) -> Tuple[Sequence[int], Sequence[float]]:
+        """Returns the prices of the active for a window as flat arrays.
+
+        Args:
+           from_date: Start date of the window.
+           to_date: End date of the window.
+
+        Returns:
+           Tuple of (date ordinals, prices).
+        """
+        return self.price_handler.get_active_price_arrays(
             symbol=self.symbol,
-            obs_date=obs_date,
+            from_date=from_date,
+            to_date=to_date,
             active="stock",
             **kwargs,
         )
-        return _p
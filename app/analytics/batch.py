@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Hashable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from actives.abstract import Active
+from analytics.engine import ASOF_LOOKBACK_DAYS, PriceMatrix
+from console import logger
+from portafolio import Portafolio
+from transactions import active_key
+
+Period = Tuple[date, date]
+
+
+@dataclass
+class BatchReturns:
+    """Returns of many portafolios, in the order they were given.
+
+    Args:
+        overall: Overall return of each portafolio (0.01 means 1%). NaN if
+            an active of the portafolio has no prices in its period.
+        annualized: Annualized return of each portafolio (same formula as
+            `Portafolio.profit`). NaN where `overall` is NaN.
+    """
+
+    overall: np.ndarray
+    annualized: np.ndarray
+
+
+def _periods(periods: Union[Period, Sequence[Period]], count: int) -> List[Period]:
+    """One (from_date, to_date) per portafolio (a single one is shared)."""
+    if len(periods) == 2 and all(isinstance(d, date) for d in periods):
+        periods = [periods] * count
+    periods = list(periods)
+    if len(periods) != count:
+        raise ValueError("Error: one period per portafolio is needed.")
+    for from_date, to_date in periods:
+        if not (isinstance(from_date, date) & isinstance(to_date, date)):
+            raise ValueError("Error: `from_date` and `to_date` must be date objects.")
+        if from_date > to_date:
+            raise ValueError("Error: `from_date` must be before `to_date`.")
+    return periods
+
+
+def batch_returns(
+    portafolios: Sequence[Portafolio],
+    periods: Union[Period, Sequence[Period]],
+    max_workers: int = 1,
+) -> BatchReturns:
+    """Overall and annualized returns of many portafolios at once.
+
+    The distinct instruments (same symbol, type and price handler) of all the
+    portafolios are gathered, and the price series of each one is fetched a
+    single time, for the window of all the periods. The values of every
+    portafolio are then computed as a product of its units held (weights
+    matrix, portafolios x instruments) with the prices of its dates.
+
+    Args:
+        portafolios: Portafolios to evaluate, with the units held of each
+            active as in `Portafolio.overall_return`.
+        periods: (from_date, to_date) of each portafolio, or a single one for
+            all of them.
+        max_workers: Number of threads used to fetch the price series.
+    Returns:
+        (BatchReturns): Returns in the same order of `portafolios`.
+    """
+    periods = _periods(periods, len(portafolios))
+    if not portafolios:
+        return BatchReturns(np.empty(0), np.empty(0))
+
+    columns: Dict[Hashable, int] = {}
+    instruments: List[Active] = []
+    weights = []
+    for portafolio in portafolios:
+        units: Dict[int, float] = {}
+        for active, quantity in zip(*portafolio.instruments()):
+            key = active_key(active)
+            if key not in columns:
+                columns[key] = len(instruments)
+                instruments.append(active)
+            units[columns[key]] = units.get(columns[key], 0.0) + quantity
+        weights.append(units)
+
+    logger.info(
+        "Evaluating %s portafolios with %s distinct actives",
+        len(portafolios),
+        len(instruments),
+    )
+    from_date = min(p[0] for p in periods) - timedelta(days=ASOF_LOOKBACK_DAYS)
+    to_date = max(p[1] for p in periods)
+
+    def fetch(active: Active):
+        return active.price_arrays(from_date=from_date, to_date=to_date)
+
+    if max_workers > 1 and len(instruments) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            series = list(executor.map(fetch, instruments))
+    else:
+        series = [fetch(active) for active in instruments]
+    matrix = PriceMatrix.from_series(series)
+
+    weights_matrix = np.zeros((len(portafolios), len(instruments)))
+    for i, units in enumerate(weights):
+        for j, quantity in units.items():
+            weights_matrix[i, j] = quantity
+
+    # rows of the prices of each period (as of the previous market day)
+    ordinals = matrix.ordinals
+    from_ordinals = np.array([p[0].toordinal() for p in periods], dtype=np.int64)
+    to_ordinals = np.array([p[1].toordinal() for p in periods], dtype=np.int64)
+    from_rows = np.searchsorted(ordinals, from_ordinals, side="right") - 1
+    to_rows = np.searchsorted(ordinals, to_ordinals, side="right") - 1
+
+    # a portafolio needs a price of each of its actives on (or before) its
+    # `from_date`, as `Portafolio.overall_return` does.
+    first_ordinals = np.full(len(instruments), np.inf)
+    for j, (_ordinals, _prices) in enumerate(series):
+        priced = ~np.isnan(np.asarray(_prices, dtype=np.float64))
+        if priced.any():
+            first_ordinals[j] = np.asarray(_ordinals)[np.argmax(priced)]
+    latest_first = np.where(weights_matrix != 0, first_ordinals[None, :], -np.inf).max(
+        axis=1
+    )
+    valid = (from_rows >= 0) & (latest_first <= from_ordinals)
+
+    overall = np.full(len(portafolios), np.nan)
+    if valid.any():
+        prices = matrix.prices
+        rows = np.flatnonzero(valid)
+        value_from = np.einsum(
+            "ij,ij->i", weights_matrix[rows], prices[from_rows[rows]]
+        )
+        value_to = np.einsum("ij,ij->i", weights_matrix[rows], prices[to_rows[rows]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            overall[rows] = np.where(value_from != 0, value_to / value_from - 1, 0.0)
+    overall[np.array([len(p.actives) == 0 for p in portafolios], dtype=bool)] = 0.0
+
+    days = (to_ordinals - from_ordinals).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annualized = np.where(days > 0, (1 + overall) ** (365 / days) - 1, 0.0)
+    annualized[np.isnan(overall)] = np.nan
+    return BatchReturns(overall, annualized)
@@ -0,0 +1,185 @@
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# date(1970, 1, 1).toordinal(), to convert date ordinals into numpy datetimes.
+EPOCH_ORDINAL = 719163
+# days fetched before the oldest date, to value a non market day (weekends,
+# holidays) at the price of the previous market day.
+ASOF_LOOKBACK_DAYS = 7
+
+
+def to_ordinals(dates: Sequence[date]) -> np.ndarray:
+    """Convert dates into an int64 array of date ordinals."""
+    return np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates))
+
+
+def as_ordinals(dates: Union[Sequence[date], Sequence[int]]) -> np.ndarray:
+    """Int64 array of date ordinals from dates or (already) ordinals."""
+    if isinstance(dates, (np.ndarray, array, memoryview)):
+        return np.asarray(dates, dtype=np.int64)
+    if len(dates) and isinstance(dates[0], int):
+        return np.array(dates, dtype=np.int64)
+    return to_ordinals(dates)
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """Fill the NaN values of each column with the last previous value.
+
+    Leading NaN values (before the first value of a column) are kept: there
+    is no price to value them with yet.
+    """
+    mask = ~np.isnan(prices)
+    rows = np.arange(prices.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(mask, rows, 0), axis=0)
+    return np.take_along_axis(prices, last, axis=0)
+
+
+def first_rows(prices: np.ndarray) -> np.ndarray:
+    """Row of the first value of each column (the amount of rows if none)."""
+    mask = ~np.isnan(prices)
+    if not mask.size:
+        return np.full(prices.shape[1], prices.shape[0])
+    return np.where(mask.any(axis=0), mask.argmax(axis=0), prices.shape[0])
+
+
+@dataclass
+class PriceMatrix:
+    """Prices of many actives aligned by date.
+
+    Args:
+        ordinals: Sorted date ordinals (one per row).
+        prices: 2-D array of prices (dates x actives).
+        quantities: Units held of each active (one per column).
+        first_rows: Row of the first price of each active (None if every
+            active has a price on every row).
+    """
+
+    ordinals: np.ndarray
+    prices: np.ndarray
+    quantities: np.ndarray
+    first_rows: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_series(
+        cls,
+        series: Sequence[Tuple[Sequence, Sequence[Optional[float]]]],
+        quantities: Optional[Sequence[float]] = None,
+    ) -> "PriceMatrix":
+        """Align the price series of many actives into a single matrix.
+
+        Rows are the union of the dates of all the series. A missing price
+        takes the last previous price of the active. Before the first price
+        of an active (or if it has none) its price is 0, and the rows are
+        not valued (see `values`).
+
+        Args:
+            series: (dates, prices) of each active, as returned by
+                `Active.price_series`, or (ordinals, prices) arrays as
+                returned by `Active.price_arrays` (used without copying).
+            quantities: Units held of each active (default 1 of each).
+        """
+        columns = [
+            (as_ordinals(dates), np.asarray(prices, dtype=np.float64))
+            for dates, prices in series
+        ]
+        if columns and all(np.array_equal(o, columns[0][0]) for o, _ in columns[1:]):
+            # same dates in every series (e.g. actives of the same market):
+            # the columns are stacked as they are.
+            ordinals = columns[0][0]
+            prices = np.column_stack([p for _, p in columns])
+        else:
+            if columns:
+                ordinals = np.unique(np.concatenate([o for o, _ in columns]))
+            else:
+                ordinals = np.empty(0, dtype=np.int64)
+            prices = np.full((len(ordinals), len(columns)), np.nan)
+            for j, (_ordinals, _prices) in enumerate(columns):
+                prices[np.searchsorted(ordinals, _ordinals), j] = _prices
+        first = first_rows(prices)
+        if prices.size:
+            prices = np.nan_to_num(forward_fill(prices), nan=0.0)
+
+        if quantities is None:
+            quantities = np.ones(len(columns))
+        return cls(ordinals, prices, np.asarray(quantities, dtype=np.float64), first)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Dates of the rows as numpy datetime64[D]."""
+        return (self.ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def priced_from(self) -> int:
+        """First row on which every held active has a price."""
+        if self.first_rows is None:
+            return 0
+        held = self.first_rows[self.quantities != 0]
+        return int(held.max()) if len(held) else 0
+
+    def values(self) -> np.ndarray:
+        """Value of the held actives for each date.
+
+        NaN before every held active has a price, as those dates can't be
+        valued (valuing them without the active, or at a later price of it,
+        would make up returns).
+        """
+        values = self.prices @ self.quantities
+        values[: self.priced_from()] = np.nan
+        return values
+
+    def overall_return(self) -> float:
+        """Overall return between the first and the last date.
+        0.01 means 1%
+        """
+        values = self.values()
+        if len(values) == 0 or values[0] == 0:
+            return 0.0
+        return float(values[-1] / values[0] - 1)
+
+    def annualized_return(self, days: Optional[int] = None) -> float:
+        """Annualized return between the first and the last date.
+
+        Args:
+            days: Days of the period. Defaults to the days between the first
+                and the last date.
+        """
+        if days is None and len(self.ordinals):
+            days = int(self.ordinals[-1] - self.ordinals[0])
+        if not days or days <= 0:
+            return 0.0
+        return annualize(self.overall_return(), days)
+
+
+def annualize(overall_return: float, days: int) -> float:
+    """Annualized return from an overall return of the given days period."""
+    return (1 + overall_return) ** (365 / days) - 1
+
+
+def time_weighted_return(prices: np.ndarray, flows: np.ndarray) -> float:
+    """Time-weighted return of holdings built by dated flows of units.
+
+    Holdings of each date are the cumulative sum of the flows, and every
+    flow is valued at the price of its date. The daily return discounts
+    the flows of the day, so buys and sells do not count as profit:
+        r_t = (V_t - F_t) / V_t-1 - 1
+
+    Args:
+        prices: 2-D array of prices (dates x actives).
+        flows: 2-D array of units bought (+) or sold (-) (dates x actives).
+    Returns:
+        Time-weighted return between the first and the last date.
+            0.01 means 1%
+    """
+    if len(prices) < 2:
+        return 0.0
+    holdings = np.cumsum(flows, axis=0)
+    values = np.einsum("ij,ij->i", holdings, prices)
+    flow_values = np.einsum("ij,ij->i", flows, prices)
+
+    previous = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(previous > 0, (values[1:] - flow_values[1:]) / previous, 1.0)
+    return float(np.prod(growth) - 1)
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from analytics.engine import annualize
+
+
+@dataclass
+class Metrics:
+    """Risk and performance metrics of a series of daily values.
+
+    Args:
+        overall_return: Return between the first and the last value.
+        annualized_return: `overall_return` annualized by the calendar days
+            of the period (as `Portafolio.profit`).
+        daily_annualized_return: Geometric mean of the daily returns
+            annualized by `periods_per_year`. Better suited than
+            `annualized_return` for periods shorter than a year.
+        volatility: Annualized standard deviation of the daily returns.
+        sharpe_ratio: Annualized mean excess daily return over volatility.
+        max_drawdown: Largest fall from a previous peak (-0.2 means -20%).
+        days: Calendar days of the period.
+        observations: Amount of daily values.
+        periods_per_year: Daily values per year used to annualize.
+
+    Notes:
+        - 0.01 means 1% for every return. Undefined metrics (e.g. volatility
+            of less than 2 daily returns) are NaN.
+    """
+
+    overall_return: float
+    annualized_return: float
+    daily_annualized_return: float
+    volatility: float
+    sharpe_ratio: float
+    max_drawdown: float
+    days: int
+    observations: int
+    periods_per_year: float
+
+
+def compute_metrics(
+    values: np.ndarray,
+    ordinals: np.ndarray,
+    risk_free_rate: float = 0.0,
+    periods_per_year: Optional[float] = None,
+    days: Optional[int] = None,
+) -> Metrics:
+    """Compute all the metrics in a single pass over the daily values.
+
+    The daily returns are computed once and shared by every metric.
+
+    Args:
+        values: Value of the portafolio on each date.
+        ordinals: Sorted date ordinals of the values.
+        risk_free_rate: Annual risk free rate, for the Sharpe ratio.
+        periods_per_year: Daily values per year (e.g. 252 for stocks, 365 for
+            cryptos). Defaults to the observed values per year of the series.
+        days: Calendar days of the period, to annualize `overall_return` with.
+            Defaults to the days between the first and the last date.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    observations = len(values)
+    if days is None:
+        days = int(ordinals[-1] - ordinals[0]) if observations else 0
+    nan = float("nan")
+    if observations < 2 or days <= 0 or values[0] <= 0:
+        return Metrics(0.0, 0.0, 0.0, nan, nan, 0.0, days, observations, nan)
+
+    if periods_per_year is None:
+        periods_per_year = (observations - 1) * 365.25 / days
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(values[:-1] > 0, values[1:] / values[:-1] - 1, 0.0)
+        drawdowns = values / np.maximum.accumulate(values) - 1
+
+    overall_return = float(values[-1] / values[0] - 1)
+    growth = 1 + overall_return
+    daily_annualized = (
+        growth ** (periods_per_year / len(returns)) - 1 if growth > 0 else -1.0
+    )
+
+    volatility = sharpe_ratio = nan
+    if len(returns) > 1:
+        daily_std = float(np.std(returns, ddof=1))
+        volatility = daily_std * np.sqrt(periods_per_year)
+        if daily_std > 0:
+            excess = float(np.mean(returns)) - risk_free_rate / periods_per_year
+            sharpe_ratio = excess / daily_std * np.sqrt(periods_per_year)
+
+    return Metrics(
+        overall_return=overall_return,
+        annualized_return=annualize(overall_return, days),
+        daily_annualized_return=float(daily_annualized),
+        volatility=float(volatility),
+        sharpe_ratio=float(sharpe_ratio),
+        max_drawdown=float(np.min(drawdowns)),
+        days=days,
+        observations=observations,
+        periods_per_year=float(periods_per_year),
+    )
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from analytics.engine import EPOCH_ORDINAL
+
+
+@dataclass
+class RollingReturns:
+    """Returns of a rolling window ending on each date of a series.
+
+    Args:
+        ordinals: Date ordinals of the end of each window.
+        start_ordinals: Date ordinals of the value each window starts from
+            (the last date on or before `window_days` before its end).
+        overall: Overall return of each window (0.01 means 1%).
+        annualized: Annualized return of each window (same formula as
+            `Portafolio.profit`).
+        window_days: Calendar days of the windows.
+    """
+
+    ordinals: np.ndarray
+    start_ordinals: np.ndarray
+    overall: np.ndarray
+    annualized: np.ndarray
+    window_days: int
+
+    @property
+    def dates(self) -> np.ndarray:
+        """End dates of the windows as numpy datetime64[D]."""
+        return (self.ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+
+def rolling_returns(
+    values: np.ndarray, ordinals: np.ndarray, window_days: int
+) -> RollingReturns:
+    """Returns of every `window_days` window of a series of daily values.
+
+    The start of all the windows is found with a single search over the
+    sorted dates, and the returns are computed at once from the values at
+    the start and the end of each window, so the cost is the same as a
+    couple of passes over the series, whatever the amount of windows.
+
+    As `Portafolio.profit(end - window_days, end)`, a window starts from the
+    value of the last date on or before its start date (e.g. a weekend
+    takes the value of the previous Friday). Only windows that start on or
+    after the first date of the series are returned, and the returns of the
+    windows starting on a NaN value (not valued yet) are NaN.
+
+    Args:
+        values: Value of the portafolio on each date.
+        ordinals: Sorted date ordinals of the values.
+        window_days: Calendar days of each window (e.g. 365 for 1 year).
+    """
+    if window_days <= 0:
+        raise ValueError("Error: `window_days` must be > 0.")
+    values = np.asarray(values, dtype=np.float64)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+
+    starts = np.searchsorted(ordinals, ordinals - window_days, side="right") - 1
+    ends = np.flatnonzero(starts >= 0)
+    starts = starts[ends]
+
+    value_from, value_to = values[starts], values[ends]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        overall = np.where(value_from != 0, value_to / value_from - 1, 0.0)
+        annualized = (1 + overall) ** (365 / window_days) - 1
+    return RollingReturns(
+        ordinals=ordinals[ends],
+        start_ordinals=ordinals[starts],
+        overall=overall,
+        annualized=annualized,
+        window_days=window_days,
+    )
@@ -0,0 +1,116 @@
+"""Load time, memory and lookup latency of `FilePriceHandler`.
+
+Writes a csv dump of daily prices (open, high, low, close, volume) of a
+synthetic universe of symbols, loads it into a `PriceStore` and prints as a
+json line the load time, the bytes of the store and the peak memory of the
+load, and the latency of price lookups once loaded.
+
+Run from the `./app` directory:
+    python3 -m benchmarks.bench_file_handler [--symbols 1000 --days 2520]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.common import discarded_output, environment, percentile
+from price_handler.file_handler import FilePriceHandler, PriceStore
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=2520, help="market days")
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--output", help="file to append the json line to")
+    return parser.parse_args(argv)
+
+
+def market_days(days: int, end_date: date = date(2022, 4, 8)) -> list:
+    result, day = [], end_date
+    while len(result) < days:
+        if day.weekday() < 5:
+            result.append(day.isoformat())
+        day -= timedelta(days=1)
+    return result[::-1]
+
+
+def write_dump(path: str, symbols: int, days: int) -> int:
+    """Write the csv dump, returning its size in bytes."""
+    dates = market_days(days)
+    with open(path, "w") as f:
+        f.write("symbol,date,open,high,low,close,volume\n")
+        for i in range(symbols):
+            symbol, price = f"S{i}", 100.0
+            lines = []
+            for day in dates:
+                price *= 1 + (i % 7 - 3) / 10000
+                lines.append(
+                    f"{symbol},{day},{price:.4f},{price * 1.01:.4f},"
+                    f"{price * 0.99:.4f},{price:.4f},{1000 + i}\n"
+                )
+            f.writelines(lines)
+    return os.path.getsize(path)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "universe.csv")
+        dump_bytes = write_dump(path, args.symbols, args.days)
+
+        start = time.perf_counter()
+        store = PriceStore.load_csv([path])
+        load_seconds = time.perf_counter() - start
+
+        del store
+        tracemalloc.start()
+        store = PriceStore.load_csv([path])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    class Universe(FilePriceHandler):
+        pass
+
+    Universe.store = store
+    first, last = store.series("S0").first_date, store.series("S0").latest_date
+    span = (last - first).days
+    rng = random.Random(0)
+    queries = [
+        (f"S{rng.randrange(args.symbols)}", first + timedelta(rng.randrange(span)))
+        for _ in range(args.lookups)
+    ]
+    latencies = []
+    with discarded_output():
+        for symbol, obs_date in queries:
+            start = time.perf_counter()
+            Universe.get_active_price_by_date(symbol, obs_date)
+            latencies.append(time.perf_counter() - start)
+
+    result = {
+        "benchmark": "file_handler",
+        "symbols": args.symbols,
+        "rows": store.rows,
+        "dump_bytes": dump_bytes,
+        "load_seconds": load_seconds,
+        "rows_per_second": store.rows / load_seconds,
+        "store_bytes": store.nbytes(),
+        "load_peak_bytes": peak,
+        "lookup_p50_us": percentile(latencies, 50) * 1e6,
+        "lookup_p99_us": percentile(latencies, 99) * 1e6,
+        **environment(),
+    }
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as out:
+            out.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Memory and evaluation time per position of large portafolios.
+
+Builds portafolios of N positions (over a universe of 500 symbols) as a list
+of `Stock` objects and as `Holdings`, and prints as json the memory allocated
+per position and the time of `Portafolio.overall_return` of each one.
+
+Run from the `./app` directory:
+    python3 -m benchmarks.bench_holdings
+"""
+
+import json
+import time
+import tracemalloc
+from datetime import date
+
+from actives.holdings import Holdings
+from actives.stock import Stock
+from benchmarks.common import discarded_output, environment
+from portafolio import Portafolio
+
+SIZES = (10000, 100000)
+UNIVERSE = 500
+
+
+def build(kind: str, size: int):
+    symbols = [f"S{i % UNIVERSE}" for i in range(size)]
+    if kind == "list":
+        return [Stock(name=symbol, symbol=symbol) for symbol in symbols]
+    holdings = Holdings()
+    for symbol in symbols:
+        holdings.add(symbol, symbol)
+    return holdings
+
+
+def main():
+    from_date, to_date = date(2021, 1, 4), date(2022, 1, 4)
+    env = environment()
+    for size in SIZES:
+        for kind in ("list", "holdings"):
+            tracemalloc.start()
+            actives = build(kind, size)
+            allocated, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            my_portafolio = Portafolio(actives=actives)
+            with discarded_output():
+                start = time.perf_counter()
+                my_portafolio.overall_return(from_date, to_date)
+                elapsed = time.perf_counter() - start
+            result = {
+                "benchmark": "holdings",
+                "representation": kind,
+                "positions": size,
+                "bytes_per_position": allocated / size,
+                "overall_return_ms": elapsed * 1000,
+                **env,
+            }
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Cost of logging on cached price lookups.
+
+Evaluates a portafolio of Alphavantage stocks, whose prices are all cached,
+with every logger level and prints the timings as json.
+
+Run from the `./app` directory:
+    python3 -m benchmarks.bench_logging
+"""
+
+import json
+import tempfile
+import time
+from datetime import date
+
+from actives.stock import Stock
+from benchmarks.common import cached_alphavantage, discarded_output
+from portafolio import Portafolio
+from tests.fake_alphavantage import market_days
+
+ACTIVES = 20
+REPEATS = 50
+
+
+def main():
+    with tempfile.TemporaryDirectory() as data_dir:
+        symbols = [f"S{i}" for i in range(ACTIVES)]
+        handler = cached_alphavantage(data_dir, symbols, days=1000)
+        my_portafolio = Portafolio(
+            actives=[Stock(name=s, symbol=s, price_handler=handler) for s in symbols]
+        )
+        days = market_days(date.today(), 1000)
+        to_date, from_date = days[0], days[-1]
+
+        results = {}
+        for level in ("debug", "info", "quiet"):
+            # rendered output is discarded, to measure only its cost
+            with discarded_output(level):
+                start = time.perf_counter()
+                for _ in range(REPEATS):
+                    my_portafolio.overall_return(from_date, to_date)
+                elapsed = time.perf_counter() - start
+            results[level] = {
+                "seconds": elapsed,
+                "lookups_per_second": REPEATS * ACTIVES * 2 / elapsed,
+            }
+
+    print(json.dumps({"benchmark": "logging", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Throughput, latency and memory of portafolio evaluation.
+
+Evaluates `Portafolio.overall_return` and `Portafolio.profit` over a grid of
+portafolio sizes, date spans and price handlers:
+    - test: `TestPriceHandler` (no I/O).
+    - cached: `Alphavantage` with every series already in its cache.
+    - http: `Alphavantage` with an empty cache, requesting a local fake
+        Alphavantage server that answers with the given latency.
+
+Prints one json line per grid cell, to track the results over time.
+
+Run from the `./app` directory:
+    python3 -m benchmarks.bench_portafolio [--output results.ndjson]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+from actives.stock import Stock
+from benchmarks.common import (
+    cached_alphavantage,
+    discarded_output,
+    environment,
+    local_alphavantage,
+    measure,
+)
+from portafolio import Portafolio
+from price_handler.tester_handler import TestPriceHandler
+from tests.fake_alphavantage import FakeAlphavantage, market_days
+
+HANDLERS = ("test", "cached", "http")
+OPERATIONS = ("overall_return", "profit")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument(
+        "--spans", type=int, nargs="+", default=[30, 365, 3650], help="days"
+    )
+    parser.add_argument("--handlers", nargs="+", default=HANDLERS, choices=HANDLERS)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds per http request"
+    )
+    parser.add_argument("--output", help="file to append the json lines to")
+    return parser.parse_args(argv)
+
+
+def run(args, out) -> None:
+    history_days = max(args.spans) + 100
+    to_date = market_days(date.today(), 1)[0]
+    env = environment()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeAlphavantage(
+        full_days=history_days, latency=args.latency
+    ) as fake, discarded_output():
+        symbols = [f"S{i}" for i in range(max(args.sizes))]
+        cached = cached_alphavantage(
+            os.path.join(tmp_dir, "cached"), symbols, history_days
+        )
+
+        for handler_name in args.handlers:
+            for size in args.sizes:
+                for span in args.spans:
+                    from_date = date.fromordinal(to_date.toordinal() - span)
+                    for operation in OPERATIONS:
+
+                        def evaluate(i):
+                            if handler_name == "test":
+                                handler = TestPriceHandler
+                            elif handler_name == "cached":
+                                handler = cached
+                            else:
+                                # a new cache on every call, to always request
+                                handler = local_alphavantage(
+                                    fake.base_url,
+                                    os.path.join(tmp_dir, f"http-{operation}-{i}"),
+                                )
+                            my_portafolio = Portafolio(
+                                actives=[
+                                    Stock(name=s, symbol=s, price_handler=handler)
+                                    for s in symbols[:size]
+                                ]
+                            )
+                            return getattr(my_portafolio, operation)(from_date, to_date)
+
+                        result = {
+                            "benchmark": "portafolio",
+                            "handler": handler_name,
+                            "actives": size,
+                            "span_days": span,
+                            "operation": operation,
+                            "repeats": args.repeats,
+                            **measure(evaluate, args.repeats),
+                            **env,
+                        }
+                        out.write(json.dumps(result) + "\n")
+                        out.flush()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output:
+        with open(args.output, "a") as out:
+            run(args, out)
+    else:
+        run(args, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
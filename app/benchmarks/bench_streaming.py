@@ -0,0 +1,104 @@
+"""Peak memory and parse time of "full" Alphavantage responses.
+
+Compares parsing a large synthetic crypto response by loading the whole json
+(`response.json()`) against the streaming parser of the price handler. Each
+parser runs in its own process, to measure its peak RSS increase.
+
+Run from the `./app` directory:
+    python3 -m benchmarks.bench_streaming [--days 20000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import environment
+from price_handler.series import PriceSeries
+from price_handler.streaming import parse_time_series
+from tests.fake_alphavantage import synthetic_response
+
+TIME_SERIES_KEY = "Time Series (Digital Currency Daily)"
+CHUNK_SIZE = 64 * 1024
+PARSERS = ("json", "streaming")
+
+
+def parse(parser: str, path: str) -> PriceSeries:
+    if parser == "json":
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+        return PriceSeries.from_time_series(data[TIME_SERIES_KEY])
+
+    with open(path, "rb") as f:
+        chunks = iter(lambda: f.read(CHUNK_SIZE), b"")
+        series, _ = parse_time_series(chunks, TIME_SERIES_KEY)
+    return series
+
+
+def child(parser: str, path: str) -> None:
+    """Parse the payload and print its cost as json."""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    series = parse(parser, path)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del series
+
+    tracemalloc.start()
+    series = parse(parser, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        json.dumps(
+            {
+                "parse_seconds": elapsed,
+                "peak_rss_increase_kib": after - before,  # ru_maxrss is in KiB
+                "peak_allocated_kib": peak / 1024,
+                "rows": len(series),
+            }
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--days", type=int, default=20000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "payload.json")
+        with open(path, "w") as f:
+            json.dump(synthetic_response("BTC", "crypto", args.days), f)
+        payload_kib = os.path.getsize(path) / 1024
+
+        env = environment()
+        for name in PARSERS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_streaming", "--child"]
+                + [name, path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = {
+                "benchmark": "streaming",
+                "parser": name,
+                "days": args.days,
+                "payload_kib": payload_kib,
+                **json.loads(output),
+                **env,
+            }
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
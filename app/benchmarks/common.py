@@ -0,0 +1,103 @@
+"""Shared helpers of the benchmarks."""
+
+import io
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List
+
+from console import console, logger
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.price_cache import get_price_cache
+from price_handler.rate_limiter import RateLimiter
+from price_handler.series import PriceSeries
+from tests.fake_alphavantage import synthetic_response
+
+
+def cached_alphavantage(data_dir: str, symbols: Iterable[str], days: int) -> type:
+    """Alphavantage handler whose cache already has the series of the symbols."""
+
+    class CachedAlphavantage(Alphavantage):
+        pass
+
+    CachedAlphavantage.data_dir = data_dir
+    for symbol in symbols:
+        response = synthetic_response(symbol, days=days)
+        series = PriceSeries.from_time_series(response["Time Series (Daily)"])
+        get_price_cache(data_dir).merge(symbol, "stock", series, full=True)
+    return CachedAlphavantage
+
+
+def local_alphavantage(base_url: str, data_dir: str) -> type:
+    """Alphavantage handler requesting a local server, without rate limit."""
+
+    class LocalAlphavantage(Alphavantage):
+        rate_limiter = RateLimiter()
+
+    LocalAlphavantage.base_url = base_url
+    LocalAlphavantage.data_dir = data_dir
+    return LocalAlphavantage
+
+
+@contextmanager
+def discarded_output(level: str = "quiet"):
+    """Log at the given level, discarding the rendered output."""
+    console_file, logger_level = console.file, logger.level
+    console.file = io.StringIO()
+    logger.set_level(level)
+    try:
+        yield
+    finally:
+        console.file = console_file
+        logger.set_level(logger_level)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """q-th percentile (0-100) of the values, with linear interpolation."""
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def measure(fn: Callable[[int], object], repeats: int) -> Dict[str, float]:
+    """Time `repeats` calls of `fn(i)`, and its peak memory in an extra call.
+
+    Returns:
+        Throughput (calls per second), latency percentiles (ms) and peak
+        memory allocated by a call (KiB).
+    """
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+
+    # measured apart, as tracing allocations slows down the calls
+    tracemalloc.start()
+    try:
+        fn(repeats)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "throughput_per_s": repeats / sum(latencies),
+        "latency_ms_p50": percentile(latencies_ms, 50),
+        "latency_ms_p90": percentile(latencies_ms, 90),
+        "latency_ms_p99": percentile(latencies_ms, 99),
+        "latency_ms_max": max(latencies_ms),
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Description of the environment the benchmarks ran in."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -1,3 +1,141 @@
-from rich.console import Console
+import os
+import threading
+from typing import Union
 
-console = Console()
+
+class LazyConsole:
+    """Rich `Console` created (and `rich` imported) on first use.
+
+    Importing `rich` is a large share of the start up time of short-lived
+    runs, and runs that log nothing (e.g. 'quiet' level) never need it.
+    Attributes are read from and set on the rich console. Attributes set
+    before it exists (e.g. `console.file = sys.stderr`) are kept and set on
+    it once created, so configuring the console does not create it.
+    """
+
+    def __init__(self):
+        object.__setattr__(self, "_console", None)
+        object.__setattr__(self, "_pending", {})
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def get_console(self):
+        """Returns the rich console (created on first use)."""
+        if self._console is None:
+            with self._lock:
+                if self._console is None:
+                    from rich.console import Console
+
+                    _console = Console()
+                    for name, value in self._pending.items():
+                        setattr(_console, name, value)
+                    self._pending.clear()
+                    object.__setattr__(self, "_console", _console)
+        return self._console
+
+    def __getattr__(self, name: str):
+        if self._console is None and name in self._pending:
+            return self._pending[name]
+        return getattr(self.get_console(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        with self._lock:
+            if self._console is None:
+                self._pending[name] = value
+                return
+        setattr(self._console, name, value)
+
+
+console = LazyConsole()
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+QUIET = 100
+
+LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warning": WARNING,
+    "error": ERROR,
+    "quiet": QUIET,
+}
+
+
+class Logger:
+    """Leveled logger over the rich console.
+
+    Messages use %-style arguments that are only formatted (and rendered by
+    rich) when the level of the message is enabled, so disabled messages in
+    hot paths cost a single comparison.
+
+    Args:
+        level: Minimum level of the logged messages. One of `LEVELS` names
+            or values. 'quiet' disables all the messages.
+    """
+
+    def __init__(self, level: Union[int, str] = INFO):
+        self.level = INFO
+        self.set_level(level)
+
+    def set_level(self, level: Union[int, str]) -> None:
+        """Set the minimum level of the logged messages."""
+        if isinstance(level, str):
+            if level.lower() not in LEVELS:
+                raise ValueError(f"level must be one of {list(LEVELS)}")
+            level = LEVELS[level.lower()]
+        self.level = level
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def log(self, level: int, msg: str, *args, style=None) -> None:
+        if level < self.level:
+            return
+        self._emit(msg, args, style)
+
+    def debug(self, msg: str, *args, style=None) -> None:
+        if DEBUG >= self.level:
+            self._emit(msg, args, style)
+
+    def info(self, msg: str, *args, style=None) -> None:
+        if INFO >= self.level:
+            self._emit(msg, args, style)
+
+    def warning(self, msg: str, *args, style="yellow") -> None:
+        if WARNING >= self.level:
+            self._emit(msg, args, style)
+
+    def error(self, msg: str, *args, style="red") -> None:
+        if ERROR >= self.level:
+            self._emit(msg, args, style)
+
+    @staticmethod
+    def _emit(msg: str, args: tuple, style) -> None:
+        if args:
+            msg = msg % args
+        # show the caller of the logger method in the log line
+        console.log(msg, style=style, _stack_offset=3)
+
+
+def logger_from_env(var: str = "FINTUAL_LOG_LEVEL") -> Logger:
+    """Logger with the level of the environment variable (default 'info').
+
+    An unknown level falls back to 'info' with a warning, instead of failing
+    the import of every module that logs.
+    """
+    level = os.getenv(var, "info")
+    try:
+        return Logger(level)
+    except ValueError:
+        _logger = Logger(INFO)
+        _logger.warning(
+            "Warning: unknown %s=%r, using 'info'. Accepted values: %s",
+            var,
+            level,
+            ", ".join(LEVELS),
+        )
+        return _logger
+
+
+logger = logger_from_env()
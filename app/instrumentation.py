@@ -0,0 +1,205 @@
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Histogram:
+    """Latency histogram with fixed buckets (`LATENCY_BUCKETS`)."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the observations of another histogram."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket of the q-th quantile (0-1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS + ("inf",), self.counts)
+                if count
+            },
+        }
+
+
+class Instruments:
+    """Counters and latency histograms of the price handlers, actives and
+    portafolios.
+
+    Disabled by default: every method returns right away, so instrumented
+    hot paths only pay an attribute check. Enabled with `enable()` or the
+    `FINTUAL_METRICS` environment variable (path of the json file to dump
+    the metrics to at the end of `main.py`, or '-' for stderr).
+
+    Metrics are recorded per process: worker processes send theirs to the
+    parent one with `drain` and `merge`.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Add `value` to the counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Add a latency to the histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Observe the latency of the block in the histogram.
+
+        Also usable as a decorator:
+            @instruments.timed("portafolio.overall_return_seconds")
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> float:
+        return self.counters.get(name, 0)
+
+    def ratio(self, hits: str, misses: str) -> Optional[float]:
+        """Ratio of the `hits` counter over `hits` + `misses` (None if no calls)."""
+        total = self.counter(hits) + self.counter(misses)
+        return self.counter(hits) / total if total else None
+
+    def drain(self) -> dict:
+        """Take the counters and histograms recorded so far (and reset them).
+
+        The result is picklable, to be sent to another process and added to
+        its metrics with `merge`.
+        """
+        with self._lock:
+            state = {"counters": self.counters, "histograms": self.histograms}
+            self.counters, self.histograms = {}, {}
+        return state
+
+    def merge(self, state: dict) -> None:
+        """Add the counters and histograms taken with `drain`."""
+        with self._lock:
+            for name, value in state["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, histogram in state["histograms"].items():
+                if name in self.histograms:
+                    self.histograms[name].merge(histogram)
+                else:
+                    self.histograms[name] = histogram
+
+    def snapshot(self) -> dict:
+        """Counters and histograms as a json serializable dict."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: histogram.snapshot()
+                    for name, histogram in self.histograms.items()
+                },
+            }
+
+    def dump(self, path: str) -> None:
+        """Write the snapshot as json to the file ('-' for stderr, to keep
+        stdout for the output of the command)."""
+        data = json.dumps(self.snapshot(), indent=2)
+        if path == "-":
+            print(data, file=sys.stderr)
+            return
+        with open(path, "w") as f:
+            f.write(data)
+
+
+instruments = Instruments(enabled=bool(os.getenv("FINTUAL_METRICS")))
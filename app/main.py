@@ -1,38 +1,388 @@
-from actives.stock import Stock
-from portafolio import Portafolio
+"""Evaluate the returns of many portafolios.
+
+Reads portafolios and their periods from json or csv files (or stdin), and
+writes the overall and annualized return of each one as a json line, as soon
+as it is evaluated.
+
+Json input: a list of portafolios, or one portafolio per line:
+    {"name": "Risky Steve", "from_date": "2021-04-12", "to_date": "2022-04-12",
+     "actives": [{"symbol": "AAPL", "type": "stock", "quantity": 2}, "MSFT"]}
+Csv input: one row per active, the rows of a portafolio one after the other:
+    portafolio,symbol,type,quantity,from_date,to_date
+    Risky Steve,AAPL,stock,2,2021-04-12,2022-04-12
+
+Output lines: {"index", "name", "from_date", "to_date", "overall_return",
+"annualized_return"}, or {"index", "name", "error"} if it failed. `index` is
+the position of the portafolio in the input, since the lines are written in
+the order the portafolios are done.
+
+A summary (throughput and failures) is logged to stderr at the end. The exit
+status is 0 if every portafolio was evaluated, 1 if any failed and 2 if the
+input could not be read.
+
+Run from the `./app` directory:
+    python3 main.py examples/portafolios.json --workers 4
+"""
 
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import queue
+import sys
+import time
 from datetime import date
+from typing import Iterable, Iterator, List, Optional, TextIO
 
-from console import console
-from price_handler import tester_handler
+from actives.crypto import Crypto
+from actives.holdings import Holdings
+from actives.stock import Stock
+from analytics.engine import annualize
+from console import console, logger
+from instrumentation import instruments
+from portafolio import Portafolio
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter
+from price_handler.tester_handler import TestPriceHandler
 
+ACTIVE_TYPES = {"stock": Stock, "crypto": Crypto}
+HANDLERS = {"test": TestPriceHandler, "alphavantage": Alphavantage}
+FORMATS = ("auto", "json", "csv")
+# portafolios sent to each worker process before waiting for a result
+MAX_IN_FLIGHT_PER_WORKER = 4
 
-def main():
-    apple = Stock(
-        name="Apple", symbol="AAPL", price_handler=tester_handler.TestPriceHandler
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "inputs", nargs="*", default=["-"], help="json or csv files ('-' for stdin)"
     )
-    microsoft = Stock(
-        name="Microsoft", symbol="MSFT", price_handler=tester_handler.TestPriceHandler
+    parser.add_argument("--format", default="auto", choices=FORMATS)
+    parser.add_argument("--handler", default="test", choices=HANDLERS)
+    parser.add_argument(
+        "--data-dir", help="price cache directory of the alphavantage handler"
     )
-    google = Stock(
-        name="Google", symbol="GOOGL", price_handler=tester_handler.TestPriceHandler
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes evaluating portafolios"
     )
+    parser.add_argument("--output", help="file to write the json lines to")
+    return parser.parse_args(argv)
 
-    risky_steve_portafolio = Portafolio(
-        name="Risky Steve Portafolio", actives=[apple, microsoft, google]
-    )
 
-    to_date = date(2022, 4, 12)
-    from_date = date(2002, 4, 12)
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError(f"Error: invalid date {value!r}, expected YYYY-MM-DD.")
 
-    annualized_return = risky_steve_portafolio.profit(
-        to_date=to_date, from_date=from_date
-    )
-    console.log(
-        f"Annualized return for {risky_steve_portafolio.name} between dates {from_date}"
-        f" and {to_date} is {annualized_return} %"
+
+def _request(name: str, from_date: str, to_date: str, actives: Iterable[dict]) -> dict:
+    """Validated portafolio request, with plain values (sent to the workers)."""
+    positions = []
+    for active in actives:
+        if isinstance(active, str):
+            active = {"symbol": active}
+        active_type = str(active.get("type") or "stock").lower()
+        if active_type not in ACTIVE_TYPES:
+            raise ValueError(f"Error: active type must be one of {list(ACTIVE_TYPES)}.")
+        if not active.get("symbol"):
+            raise ValueError(f"Error: active without symbol in portafolio {name!r}.")
+        positions.append(
+            (
+                active.get("name") or active["symbol"],
+                active["symbol"],
+                active_type,
+                float(active.get("quantity") or 1.0),
+            )
+        )
+    return {
+        "name": name,
+        "from_date": _date(from_date),
+        "to_date": _date(to_date),
+        "actives": positions,
+    }
+
+
+def _checked_request(
+    name: str, from_date: str, to_date: str, actives: Iterable[dict]
+) -> dict:
+    """`_request`, or the error of an invalid one (to fail only that one)."""
+    try:
+        return _request(name, from_date, to_date, actives)
+    except (ValueError, TypeError, AttributeError) as e:
+        return {"name": name, "error": str(e)}
+
+
+def _json_requests(lines: Iterable[str]) -> Iterator[dict]:
+    lines = iter(lines)
+    for line in lines:
+        if not line.strip():
+            continue
+        if line.lstrip().startswith("["):
+            portafolios = json.loads(line + "".join(lines))
+        else:
+            portafolios = [json.loads(line)]
+        for portafolio in portafolios:
+            if not isinstance(portafolio, dict):
+                yield {"name": "", "error": "Error: portafolio must be an object."}
+                continue
+            yield _checked_request(
+                portafolio.get("name", ""),
+                portafolio.get("from_date"),
+                portafolio.get("to_date"),
+                portafolio.get("actives", []),
+            )
+
+
+def _csv_requests(lines: Iterable[str]) -> Iterator[dict]:
+    rows = csv.DictReader(lines)
+    current, actives = None, []
+    for row in rows:
+        key = (row.get("portafolio", ""), row.get("from_date"), row.get("to_date"))
+        if key != current:
+            if current is not None:
+                yield _checked_request(*current, actives)
+            current, actives = key, []
+        if row.get("symbol"):
+            actives.append(row)
+    if current is not None:
+        yield _checked_request(*current, actives)
+
+
+def read_requests(file: TextIO, format: str = "auto") -> Iterator[dict]:
+    """Portafolio requests of a json or csv input, read as they are needed.
+
+    Invalid portafolios (e.g. a wrong date) are yielded as {"name", "error"},
+    so they fail without stopping the others. Raises ValueError if the input
+    itself can't be parsed.
+
+    Args:
+        file: Input text file.
+        format: 'json', 'csv' or 'auto' (json if it starts with '[' or '{').
+    """
+    if format == "auto":
+        head = ""
+        for head in file:
+            if head.strip():
+                break
+        format = "json" if head.lstrip()[:1] in ("[", "{") else "csv"
+        lines = _chain(head, file)
+    else:
+        lines = file
+    if format == "json":
+        return _json_requests(lines)
+    return _csv_requests(lines)
+
+
+def _chain(head: str, file: TextIO) -> Iterator[str]:
+    yield head
+    yield from file
+
+
+def _open_inputs(paths: List[str], format: str) -> Iterator[dict]:
+    for path in paths:
+        if path == "-":
+            yield from read_requests(sys.stdin, format)
+            continue
+        file_format = format
+        if format == "auto":
+            extension = os.path.splitext(path)[1].lower()
+            file_format = {".json": "json", ".ndjson": "json", ".csv": "csv"}.get(
+                extension, "auto"
+            )
+        with open(path, newline="") as file:
+            yield from read_requests(file, file_format)
+
+
+def _init_worker(handler: str, data_dir: Optional[str], workers: int) -> None:
+    """Configure the price handler of a worker process.
+
+    Workers share the price cache of the data directory (its files are
+    merged under a file lock and replaced atomically), and split the API
+    rate limits between them.
+    """
+    console.file = sys.stderr
+    if workers > 1:
+        instruments.reset()  # forked with the metrics of the parent
+    if HANDLERS[handler] is Alphavantage:
+        if data_dir:
+            Alphavantage.data_dir = data_dir
+        Alphavantage.rate_limiter = RateLimiter(
+            calls_per_minute=_share(Alphavantage.calls_per_minute, workers),
+            calls_per_day=_share(Alphavantage.calls_per_day, workers),
+        )
+
+
+def _share(limit: Optional[int], workers: int) -> Optional[int]:
+    """Calls of the API rate limit allowed to each worker (None: no limit)."""
+    return limit // workers if limit else None
+
+
+def _max_workers(handler: str, workers: int) -> int:
+    """Workers allowed, so the API rate limits split into a call each at least.
+
+    With more workers than calls per minute, the first call of each one
+    would already go over the limit.
+    """
+    if HANDLERS[handler] is not Alphavantage:
+        return workers
+    limits = [
+        limit
+        for limit in (Alphavantage.calls_per_minute, Alphavantage.calls_per_day)
+        if limit
+    ]
+    if limits and workers > min(limits):
+        logger.warning(
+            "Using %s workers, the calls per minute allowed by the API", min(limits)
+        )
+        return min(limits)
+    return workers
+
+
+def evaluate(indexed_request: tuple, handler: str = "test") -> dict:
+    """Returns of a portafolio request (or its error), as a json object."""
+    index, request = indexed_request
+    if "error" in request:  # invalid in the input
+        return {"index": index, "name": request["name"], "error": request["error"]}
+    holdings = Holdings()
+    for name, symbol, active_type, quantity in request["actives"]:
+        holdings.add(
+            name, symbol, ACTIVE_TYPES[active_type], HANDLERS[handler], quantity
+        )
+    portafolio = Portafolio(name=request["name"], actives=holdings)
+    from_date, to_date = request["from_date"], request["to_date"]
+    result = {"index": index, "name": request["name"]}
+    try:
+        overall_return = portafolio.overall_return(from_date, to_date)
+    except Exception as e:  # keep evaluating the other portafolios
+        result["error"] = str(e)
+        return result
+    days = (to_date - from_date).days
+    result.update(
+        from_date=from_date.isoformat(),
+        to_date=to_date.isoformat(),
+        overall_return=overall_return,
+        annualized_return=annualize(overall_return, days) if days > 0 else 0.0,
     )
+    return result
+
+
+class _Evaluator:
+    """Picklable `evaluate` with the handler of the command.
+
+    Returns (result, metrics): the metrics recorded by a worker process
+    since its previous result (None in the parent process or if disabled),
+    to be merged into the ones of the parent.
+    """
+
+    def __init__(self, handler: str, worker: bool = False):
+        self.handler = handler
+        self.worker = worker
+
+    def __call__(self, indexed_request: tuple) -> tuple:
+        result = evaluate(indexed_request, self.handler)
+        if self.worker and instruments.enabled:
+            return result, instruments.drain()
+        return result, None
+
+
+def _evaluated(
+    pool: multiprocessing.pool.Pool,
+    evaluator: _Evaluator,
+    requests: Iterable[tuple],
+    max_in_flight: int,
+) -> Iterator[tuple]:
+    """Results of the requests evaluated by the pool, in the order they are done.
+
+    At most `max_in_flight` requests are sent to the pool before waiting for
+    a result, so the input is read as the portafolios are evaluated instead
+    of being queued in memory all at once.
+    """
+    done: queue.Queue = queue.Queue()
+    in_flight = 0
+    for request in requests:
+        pool.apply_async(
+            evaluator, (request,), callback=done.put, error_callback=done.put
+        )
+        in_flight += 1
+        while in_flight >= max_in_flight:
+            yield _done(done.get())
+            in_flight -= 1
+    for _ in range(in_flight):
+        yield _done(done.get())
+
+
+def _done(result):
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def run(args, out: TextIO) -> int:
+    """Evaluate the portafolios of the inputs, writing a json line for each one.
+
+    Returns:
+        Exit status of the command.
+    """
+    _init_worker(args.handler, args.data_dir, 1)
+    workers = _max_workers(args.handler, args.workers)
+    requests = enumerate(_open_inputs(args.inputs, args.format))
+
+    done = failed = 0
+    start = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                pool = stack.enter_context(
+                    multiprocessing.Pool(
+                        workers,
+                        initializer=_init_worker,
+                        initargs=(args.handler, args.data_dir, workers),
+                    )
+                )
+                evaluator = _Evaluator(args.handler, worker=True)
+                results = _evaluated(
+                    pool, evaluator, requests, MAX_IN_FLIGHT_PER_WORKER * workers
+                )
+            else:
+                results = map(_Evaluator(args.handler), requests)
+            for result, metrics in results:
+                if metrics is not None:
+                    instruments.merge(metrics)
+                done += 1
+                failed += "error" in result
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+    except (ValueError, OSError, KeyError) as e:
+        logger.error("Error reading the portafolios: %s", e)
+        return 2
+    finally:
+        seconds = time.perf_counter() - start
+        logger.info(
+            "Evaluated %s portafolios (%s failed) in %.3f seconds (%.1f per second)",
+            done,
+            failed,
+            seconds,
+            done / seconds if seconds else 0.0,
+        )
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.output:
+        with open(args.output, "w") as out:
+            status = run(args, out)
+    else:
+        status = run(args, sys.stdout)
+
+    if instruments.enabled:
+        instruments.dump(os.getenv("FINTUAL_METRICS", "-"))
+    return status
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 from datetime import date, timedelta
 
 
-from console import console
+from console import logger
+import instrumentation
 from actives.abstract import Active
+from actives.holdings import Holdings
+from analytics.engine import ASOF_LOOKBACK_DAYS, PriceMatrix, time_weighted_return
+from analytics.metrics import Metrics, compute_metrics
+from analytics.rolling import RollingReturns, rolling_returns
+from transactions import Ledger, active_key
 
 
 @dataclass
@@ -13,19 +20,24 @@ class Portafolio:
     Args:
             name(str): Name of the portafolio. Only for internal use.
             actives (List[Active]): List of actives to be included in the porfafolio.
+                For very large portafolios, a `Holdings` (compact positions
+                with quantities) can be used instead of the list.
+            max_workers (int): Number of threads used to get the prices of the
+                actives concurrently. 1 (default) gets them one after the other.
+                Should not exceed the concurrent requests the price source allows.
+            ledger (Ledger): Dated buys and sells of actives (fractional
+                quantities allowed), used by `time_weighted_return`.
 
-    Todos:
-            - Add support for amounts of actives for each active. For now you can have
-                    1 unit of each active only. Posible need to create a new class
-                    for Transactions for this (added 0.123 of Tesla's stock for example).
-            - Add a method to add/remove a new active to the porfafolio.
-                    It's important the date of when the active was added/removed
-                    (maybe create a Transaction class to track movements
-                    of a portafolio) for a better calculation of the real profit.
+    Notes:
+            - `actives` count as 1 unit of each active, while the movements
+                    of the `ledger` track the real holdings of the portafolio
+                    through time.
     """
 
     name: str = "Risky Steve"
-    actives: Optional[List[Active]] = field(default_factory=list)
+    actives: Optional[Sequence[Active]] = field(default_factory=list)
+    max_workers: int = 1
+    ledger: Ledger = field(default_factory=Ledger)
 
     def add_active(self, active: Active) -> None:
         """Add a new active to the porfafolio.
@@ -36,12 +48,108 @@ class Portafolio:
         self.actives.append(active)
         return
 
-    def overall_return(self, from_date: date, to_date: date) -> float:
+    def buy(self, active: Active, quantity: float, transaction_date: date) -> None:
+        """Register a buy of `quantity` units of the active in the ledger.
+
+        Args:
+                active: Active bought.
+                quantity: Units bought (can be fractional).
+                transaction_date: Date of the buy.
+        """
+        self.ledger.buy(active, quantity, transaction_date)
+
+    def sell(self, active: Active, quantity: float, transaction_date: date) -> None:
+        """Register a sell of `quantity` units of the active in the ledger.
+
+        Args:
+                active: Active sold.
+                quantity: Units sold (can be fractional).
+                transaction_date: Date of the sell.
+        """
+        self.ledger.sell(active, quantity, transaction_date)
+
+    def instruments(self) -> Tuple[List[Active], List[float]]:
+        """Distinct actives of the portafolio and the units held of each one.
+
+        Actives with the same symbol, type and price handler are the same
+        instrument, so their prices are fetched once.
+        """
+        if isinstance(self.actives, Holdings):
+            return self.actives.instruments()
+        columns, actives, quantities = {}, [], []
+        for active in self.actives:
+            key = active_key(active)
+            if key not in columns:
+                columns[key] = len(actives)
+                actives.append(active)
+                quantities.append(1.0)
+            else:
+                quantities[columns[key]] += 1.0
+        return actives, quantities
+
+    def _map_actives(
+        self,
+        fn: Callable[[Active], Any],
+        max_workers: Optional[int] = None,
+        actives: Optional[List[Active]] = None,
+    ) -> List[Any]:
+        """Apply `fn` to every active, concurrently if `max_workers` > 1.
+
+        Results are returned in the same order of the actives.
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        if actives is None:
+            actives = self.actives
+        if max_workers > 1 and len(actives) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(fn, actives))
+        return [fn(active) for active in actives]
+
+    def price_matrix(
+        self, from_date: date, to_date: date, max_workers: Optional[int] = None
+    ) -> PriceMatrix:
+        """Get the daily prices of all the actives aligned in a single matrix.
+
+        Columns are the distinct actives (`instruments`), with the units held
+        of each one as the quantities of the matrix.
+
+        Each active's price series is fetched once, so overall return, annualized
+        return and daily values of the portafolio are computed with array
+        operations over the same data.
+
+        Args:
+                from_date (date): Start date of the period.
+                to_date (date): End date of the period.
+                max_workers (int): Number of threads to get the prices of the
+                    actives with. Defaults to the portafolio's `max_workers`.
+        Returns:
+                (PriceMatrix): Prices of the period (dates x actives).
+        """
+        if not (isinstance(from_date, date) & isinstance(to_date, date)):
+            raise ValueError("Error: `from_date` and `to_date` must be date objects.")
+        if from_date > to_date:
+            raise ValueError("Error: `from_date` must be before `to_date`.")
+
+        actives, quantities = self.instruments()
+        series = self._map_actives(
+            lambda active: active.price_arrays(from_date=from_date, to_date=to_date),
+            max_workers,
+            actives,
+        )
+        return PriceMatrix.from_series(series, quantities)
+
+    @instrumentation.instruments.timed("portafolio.overall_return_seconds")
+    def overall_return(
+        self, from_date: date, to_date: date, max_workers: Optional[int] = None
+    ) -> float:
         """Get Overall return between two given dates for the portafolio
 
         Args:
                 from_date (date): Start date of the period to calculate the profit.
                 to_date (date): End date of the period to calculate the profit.
+                max_workers (int): Number of threads to get the prices of the
+                    actives with. Defaults to the portafolio's `max_workers`.
         Returns:
                 (float): Portafolio's overall return between the given dates.
                     0.01 means 1%
@@ -55,15 +163,28 @@ class Portafolio:
             raise ValueError("Error: `from_date` must be before `to_date`.")
 
         # LOGIC:
-        console.log(f"Calculating overall returns for portafolio {self.name}")
+        logger.info("Calculating overall returns for portafolio %s", self.name)
 
         overall_total_return = 0.0
         overall_from_price = 0.0
 
-        for active in self.actives:
-            res = active.get_diff_price_btw_dates(from_date, to_date)
-            overall_from_price += res["price_from"]
-            overall_total_return += res["delta"]
+        actives, quantities = self.instruments()
+        results = self._map_actives(
+            lambda active: active.get_diff_price_btw_dates(from_date, to_date),
+            max_workers,
+            actives,
+        )
+
+        # reduce in the actives order, so the result is the same for any
+        # amount of workers.
+        for active, quantity, res in zip(actives, quantities, results):
+            if res is None:
+                raise ValueError(
+                    f"Error: no prices found for active {active.name}"
+                    f" between {from_date} and {to_date}."
+                )
+            overall_from_price += quantity * res["price_from"]
+            overall_total_return += quantity * res["delta"]
 
         try:
             overall_return = overall_total_return / overall_from_price
@@ -86,11 +207,11 @@ class Portafolio:
                 - The `years` is the natural number of years between
                     `from_date` and `to_date`. If < 1, will not be able
                     to calculate the annualized return.
-                    Maybe an option would be to calculate daily return and do the
-                    convertion to annualized.
+                    For sub-year periods, `metrics` annualizes the daily returns
+                    (`Metrics.daily_annualized_return`).
         """
         if to_date is None:
-            console.log("Calculating annualized until yesterday.")
+            logger.info("Calculating annualized until yesterday.")
             to_date = date.today() - timedelta(days=1)  # price has a delay of 1 day
 
         if len(self.actives) == 0:
@@ -104,11 +225,151 @@ class Portafolio:
 
         # transform overal return to annualized return
         days_period = (to_date - from_date).days
-        console.log(f"Days passed: {days_period}")
+        logger.debug("Days passed: %s", days_period)
 
         overall_return = self.overall_return(from_date, to_date)
-        console.log(f"Overall return: {overall_return} %")
+        logger.info("Overall return: %s %%", overall_return)
 
         annualized_return = (1 + overall_return) ** (365 / days_period) - 1
 
         return annualized_return
+
+    def metrics(
+        self,
+        from_date: date,
+        to_date: date,
+        risk_free_rate: float = 0.0,
+        periods_per_year: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> Metrics:
+        """Get the risk and performance metrics of the portafolio between two dates.
+
+        Overall and annualized return (also from daily returns, for periods
+        shorter than a year), volatility, Sharpe ratio and max drawdown are
+        computed in a single pass over the daily values of the portafolio.
+        The prices of each active are fetched once for all the metrics.
+
+        As `overall_return`, the period starts from the prices as of
+        `from_date` (the previous market day on a non market day), and the
+        return is annualized by the calendar days of the period, as `profit`.
+
+        Args:
+                from_date (date): Start date of the period.
+                to_date (date): End date of the period.
+                risk_free_rate (float): Annual risk free rate, for the Sharpe ratio.
+                periods_per_year (float): Daily values per year to annualize
+                    with. Defaults to the observed values per year.
+                max_workers (int): Number of threads to get the prices of the
+                    actives with. Defaults to the portafolio's `max_workers`.
+        Returns:
+                (Metrics): Metrics of the period.
+        Raises:
+                ValueError: If an active has no price on (or before) `from_date`,
+                    as `overall_return`.
+        """
+        if not (isinstance(from_date, date) & isinstance(to_date, date)):
+            raise ValueError("Error: `from_date` and `to_date` must be date objects.")
+        if from_date > to_date:
+            raise ValueError("Error: `from_date` must be before `to_date`.")
+        matrix = self.price_matrix(
+            from_date - timedelta(days=ASOF_LOOKBACK_DAYS), to_date, max_workers
+        )
+        ordinals = matrix.ordinals
+        start = int(ordinals.searchsorted(from_date.toordinal(), side="right")) - 1
+        if len(ordinals) and (start < 0 or matrix.priced_from() > start):
+            actives, _ = self.instruments()
+            active = actives[int(matrix.first_rows.argmax())]
+            raise ValueError(
+                f"Error: no prices found for active {active.name}"
+                f" on {from_date}, its prices start later."
+            )
+        start = max(start, 0)
+        return compute_metrics(
+            matrix.values()[start:],
+            ordinals[start:],
+            risk_free_rate,
+            periods_per_year,
+            days=(to_date - from_date).days,
+        )
+
+    def rolling_returns(
+        self,
+        from_date: date,
+        to_date: date,
+        window_days: int = 365,
+        max_workers: Optional[int] = None,
+    ) -> RollingReturns:
+        """Get the returns of a rolling window ending on every day of a period.
+
+        Equivalent to calling `profit(end - window_days, end)` (and
+        `overall_return`) for every market day `end` between the dates, but
+        the prices of each active are fetched once, and all the windows are
+        computed at once from the daily values of the portafolio.
+
+        Args:
+                from_date (date): First end date of the windows.
+                to_date (date): Last end date of the windows.
+                window_days (int): Calendar days of each window (e.g. 365 for
+                    1 year, 1095 for 3 years).
+                max_workers (int): Number of threads to get the prices of the
+                    actives with. Defaults to the portafolio's `max_workers`.
+        Returns:
+                (RollingReturns): End dates, overall and annualized returns of
+                    the windows (NaN for the windows starting before every
+                    active has a price).
+        """
+        if not (isinstance(from_date, date) & isinstance(to_date, date)):
+            raise ValueError("Error: `from_date` and `to_date` must be date objects.")
+        if from_date > to_date:
+            raise ValueError("Error: `from_date` must be before `to_date`.")
+        # the first windows may start on a non market day
+        matrix = self.price_matrix(
+            from_date - timedelta(days=window_days + ASOF_LOOKBACK_DAYS),
+            to_date,
+            max_workers,
+        )
+        rolling = rolling_returns(matrix.values(), matrix.ordinals, window_days)
+        keep = rolling.ordinals >= from_date.toordinal()
+        return RollingReturns(
+            ordinals=rolling.ordinals[keep],
+            start_ordinals=rolling.start_ordinals[keep],
+            overall=rolling.overall[keep],
+            annualized=rolling.annualized[keep],
+            window_days=window_days,
+        )
+
+    def time_weighted_return(
+        self, from_date: date, to_date: date, max_workers: Optional[int] = None
+    ) -> float:
+        """Get the time-weighted return of the ledger holdings between two dates.
+
+        Holdings of each day are computed from the ledger movements, so the
+        return is weighted by the real quantities held, and buys and sells
+        are not counted as profit. All the prices of each active are fetched
+        once and the whole period is evaluated in a single pass.
+
+        Args:
+                from_date (date): Start date of the period.
+                to_date (date): End date of the period.
+                max_workers (int): Number of threads to get the prices of the
+                    actives with. Defaults to the portafolio's `max_workers`.
+        Returns:
+                (float): Portafolio's time-weighted return between the given dates.
+                    0.01 means 1%
+        """
+        if len(self.ledger) == 0:
+            return 0.0
+        if not (isinstance(from_date, date) & isinstance(to_date, date)):
+            raise ValueError("Error: `from_date` and `to_date` must be date objects.")
+        if from_date > to_date:
+            raise ValueError("Error: `from_date` must be before `to_date`.")
+
+        actives, columns = self.ledger.instruments()
+        series = self._map_actives(
+            lambda active: active.price_arrays(from_date=from_date, to_date=to_date),
+            max_workers,
+            actives,
+        )
+        matrix = PriceMatrix.from_series(series)
+        flows = self.ledger.flows_matrix(matrix.ordinals, columns)
+        return time_weighted_return(matrix.prices, flows)
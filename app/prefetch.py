@@ -0,0 +1,151 @@
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Hashable, List, Optional
+
+from actives.abstract import Active
+from console import logger
+from portafolio import Portafolio
+from transactions import active_key
+
+# priority of the prefetch requests in the rate limiter queue, so requests
+# of users (priority 0) are served first.
+PREFETCH_PRIORITY = 10
+
+
+class PricePrefetcher:
+    """Keeps the price series of the registered portafolios warm in the cache.
+
+    `warm_up` fetches the series of every active held by the registered
+    portafolios (through their price handlers and caches), so `profit` and
+    the other returns are served from the cache. `start` runs a background
+    thread that refreshes them every day after the market close.
+
+    Requests are made with a low priority (`PREFETCH_PRIORITY`) in the rate
+    limiter of the price handlers, so they never delay user requests.
+
+    Args:
+        history_days: Days of history to keep warm (until today).
+        refresh_hour_utc: Hour (UTC) of the daily refresh, after the close
+            of the markets.
+        max_workers: Number of threads fetching the series concurrently.
+    """
+
+    def __init__(
+        self,
+        history_days: int = 365,
+        refresh_hour_utc: int = 22,
+        max_workers: int = 1,
+    ):
+        self.history_days = history_days
+        self.refresh_hour_utc = refresh_hour_utc
+        self.max_workers = max_workers
+        self._portafolios: Dict[int, weakref.ref] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, portafolio: Portafolio) -> None:
+        """Keep the actives of the portafolio warm (until it is garbage collected)."""
+        key = id(portafolio)
+
+        def forget(_, key=key):
+            with self._lock:
+                self._portafolios.pop(key, None)
+
+        with self._lock:
+            self._portafolios[key] = weakref.ref(portafolio, forget)
+
+    def unregister(self, portafolio: Portafolio) -> None:
+        with self._lock:
+            self._portafolios.pop(id(portafolio), None)
+
+    def actives(self) -> List[Active]:
+        """Distinct actives held (or in the ledger) of the registered portafolios."""
+        with self._lock:
+            portafolios = [ref() for ref in self._portafolios.values()]
+        distinct: Dict[Hashable, Active] = {}
+        for portafolio in portafolios:
+            if portafolio is None:
+                continue
+            held, _ = portafolio.instruments()
+            traded, _ = portafolio.ledger.instruments()
+            for active in held + traded:
+                distinct.setdefault(active_key(active), active)
+        return list(distinct.values())
+
+    def warm_up(self, to_date: Optional[date] = None) -> dict:
+        """Fetch the series of every registered active into the caches.
+
+        Args:
+            to_date: Most recent date to fetch (default today).
+        Returns:
+            Summary with the amount of actives, the symbols that failed and
+            the seconds it took.
+        """
+        to_date = to_date or date.today()
+        from_date = to_date - timedelta(days=self.history_days)
+        actives = self.actives()
+        logger.info("Prefetching the prices of %s actives", len(actives))
+
+        def fetch(active: Active) -> Optional[str]:
+            try:
+                active.price_arrays(
+                    from_date=from_date, to_date=to_date, priority=PREFETCH_PRIORITY
+                )
+            except Exception as e:  # keep prefetching the other actives
+                logger.error("Error prefetching %s: %s", active.symbol, e)
+                return active.symbol
+            return None
+
+        start = time.perf_counter()
+        if self.max_workers > 1 and len(actives) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                failed = list(executor.map(fetch, actives))
+        else:
+            failed = [fetch(active) for active in actives]
+        return {
+            "actives": len(actives),
+            "failed": [symbol for symbol in failed if symbol is not None],
+            "seconds": time.perf_counter() - start,
+        }
+
+    def seconds_until_refresh(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next daily refresh."""
+        now = now or datetime.now(timezone.utc)
+        refresh = now.replace(
+            hour=self.refresh_hour_utc, minute=0, second=0, microsecond=0
+        )
+        if refresh <= now:
+            refresh += timedelta(days=1)
+        return (refresh - now).total_seconds()
+
+    def start(self, warm_up: bool = True) -> None:
+        """Start the background refresh thread.
+
+        Args:
+            warm_up: Warm up the caches right away (in the background thread)
+                before waiting for the first daily refresh.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(warm_up,), name="price-prefetcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, warm_up: bool) -> None:
+        if warm_up:
+            self.warm_up()
+        while not self._stop.wait(self.seconds_until_refresh()):
+            self.warm_up()
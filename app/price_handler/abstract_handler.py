@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 from datetime import date
 
+NAN = float("nan")
+
 
 class PriceHandler(ABC):
     """Abstract class for price handlers"""
@@ -23,3 +25,73 @@ class PriceHandler(ABC):
            Price of the active at the given observation time.
         """
         pass
+
+    @classmethod
+    @abstractmethod
+    def get_active_price_series(
+        cls,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        value="close",
+        active="stock",
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Returns the prices of the active for a window or a list of dates.
+
+        All the prices are taken from a single fetch of the active's time series.
+
+        Args:
+           symbol: Symbol of the active.
+           from_date: Start date of the window (inclusive).
+           to_date: End date of the window (inclusive).
+           dates: Observation dates to consult price of. If given, the
+              window is ignored.
+
+        Returns:
+           Tuple of (dates, prices). For a window, the dates with a price
+           available between `from_date` and `to_date`, from oldest to newest.
+           For a list of dates, the same given dates and their prices
+           (None if the price is not available).
+        """
+        pass
+
+    @classmethod
+    def get_active_price_arrays(
+        cls,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        value="close",
+        active="stock",
+        **kwargs,
+    ) -> Tuple[Sequence[int], Sequence[float]]:
+        """Returns the prices of the active for a window as flat arrays.
+
+        Meant for bulk evaluation (e.g. `PriceMatrix`), without building a
+        date object per day. By default it converts the result of
+        `get_active_price_series`; handlers with columnar data should return
+        slices of it instead.
+
+        Args:
+           symbol: Symbol of the active.
+           from_date: Start date of the window (inclusive).
+           to_date: End date of the window (inclusive).
+
+        Returns:
+           Tuple of (ordinals, prices): the date ordinals with a price
+           available in the window, from oldest to newest, and their prices
+           (NaN if the price is not available).
+        """
+        dates, prices = cls.get_active_price_series(
+            symbol,
+            from_date=from_date,
+            to_date=to_date,
+            value=value,
+            active=active,
+            **kwargs,
+        )
+        return (
+            [d.toordinal() for d in dates],
+            [NAN if price is None else price for price in prices],
+        )
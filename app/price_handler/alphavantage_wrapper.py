@@ -1,15 +1,46 @@
-import requests
 import os
-from datetime import date, timedelta, datetime
-from typing import List, Optional
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from console import console
+from console import logger
+from instrumentation import instruments
 from price_handler import abstract_handler
+from price_handler.http_client import HttpClient
+from price_handler.price_cache import CachedSeries, get_price_cache
+from price_handler.rate_limiter import RateLimiter, backoff_delay
+from price_handler.series import NAN, PriceSeries
+from price_handler.single_flight import SingleFlight
+from price_handler.streaming import parse_time_series
+
+if TYPE_CHECKING:
+    import requests
 
 
 class Alphavantage(abstract_handler.PriceHandler):
     """Wrapper for Alphavantage API.
 
+    Requests to the API are rate limited to `calls_per_minute` and
+    `calls_per_day` (free tier limits by default). If the API still answers
+    that the limit was exceeded, the request is retried up to `max_retries`
+    times with an exponential backoff starting at `retry_backoff` seconds.
+    Transport errors (`transport_errors`: timeouts, dropped connections) are
+    retried the same way, starting at `transport_retry_backoff` seconds.
+
+    Responses are parsed while they are downloaded (`stream_responses`), into
+    typed columns, without loading the whole json response in memory: the
+    candles of each chunk are decoded at once with `json`, so it takes about
+    the time of `response.json()` with a fraction of its peak memory.
+
+    Requests are made through `http_client`, a pool of keep-alive connections
+    (created on first use). Assign an `HttpClient` to tune its pool size and
+    timeouts, or to point it to another server.
+
+    Requests (count, errors, latency, bytes downloaded) and cache hits and
+    misses are recorded in `instrumentation.instruments` (when enabled),
+    under the `instrument_name` prefix.
+
     For more information please visit:
         https://www.alphavantage.co/documentation/
     """
@@ -18,25 +49,99 @@ class Alphavantage(abstract_handler.PriceHandler):
     active_types = ("stock", "crypto")
     data_dir = "./data/alphavantage/"
     compact_threshold = 99
+    # hour (UTC) after which the daily candle of the day is available
+    market_close_hours = {"stock": 21, "crypto": 0}
+    time_series_keys = {
+        "stock": "Time Series (Daily)",
+        "crypto": "Time Series (Digital Currency Daily)",
+    }
+
+    calls_per_minute = 5
+    calls_per_day = 500
+    max_retries = 3
+    retry_backoff = 15.0
+    max_retry_backoff = 120.0
+    transport_retry_backoff = 1.0
+    transport_errors: Optional[tuple] = None
+    rate_limiter: Optional[RateLimiter] = None
+    http_client: Optional[HttpClient] = None
+    stream_responses = True
+    stream_chunk_size = 64 * 1024
+    instrument_name = "alphavantage"
+
+    _in_flight = SingleFlight()
+
+    @classmethod
+    def get_rate_limiter(cls) -> RateLimiter:
+        """Returns the rate limiter of the API requests (created on first use)."""
+        if cls.rate_limiter is None:
+            cls.rate_limiter = RateLimiter(
+                calls_per_minute=cls.calls_per_minute,
+                calls_per_day=cls.calls_per_day,
+            )
+        return cls.rate_limiter
+
+    @classmethod
+    def get_http_client(cls) -> HttpClient:
+        """Returns the HTTP client of the API requests (created on first use)."""
+        if cls.http_client is None:
+            cls.http_client = HttpClient()
+        return cls.http_client
+
+    @classmethod
+    def get_transport_errors(cls) -> tuple:
+        """Returns the retried transport errors (by default timeouts and
+        dropped connections of `requests`, imported on first use)."""
+        if cls.transport_errors is None:
+            import requests
+
+            cls.transport_errors = (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+            )
+        return cls.transport_errors
+
+    # wording of the API notes about the call frequency. Other notes share
+    # the same greeting (e.g. premium endpoints) and must not be retried.
+    throttling_notes = ("call frequency", "rate limit", "more sparingly")
+
+    @classmethod
+    def _is_throttled(cls, data: dict) -> bool:
+        """Check if the API response is a rate limit (throttling) note."""
+        message = (data.get("Note", "") + data.get("Information", "")).lower()
+        return any(note in message for note in cls.throttling_notes)
 
     @classmethod
     def _request_active_quote(
-        cls, symbol: str, outputsize: str = "compact", active_type: str = "stock"
-    ) -> Optional[dict]:
+        cls,
+        symbol: str,
+        outputsize: str = "compact",
+        active_type: str = "stock",
+        priority: int = 0,
+    ) -> Optional[PriceSeries]:
         """Get the active quates from Alphavantage API.
 
+        Waits for the rate limiter before each request, and retries with
+        backoff if the API answers that the rate limit was exceeded.
+
         Args:
            symbol: Symbol of the active (it can be crypto or stock symbol).
            outputsize: Size of the output. 'compact' return last 100 days.
               And 'full' return all available data.
            active_type: Type of the active. 'stock' or 'crypto'.
+           priority: Priority of the request in the rate limiter queue
+              (lower values are served first).
 
         Returns:
-           dict or None: dictionary with all the daily prices of the active
+           PriceSeries or None: all the daily prices of the active. None if
+              the API answered with an error message.
         """
-        console.log(
-            f"Getting quotes for active type {active_type} - {symbol}"
-            f" (outputsize: {outputsize})"
+        logger.info(
+            "Getting quotes for active type %s - %s (outputsize: %s)",
+            active_type,
+            symbol,
+            outputsize,
         )
         if active_type not in cls.active_types:
             raise ValueError("active_type must be 'stock' or 'crypto'")
@@ -57,146 +162,369 @@ class Alphavantage(abstract_handler.PriceHandler):
                 + f'{os.getenv("ALPHAVANTAGE_API_KEY")}'
             )
         else:
-            console.log(f"active_type: {active_type} not supported yet.")
+            logger.error("active_type: %s not supported yet.", active_type)
             return None
 
-        response = requests.get(url)
-        if response.ok:
-            data = response.json()
-        else:
-            return None
+        time_series_key = cls.time_series_keys[active_type]
+        rate_limiter = cls.get_rate_limiter()
+        http_client = cls.get_http_client()
+        for attempt in range(cls.max_retries + 1):
+            rate_limiter.acquire(priority)
+            instruments.incr(f"{cls.instrument_name}.requests")
+            start = time.perf_counter()
+            try:
+                with http_client.get(url, stream=cls.stream_responses) as response:
+                    if not response.ok:
+                        return None
+                    series, data = cls._parse_response(response, time_series_key)
+            except cls.get_transport_errors() as e:
+                instruments.incr(f"{cls.instrument_name}.request_errors")
+                if attempt == cls.max_retries:
+                    raise ValueError(
+                        "Error: request to the API failed.",
+                        f"error message: {e!r}",
+                    ) from e
+                delay = backoff_delay(
+                    attempt, cls.transport_retry_backoff, cls.max_retry_backoff
+                )
+                logger.warning(
+                    "Warning: API request failed (%r). Retrying in %s seconds.",
+                    e,
+                    delay,
+                )
+                time.sleep(delay)
+                continue
+            finally:
+                instruments.observe(
+                    f"{cls.instrument_name}.request_seconds",
+                    time.perf_counter() - start,
+                )
+            if series is not None:
+                return series
+            if not cls._is_throttled(data):
+                break
+
+            rate_limiter.throttled()
+            if attempt == cls.max_retries:
+                raise ValueError(
+                    "Error: API free tier requests has been exceeded.",
+                    "error message: " + data.get("Note", data.get("Information", "")),
+                )
+            delay = backoff_delay(attempt, cls.retry_backoff, cls.max_retry_backoff)
+            logger.warning(
+                "Warning: API rate limit reached. Retrying in %s seconds.", delay
+            )
+            time.sleep(delay)
+
         if "Error Message" in data:
-            console.log(f"Error in Alphanvatage API request: {data['Error Message']}")
+            logger.error("Error in Alphanvatage API request: %s", data["Error Message"])
             return None
-        return data
+        raise ValueError(
+            "Error: no valuable data returned from API.",
+            "error message: " + str(data),
+        )
+
+    @classmethod
+    def _parse_response(
+        cls, response: "requests.Response", time_series_key: str
+    ) -> Tuple[Optional[PriceSeries], Optional[dict]]:
+        """Parse the time series of the API response.
 
-    def _get_searched_value(searched_value: str, values: dict) -> Optional[float]:
-        """Get the searched value from the ticker data.
-        Args:
-            searched_value: Value to search in the ticker data.
-            values: Dictionary with the ticker data of the searched day.
         Returns:
-            Value of the searched value (None if not found).
+            Tuple of (series, None) if the response has the time series,
+            else (None, response json).
         """
-        for value in values:
-            if searched_value in value:
-                price = values[value]
-                price = float(price)
-                return price
-        console.log(f"Value not found: {searched_value}")
-        return None
-
-    def _is_date_in_ticker_data(searched_date: str, dates: List[str]) -> bool:
-        """Check if the searched date is in the ticker data.
+        if cls.stream_responses:
+            chunks = response.iter_content(chunk_size=cls.stream_chunk_size)
+            if instruments.enabled:
+                chunks = cls._counted(chunks)
+            return parse_time_series(chunks, time_series_key)
+        instruments.incr(f"{cls.instrument_name}.bytes", len(response.content))
+        data = response.json()
+        if time_series_key in data:
+            return PriceSeries.from_time_series(data[time_series_key]), None
+        return None, data
+
+    @classmethod
+    def _counted(cls, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Count the bytes downloaded of the chunks of a streamed response."""
+        for chunk in chunks:
+            instruments.incr(f"{cls.instrument_name}.bytes", len(chunk))
+            yield chunk
+
+    @staticmethod
+    def _resolve_column(searched_value: str, series: PriceSeries) -> Optional[array]:
+        """Get the column of the searched value from the ticker data.
+
+        Resolved once per series (`PriceSeries.resolve`), so each price is a
+        plain index of the column.
+
         Args:
-            searched_date: Date to search in the ticker data.
-                format: YYYY-MM-DD
-            dates: List of dates in the ticker data.
+            searched_value: Value to search in the ticker data (e.g. 'close'
+                matches '4. close', and '4a. close (USD)' before
+                '4b. close (USD)').
+            series: Ticker data.
         Returns:
-            True if the searched date is in the ticker data, else False.
+            Values of the field of the searched value (None if not found).
         """
-        if searched_date not in dates:
-            dates_list = list(dates)
-            _from = dates_list[-1]
-            _to = dates_list[0]
-            console.log(f"Date not found. Avaliable range: [{_from}, {_to}]")
-            return False
-
-        return True
-
-    def _if_obs_date_too_current_replace_with_latest(
-        searched_date: date, available_dates: List[str]
-    ) -> date:
-        """Check if the searched date is most recent than the latest date.
-
-        If the requested date is not available yet, it will be replaced
-        by the latest date available.
+        column = series.column(searched_value)
+        if column is None:
+            logger.error("Value not found: %s", searched_value)
+        return column
+
+    @staticmethod
+    def _get_searched_value(column: Optional[array], i: int) -> Optional[float]:
+        """Get the value of the i-th day of a resolved column.
+
+        Returns:
+            Value of the day (None if the column was not found or the day has
+            no value).
         """
-        # Convert list into datetime objects for greater comparations.
-        _available_dates = [
-            datetime.strptime(x, "%Y-%m-%d").date() for x in available_dates
-        ]
+        if column is None:
+            return None
+        price = column[i]
+        return price if price == price else None  # NaN: no value
+
+    def _asof_index(searched_date: date, index: PriceSeries) -> Optional[int]:
+        """Get the position of the searched date in the ticker data.
+
+        Non market days (weekends, holidays) are resolved to the previous
+        market day. If the requested date is not available yet, it will be
+        replaced by the latest date available.
 
-        # get most recent date
-        _available_dates.sort(reverse=True)
-        latest_record = _available_dates[0]
+        Args:
+            searched_date: Date to search in the ticker data.
+            index: Date index of the ticker data.
+        Returns:
+            Position of the date in the ticker data. None if the date is
+            older than the available data.
+        """
+        i = index.asof(searched_date)
+        if i is None:
+            logger.warning(
+                "Date not found. Avaliable range: [%s, %s]",
+                index.first_date,
+                index.latest_date,
+            )
+            return None
 
-        if searched_date > latest_record:
-            console.log(
+        if i == len(index) - 1 and searched_date > index.latest_date:
+            logger.debug(
                 "Warning: searched data is too current and is not available yet."
-                f" Getting lastest data: {latest_record}",
-                style="yellow",
+                " Getting lastest data: %s",
+                index.latest_date,
             )
-            return latest_record
-        return searched_date
+        return i
 
     @classmethod
-    def _non_cached_active_price_by_date(
-        cls, symbol: str, obs_date: date, value: str, active: str
-    ) -> Optional[float]:
-        # Define if should get all data or only last 100 days (lighter request)
-        output_size = "compact"
-        if obs_date <= date.today() - timedelta(days=cls.compact_threshold):
-            console.log(
+    def _request_time_series(
+        cls,
+        symbol: str,
+        oldest_date: date,
+        active: str,
+        priority: int = 0,
+        newest_date: Optional[date] = None,
+    ) -> Optional[CachedSeries]:
+        """Request the daily time series of the active to the API and cache it.
+
+        Concurrent requests of the same symbol, output size and active type
+        share a single API call and a single merge into the cache: waiters get
+        the merged cached series. A 'full' request in flight also serves
+        'compact' requests.
+
+        Args:
+            symbol: Symbol of the ticket.
+            oldest_date: Oldest date the time series must include. With the
+                cached series, defines if a 'compact' or 'full' output size is
+                requested (see `_output_size`).
+            active: Type of active (stock or crypto).
+            priority: Priority of the request in the rate limiter queue.
+            newest_date: Newest date needed. If given, the cache is checked
+                again before the API call: a request that just finished may
+                have cached the dates after the caller checked the cache.
+        Returns:
+            Cached daily time series (merged with the new data).
+            None if no data was returned.
+        """
+        if active not in cls.active_types:
+            logger.error('Active must be "stock" or "crypto"')
+            return None
+
+        cached = get_price_cache(cls.data_dir).get(symbol, active)
+        output_size = cls._output_size(cached, oldest_date)
+
+        key = (
+            cls.base_url,
+            os.path.abspath(cls.data_dir),
+            symbol.upper(),
+            active,
+            output_size,
+        )
+        alternates = ()
+        if output_size == "compact":
+            alternates = (key[:-1] + ("full",),)
+        return cls._in_flight.do(
+            key,
+            lambda: cls._fetch_time_series(
+                symbol, oldest_date, active, output_size, priority, newest_date
+            ),
+            alternates=alternates,
+        )
+
+    @classmethod
+    def _output_size(cls, cached: Optional[CachedSeries], oldest_date: date) -> str:
+        """Define if should get all data or only last 100 days (lighter request).
+
+        If the cached series already has the history since `oldest_date`, only
+        its missing tail is requested ('compact'), unless the tail is older
+        than the compact window. Without history, 'full' is only requested
+        for dates older than the compact window.
+        """
+        compact_since = date.today() - timedelta(days=cls.compact_threshold)
+        if cached is not None and len(cached.series):
+            has_history = cached.full or cached.series.first_date <= oldest_date
+            if has_history and cached.series.latest_date >= compact_since:
+                logger.debug("Refreshing the tail of the cached time series.")
+                return "compact"
+            if has_history:
+                logger.debug(
+                    "Cached time series is older than 100 days."
+                    " Will have to use 'outputsize=full' to fill the gap."
+                )
+                return "full"
+
+        if oldest_date <= compact_since:
+            logger.debug(
                 "Required observation date for the ticket is older than"
                 " 100 days. Will have to use 'outputsize=full' to get"
                 " the full time series."
             )
-            output_size = "full"
+            return "full"
+        return "compact"
 
-        # Get the ticker data
-        if active == "stock":
-            data = cls._request_active_quote(
-                symbol, outputsize=output_size, active_type="stock"
-            )
-            time_series_key = "Time Series (Daily)"
-        elif active == "crypto":
-            data = cls._request_active_quote(
-                symbol, outputsize=output_size, active_type="crypto"
-            )
-            time_series_key = "Time Series (Digital Currency Daily)"
-        else:
-            console.log('Active must be "stock" or "crypto"')
-            return None
+    @classmethod
+    def _last_market_close(cls, active: str, now: Optional[datetime] = None) -> float:
+        """Time (seconds since the epoch) of the last daily candle close.
 
-        # Check if data is available
-        if data is None:
-            console.log("Error: no valuable data returned from API.")
-            return None
+        Stock markets do not close on weekends, crypto markets close every day.
+        """
+        now = now or datetime.now(timezone.utc)
+        close = now.replace(
+            hour=cls.market_close_hours[active], minute=0, second=0, microsecond=0
+        )
+        if close > now:
+            close -= timedelta(days=1)
+        while active == "stock" and close.weekday() >= 5:
+            close -= timedelta(days=1)
+        return close.timestamp()
 
-        try:
-            available_dates = list(data[time_series_key].keys())
-        except KeyError as e:
-            if "Note" in data:
-                if "Thank you for using Alpha Vantage!" in data["Note"]:
-                    raise ValueError(
-                        "Error: API free tier requests has been exceeded.",
-                        "error message: " + data["Note"],
-                    )
-            else:
-                raise ValueError(
-                    "Error: no valuable data returned from API.",
-                    "error message: " + str(e),
-                )
-        # Check if requested date is too new and replace it with the latest
-        _obs_date = cls._if_obs_date_too_current_replace_with_latest(
-            obs_date, available_dates
+    @classmethod
+    def _is_fresh(cls, cached: CachedSeries) -> bool:
+        """Check if the series was refreshed after the last market close.
+
+        A fresh series has all the candles the API has, so newer dates are
+        resolved to its latest date instead of requesting the API again.
+        """
+        return (
+            cached.refreshed_at is not None
+            and cached.refreshed_at >= cls._last_market_close(cached.active)
         )
-        _obs_date_str = _obs_date.strftime("%Y-%m-%d")
 
-        # Extract from api response the price of specified date
-        _found = cls._is_date_in_ticker_data(
-            searched_date=_obs_date_str, dates=available_dates
+    @classmethod
+    def _fetch_time_series(
+        cls,
+        symbol: str,
+        oldest_date: date,
+        active: str,
+        output_size: str,
+        priority: int = 0,
+        newest_date: Optional[date] = None,
+    ) -> Optional[CachedSeries]:
+        """Request the time series to the API and merge it into the cache.
+
+        Skips the request if the cache covers the dates by now (see
+        `_request_time_series`).
+        """
+        if newest_date is not None:
+            cached = get_price_cache(cls.data_dir).get(symbol, active)
+            if cls._covers(cached, oldest_date, newest_date):
+                return cached
+        series = cls._request_active_quote(
+            symbol, outputsize=output_size, active_type=active, priority=priority
         )
-        if not _found:
+
+        # Check if data is available
+        if series is None:
+            logger.error("Error: no valuable data returned from API.")
             return None
 
-        day_values = data[time_series_key][_obs_date_str]
-        price = cls._get_searched_value(searched_value=value, values=day_values)
+        # save new data in cache
+        cls._save_new_price_data(symbol, oldest_date, active, series, output_size)
+
+        return get_price_cache(cls.data_dir).get(symbol, active)
+
+    @classmethod
+    def _prices_from_series(
+        cls, symbol: str, cached: CachedSeries, obs_dates: Sequence[date], value: str
+    ) -> List[Optional[float]]:
+        """Extract the prices of the given dates from a cached time series."""
+        series = cached.series
+        column = cls._resolve_column(value, series)
+        prices = []
+        for obs_date in obs_dates:
+            i = cls._asof_index(obs_date, series)
+            if i is None:
+                prices.append(None)
+                continue
+            price = cls._get_searched_value(column, i)
+            logger.debug("%s price on %s: %s", symbol, series.date_at(i), price)
+            prices.append(price)
+        return prices
+
+    @classmethod
+    def _price_from_series(
+        cls, symbol: str, cached: CachedSeries, obs_date: date, value: str
+    ) -> Optional[float]:
+        """Extract the price of the given date from a cached time series."""
+        return cls._prices_from_series(symbol, cached, [obs_date], value)[0]
 
-        console.log(f"{symbol} price on {_obs_date_str}: {price}")
+    @classmethod
+    def _series_between(
+        cls,
+        symbol: str,
+        oldest_date: date,
+        newest_date: date,
+        active: str,
+        priority: int = 0,
+    ) -> Optional[CachedSeries]:
+        """Get the daily time series of the active covering the given dates.
+
+        Uses the cached series if it already covers the dates (or if it was
+        refreshed after the last market close), else makes a single request
+        to the API.
+        """
+        cached = get_price_cache(cls.data_dir).get(symbol, active)
+        if cls._covers(cached, oldest_date, newest_date):
+            instruments.incr(f"{cls.instrument_name}.cache_hits")
+            return cached
+
+        instruments.incr(f"{cls.instrument_name}.cache_misses")
+        logger.debug("Price series not cached. Getting new data from API.")
+        return cls._request_time_series(
+            symbol, oldest_date, active, priority, newest_date=newest_date
+        )
 
-        return price
+    @classmethod
+    def _covers(
+        cls, cached: Optional[CachedSeries], oldest_date: date, newest_date: date
+    ) -> bool:
+        """Check if the cached series covers the dates (up to its latest date
+        if it was refreshed after the last market close)."""
+        return cached is not None and (
+            cached.covers(oldest_date, newest_date)
+            or cls._is_fresh(cached)
+            and cached.covers(oldest_date, min(newest_date, cached.series.latest_date))
+        )
 
     @classmethod
     def _price_cached(
@@ -210,14 +538,22 @@ class Alphavantage(abstract_handler.PriceHandler):
             value: Value to search in the ticker data.
             active: Type of active (stock or crypto).
         Returns:
-            Price of the symbol on the obs_date. If not found in the cache
-            folder, will return None
+            Price of the symbol on the obs_date (or on the previous market day).
+            If not found in the cache folder, will return None
         """
-        pass
+        cached = get_price_cache(cls.data_dir).get(symbol, active)
+        if cached is None or not cached.covers(obs_date, obs_date):
+            return None
+        return cls._price_from_series(symbol, cached, obs_date, value)
 
     @classmethod
     def _save_new_price_data(
-        cls, symbol: str, obs_date: date, active: str, data: dict
+        cls,
+        symbol: str,
+        obs_date: date,
+        active: str,
+        data: PriceSeries,
+        outputsize: str = "compact",
     ) -> None:
         """Save new price data as json in the cache folder.
         Save method is like a merge so if the data cached is "full" data instead of
@@ -227,11 +563,16 @@ class Alphavantage(abstract_handler.PriceHandler):
             symbol: Symbol of the stock or crypto.
             obs_date: Observation date of the price.
             active: Active type of the stock or crypto.
-            data: Data to save.
+            data: Data to save (daily time series returned by the API).
+            outputsize: Output size of the request that returned `data`.
         Returns:
             None
         """
-        pass
+        if not len(data):
+            return
+        get_price_cache(cls.data_dir).merge(
+            symbol, active, data, full=outputsize == "full"
+        )
 
     @classmethod
     def get_active_price_by_date(
@@ -240,6 +581,7 @@ class Alphavantage(abstract_handler.PriceHandler):
         obs_date: Optional[date] = None,
         value="close",
         active="stock",
+        priority: int = 0,
         **kwargs,
     ) -> Optional[float]:
         """Get stock price for the given date.
@@ -254,6 +596,8 @@ class Alphavantage(abstract_handler.PriceHandler):
                     'close', 'volume', 'market cap')
             active: type of active. Accepted values: ('stock', 'crypto')
                 Default: 'stock'
+            priority: priority of the API request (if needed) in the rate
+                limiter queue. Lower values are served first. Default: 0
 
         Returns:
             A float representing the price of the active
@@ -268,33 +612,129 @@ class Alphavantage(abstract_handler.PriceHandler):
             - Because the API returns the daily candles, the most recent
                 date available is lastest close market day.
         """
-        console.log(
-            f"""Getting active price by date for:
-             - symbol: {symbol}
-             - obs_date: {obs_date}
-             - value: {value}
-             - active: {active}"""
+        logger.debug(
+            """Getting active price by date for:
+             - symbol: %s
+             - obs_date: %s
+             - value: %s
+             - active: %s""",
+            symbol,
+            obs_date,
+            value,
+            active,
         )
 
         # If no obs date delivered, will be replaced by today
         if obs_date is None:
-            console.log(
-                "Warning: No obs_date provided. Getting today's date.", style="yellow"
-            )
+            logger.warning("Warning: No obs_date provided. Getting today's date.")
             obs_date = date.today()
 
-        # check if price date was already cached
-        price_cached = cls._price_cached(symbol, obs_date, value, active)
+        # the API is only requested if the cached series does not cover the
+        # date. A covered date without price (e.g. older than the full
+        # history) is not requested again.
+        cached = cls._series_between(symbol, obs_date, obs_date, active, priority)
+        if cached is None:
+            return None
+        return cls._price_from_series(symbol, cached, obs_date, value)
 
-        if price_cached is None:
-            console.log("Price not cached. Getting new data from API.")
-            price = cls._non_cached_active_price_by_date(
-                symbol=symbol, obs_date=obs_date, value=value, active=active
-            )
+    @classmethod
+    def get_active_price_series(
+        cls,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        value="close",
+        active="stock",
+        priority: int = 0,
+        **kwargs,
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Get stock prices for a window or a list of dates.
+
+        Args:
+            symbol: stock symbol (e.g. AAPL, MSFT, GOOGL)
+            from_date: start date of the window (inclusive).
+            to_date: end date of the window (inclusive).
+            dates: observation dates. If given, the window is ignored.
+            value: value of the daily candles to return.
+                Accepted values: ('open', 'high', 'low',
+                    'close', 'volume', 'market cap')
+            active: type of active. Accepted values: ('stock', 'crypto')
+            priority: priority of the API request (if needed) in the rate
+                limiter queue. Lower values are served first.
 
-            # save new price in cache
-            cls._save_new_price_data(symbol, obs_date, active, price)
+        Returns:
+            Tuple of (dates, prices). For a window, the market days between
+                `from_date` and `to_date` (from oldest to newest). For a list
+                of dates, the given dates and their prices (None if not found).
 
+        Notes:
+            - Whatever the amount of dates, at most one request is made to the
+                API, and none if the cached time series covers them.
+        """
+        if dates is None:
+            if from_date is None or to_date is None:
+                raise ValueError("Either `dates` or `from_date`/`to_date` needed.")
+            if from_date > to_date:
+                raise ValueError("from_date must be < to_date")
+            oldest_date, newest_date = from_date, to_date
         else:
-            price = price_cached
-        return price
+            dates = list(dates)
+            if not dates:
+                return [], []
+            oldest_date, newest_date = min(dates), max(dates)
+
+        cached = cls._series_between(symbol, oldest_date, newest_date, active, priority)
+
+        if dates is not None:
+            if cached is None:
+                return dates, [None] * len(dates)
+            return dates, cls._prices_from_series(symbol, cached, dates, value)
+
+        if cached is None:
+            return [], []
+        series = cached.series
+        window = series.window(from_date, to_date)
+        column = cls._resolve_column(value, series)
+        prices = [cls._get_searched_value(column, i) for i in window]
+        return [series.date_at(i) for i in window], prices
+
+    @classmethod
+    def get_active_price_arrays(
+        cls,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        value="close",
+        active="stock",
+        priority: int = 0,
+        **kwargs,
+    ) -> Tuple[array, array]:
+        """Get stock prices for a window as slices of the cached columns.
+
+        Args:
+            symbol: stock symbol (e.g. AAPL, MSFT, GOOGL)
+            from_date: start date of the window (inclusive).
+            to_date: end date of the window (inclusive).
+            value: value of the daily candles to return.
+            active: type of active. Accepted values: ('stock', 'crypto')
+            priority: priority of the API request (if needed) in the rate
+                limiter queue. Lower values are served first.
+
+        Returns:
+            Tuple of (ordinals, prices) of the market days between `from_date`
+                and `to_date` (from oldest to newest). Missing prices are NaN.
+        """
+        if from_date > to_date:
+            raise ValueError("from_date must be < to_date")
+
+        cached = cls._series_between(symbol, from_date, to_date, active, priority)
+        if cached is None:
+            return array("l"), array("d")
+        series = cached.series
+        window = series.window(from_date, to_date)
+        lo, hi = window.start, window.stop
+        column = cls._resolve_column(value, series)
+        if column is None:
+            return series.ordinals[lo:hi], array("d", [NAN]) * len(window)
+        return series.ordinals[lo:hi], column[lo:hi]
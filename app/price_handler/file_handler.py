@@ -0,0 +1,366 @@
+import csv
+import gzip
+import os
+import threading
+from array import array
+from datetime import date
+from itertools import repeat
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+import numpy as np
+
+from console import logger
+from price_handler import abstract_handler
+from price_handler.series import NAN, PriceSeries
+
+# bytes of the lines parsed at once into numpy columns
+CHUNK_BYTES = 4 << 20
+KEY_FIELDS = ("symbol", "date", "type")
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def _dump_files(paths: Iterable[str]) -> List[str]:
+    """Dump files of the paths (directories are expanded to their csv files)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path)
+                if name.endswith((".csv", ".csv.gz"))
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def _read_chunks(f: TextIO, fields: int) -> Iterator[List[Sequence[str]]]:
+    """Columns of the rows of the csv file, a chunk of lines at a time.
+
+    Chunks without quotes are split as a whole (much faster than parsing
+    each row), the others are parsed by `csv`.
+    """
+    while True:
+        lines = f.readlines(CHUNK_BYTES)
+        if not lines:
+            return
+        text = ",".join(lines).replace("\r", "").replace("\n", "")
+        values = text.split(",")
+        if '"' in text or len(values) != fields * len(lines):
+            rows = [row for row in csv.reader(lines) if row]
+            if rows and any(len(row) != fields for row in rows):
+                raise ValueError("Error: rows with a different amount of fields.")
+            if rows:
+                yield [list(column) for column in zip(*rows)]
+            continue
+        yield [values[i::fields] for i in range(fields)]
+
+
+def _encode(values: Sequence, table: dict, resolve: Callable) -> np.ndarray:
+    """Codes of the values in the table, resolving once each new value."""
+    for value in set(values).difference(table):
+        table[value] = resolve(value)
+    return np.fromiter(map(table.__getitem__, values), np.int64, len(values))
+
+
+class PriceStore:
+    """Daily prices of many actives, in a single set of columns.
+
+    The rows of every active are stored one after the other (sorted by date)
+    in an ordinals array and a float column per field, and `positions` maps
+    each (active type, SYMBOL) to its rows. The series of an active are
+    memoryviews of its rows, so reading them does not copy the data.
+
+    Args:
+        ordinals: Date ordinals of all the rows.
+        columns: Values of each field, aligned with `ordinals`.
+        positions: (start, stop) rows of each (active type, SYMBOL).
+    """
+
+    def __init__(
+        self,
+        ordinals: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        positions: Dict[Tuple[str, str], Tuple[int, int]],
+    ):
+        self.ordinals = ordinals
+        self.columns = columns
+        self.positions = positions
+        self._series: Dict[Tuple[str, str], PriceSeries] = {}
+        ordinals_view = memoryview(ordinals)
+        columns_view = {field: memoryview(values) for field, values in columns.items()}
+        for key, (start, stop) in positions.items():
+            self._series[key] = PriceSeries(
+                ordinals_view[start:stop],
+                {field: values[start:stop] for field, values in columns_view.items()},
+            )
+
+    def series(self, symbol: str, active: str = "stock") -> Optional[PriceSeries]:
+        """Series of the active (None if it was not loaded)."""
+        return self._series.get((active, symbol.upper()))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def rows(self) -> int:
+        return len(self.ordinals)
+
+    def nbytes(self) -> int:
+        """Bytes used by the ordinals and the columns."""
+        return self.ordinals.nbytes + sum(c.nbytes for c in self.columns.values())
+
+    @classmethod
+    def load_csv(cls, paths: Sequence[str]) -> "PriceStore":
+        """Load daily prices from csv dumps (optionally gzipped).
+
+        Each file has a header with a `date` (YYYY-MM-DD) column, a `symbol`
+        column (or the symbol is the file name, e.g. `AAPL.csv`), an optional
+        `type` column ('stock' by default) and a column per field (open,
+        close, volume, ...). Empty values are NaN. Directories are expanded
+        to their csv files.
+
+        Rows are parsed in chunks into numpy columns, and dates are parsed
+        once per distinct date. If a date of an active is repeated, the last
+        row wins.
+        """
+        ordinal_of: Dict[str, int] = {}
+        key_codes: Dict[Tuple[str, str], int] = {}
+        raw_codes: Dict[Tuple[str, str], int] = {}
+        codes: List[np.ndarray] = []
+        ordinals: List[np.ndarray] = []
+        values: Dict[str, List[np.ndarray]] = {}
+        rows = 0
+
+        def code(raw_key: Tuple[str, str]) -> int:
+            key = (raw_key[0].strip().lower() or "stock", raw_key[1].strip().upper())
+            return key_codes.setdefault(key, len(key_codes))
+
+        def ordinal(day: str) -> int:
+            return date.fromisoformat(day.strip()).toordinal()
+
+        for path in _dump_files(paths):
+            name = os.path.basename(path).split(".")[0].upper()
+            with _open_text(path) as f:
+                header = next(csv.reader([f.readline()]), [])
+                header = [field.strip() for field in header]
+                if "date" not in header:
+                    raise ValueError(f"Error: no `date` column in {path}.")
+                index = {field: i for i, field in enumerate(header)}
+                fields = [field for field in header if field not in KEY_FIELDS]
+
+                for chunk_columns in _read_chunks(f, len(header)):
+                    size = len(chunk_columns[0])
+                    symbols = (
+                        chunk_columns[index["symbol"]]
+                        if "symbol" in index
+                        else repeat(name, size)
+                    )
+                    types = (
+                        chunk_columns[index["type"]]
+                        if "type" in index
+                        else repeat("stock", size)
+                    )
+                    chunk_codes = _encode(list(zip(types, symbols)), raw_codes, code)
+                    chunk_ordinals = _encode(
+                        chunk_columns[index["date"]], ordinal_of, ordinal
+                    )
+                    codes.append(chunk_codes)
+                    ordinals.append(chunk_ordinals)
+
+                    for field in set(fields) | set(values):
+                        if field not in values:
+                            values[field] = [np.full(rows, np.nan)]
+                        if field in index:
+                            column = chunk_columns[index[field]]
+                            if "" in column:
+                                column = [v or "nan" for v in column]
+                            values[field].append(np.array(column, dtype=np.float64))
+                        else:
+                            values[field].append(np.full(size, np.nan))
+                    rows += size
+
+        if not rows:
+            return cls(np.empty(0, dtype=np.int64), {}, {})
+
+        all_codes = np.concatenate(codes)
+        all_ordinals = np.concatenate(ordinals)
+        # stable: the last row of a repeated date is the last one of its run
+        order = np.lexsort((all_ordinals, all_codes))
+        all_codes, all_ordinals = all_codes[order], all_ordinals[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (all_codes[1:] != all_codes[:-1]) | (
+            all_ordinals[1:] != all_ordinals[:-1]
+        )
+        order = order[last]
+        all_codes, all_ordinals = all_codes[last], all_ordinals[last]
+        columns = {
+            field: np.concatenate(chunks)[order] for field, chunks in values.items()
+        }
+
+        keys = list(key_codes)
+        starts = np.searchsorted(all_codes, np.arange(len(keys)), side="left")
+        stops = np.searchsorted(all_codes, np.arange(len(keys)), side="right")
+        positions = {
+            keys[code]: (int(start), int(stop))
+            for code, (start, stop) in enumerate(zip(starts, stops))
+            if stop > start
+        }
+        return cls(all_ordinals, columns, positions)
+
+
+class FilePriceHandler(abstract_handler.PriceHandler):
+    """Price handler of daily prices loaded from local dump files.
+
+    Meant for offline backtests: the dumps of `paths` are loaded once (on
+    first use, or with `load`) into a `PriceStore`, and then every lookup is
+    a binary search in memory, without any I/O.
+
+    Subclass it (or call `load`) to point it to the dumps:
+        class Universe(FilePriceHandler):
+            paths = ("./data/dumps/",)
+
+    Prices are resolved as the `Alphavantage` handler does: non market days
+    to the previous market day, and `value` to its field with
+    `PriceSeries.resolve`.
+    """
+
+    paths: Sequence[str] = ()
+    store: Optional[PriceStore] = None
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, *paths: str) -> PriceStore:
+        """Load the dumps of the paths (default `paths`) into the store."""
+        paths = paths or cls.paths
+        store = PriceStore.load_csv(paths)
+        logger.info(
+            "Loaded %s daily prices of %s actives from %s files",
+            store.rows,
+            len(store),
+            len(_dump_files(paths)),
+        )
+        cls.paths, cls.store = tuple(paths), store
+        return store
+
+    @classmethod
+    def get_store(cls) -> PriceStore:
+        """Returns the store of the daily prices (loaded on first use)."""
+        if cls.store is None:
+            with cls._lock:
+                if cls.store is None:
+                    cls.load()
+        return cls.store
+
+    @classmethod
+    def _series(cls, symbol: str, active: str) -> Optional[PriceSeries]:
+        series = cls.get_store().series(symbol, active)
+        if series is None:
+            logger.error("No prices loaded for %s %s", active, symbol)
+        return series
+
+    @staticmethod
+    def _column(value: str, series: PriceSeries):
+        column = series.column(value)
+        if column is None:
+            logger.error("Value not found: %s", value)
+        return column
+
+    @staticmethod
+    def _value(column, i: Optional[int]) -> Optional[float]:
+        if column is None or i is None:
+            return None
+        price = column[i]
+        return price if price == price else None  # NaN: no value
+
+    @classmethod
+    def get_active_price_by_date(
+        cls,
+        symbol: str,
+        obs_date: Optional[date] = None,
+        value="close",
+        active="stock",
+        **kwargs,
+    ) -> Optional[float]:
+        """Returns the price of the active at the given date (or the previous
+        market day). None if the active or the date are not in the dumps."""
+        series = cls._series(symbol, active)
+        if series is None:
+            return None
+        obs_date = obs_date or date.today()
+        return cls._value(cls._column(value, series), series.asof(obs_date))
+
+    @classmethod
+    def get_active_price_series(
+        cls,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        value="close",
+        active="stock",
+        **kwargs,
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Returns the prices of the active for a window (its market days) or
+        a list of dates (None where the price is not available)."""
+        if dates is None:
+            if from_date is None or to_date is None:
+                raise ValueError("Either `dates` or `from_date`/`to_date` needed.")
+            if from_date > to_date:
+                raise ValueError("from_date must be < to_date")
+        series = cls._series(symbol, active)
+
+        if dates is not None:
+            dates = list(dates)
+            if series is None:
+                return dates, [None] * len(dates)
+            column = cls._column(value, series)
+            return dates, [cls._value(column, series.asof(d)) for d in dates]
+
+        if series is None:
+            return [], []
+        window = series.window(from_date, to_date)
+        column = cls._column(value, series)
+        return (
+            [series.date_at(i) for i in window],
+            [cls._value(column, i) for i in window],
+        )
+
+    @classmethod
+    def get_active_price_arrays(
+        cls,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        value="close",
+        active="stock",
+        **kwargs,
+    ) -> Tuple[Sequence[int], Sequence[float]]:
+        """Returns (ordinals, prices) of the window as slices of the store."""
+        if from_date > to_date:
+            raise ValueError("from_date must be < to_date")
+        series = cls._series(symbol, active)
+        if series is None:
+            return array("l"), array("d")
+        window = series.window(from_date, to_date)
+        lo, hi = window.start, window.stop
+        column = cls._column(value, series)
+        if column is None:
+            return series.ordinals[lo:hi], array("d", [NAN]) * len(window)
+        return series.ordinals[lo:hi], column[lo:hi]
@@ -0,0 +1,65 @@
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import requests
+
+
+class HttpClient:
+    """HTTP client shared by the requests of a price handler.
+
+    Keeps a pool of keep-alive connections per host (no new TCP/TLS handshake
+    per request), asks for gzip compressed responses and applies timeouts
+    to every request.
+
+    Args:
+        pool_maxsize: Max connections kept open per host. Should be at least
+            the amount of threads making requests concurrently (e.g. the
+            `max_workers` of the portafolios), as requests wait for a free
+            connection when all are in use.
+        pool_connections: Amount of hosts to keep connection pools for.
+        timeout: Seconds to wait for the connection and for the response
+            data, as a (connect, read) tuple or a single value for both.
+        session: Session to make the requests with (by default a new one).
+            Its adapters are kept as they are, so `pool_maxsize` and
+            `pool_connections` only apply to the sessions created here.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 10,
+        pool_connections: int = 4,
+        timeout: Union[float, Tuple[float, float]] = (5.0, 60.0),
+        session: Optional["requests.Session"] = None,
+    ):
+        # imported on first use, so runs served from the cache never pay it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=True,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        )
+
+    def get(self, url: str, stream: bool = False) -> "requests.Response":
+        """Make a GET request through the connection pool.
+
+        Args:
+            url: Url to request.
+            stream: If True, the body is downloaded while it is read
+                (`Response.iter_content`) instead of at once.
+        """
+        return self.session.get(url, stream=stream, timeout=self.timeout)
+
+    def close(self) -> None:
+        """Close all the open connections."""
+        self.session.close()
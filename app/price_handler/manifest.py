@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from typing import Dict, Iterator, Optional
+
+from price_handler.price_cache import CachedSeries
+
+MANIFEST_FILE = "manifest.ndjson"
+
+
+def entry_of(cached: CachedSeries) -> dict:
+    """Manifest entry with the coverage and freshness of a cached series."""
+    series = cached.series
+    return {
+        "symbol": cached.symbol,
+        "active": cached.active,
+        "first_date": series.first_date.isoformat() if len(series) else None,
+        "latest_date": series.latest_date.isoformat() if len(series) else None,
+        "rows": len(series),
+        "full": cached.full,
+        "fetched_on": cached.fetched_on.isoformat() if cached.fetched_on else None,
+        "refreshed_at": cached.refreshed_at,
+    }
+
+
+class Manifest:
+    """Index of the series of a price cache: coverage and freshness per symbol.
+
+    Entries are appended to `<data_dir>/manifest.ndjson` (one json line per
+    recorded series), so recording a symbol never rewrites the whole index
+    and a crash loses at most the line being written. The last entry of a
+    symbol wins. `compact` rewrites the file with one line per symbol.
+
+    Args:
+        data_dir: Directory of the price cache.
+    """
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, MANIFEST_FILE)
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(symbol: str, active: str) -> str:
+        return f"{active}/{symbol.upper()}"
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # line cut by a crash
+                    self._entries[self.key(entry["symbol"], entry["active"])] = entry
+        except FileNotFoundError:
+            pass
+
+    def get(self, symbol: str, active: str) -> Optional[dict]:
+        """Entry of the symbol (None if it was never recorded)."""
+        return self._entries.get(self.key(symbol, active))
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(list(self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, cached: CachedSeries) -> dict:
+        """Record the coverage and freshness of a cached series."""
+        entry = entry_of(cached)
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._entries[self.key(cached.symbol, cached.active)] = entry
+        return entry
+
+    def compact(self) -> None:
+        """Rewrite the manifest with the last entry of each symbol."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.path)
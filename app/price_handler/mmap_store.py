@@ -0,0 +1,85 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from typing import Optional, Tuple
+
+from price_handler.series import PriceSeries
+
+MAGIC = b"FPS1"
+# magic and length of the json header
+_PREFIX = struct.Struct("<4sI")
+_ALIGN = 8
+
+
+def _data_offset(header_size: int) -> int:
+    """Offset of the first column, aligned to 8 bytes."""
+    end = _PREFIX.size + header_size
+    return end + (-end % _ALIGN)
+
+
+def write_series(path: str, series: PriceSeries, meta: Optional[dict] = None) -> None:
+    """Write the series as a columnar file that can be memory-mapped.
+
+    Layout: magic, json header (fields, rows and `meta`), then the int64 date
+    ordinals and a float64 column per field, all in native byte order and
+    aligned to 8 bytes.
+
+    The file is written in a temporal file and then replaced, so readers never
+    see a half written file, and processes that mapped the previous file keep
+    reading it until they open it again.
+    """
+    fields = list(series.columns)
+    header = json.dumps(
+        {"rows": len(series), "fields": fields, "meta": meta or {}}
+    ).encode()
+    padding = _data_offset(len(header)) - _PREFIX.size - len(header)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * padding)
+        f.write(array("q", series.ordinals).tobytes())
+        for field in fields:
+            f.write(array("d", series.columns[field]).tobytes())
+    os.replace(tmp_path, path)
+
+
+def open_series(path: str) -> Optional[Tuple[PriceSeries, dict]]:
+    """Map a columnar series file into memory, without copying nor parsing it.
+
+    The columns of the returned series are read-only memoryviews of the
+    mapped file, so every process opening the same file shares a single copy
+    in the page cache.
+
+    Returns:
+        Tuple of (series, meta), or None if the file does not exist or is
+        not a columnar series file.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return None
+
+    if len(mapped) < _PREFIX.size:
+        return None
+    magic, header_size = _PREFIX.unpack_from(mapped)
+    if magic != MAGIC:
+        return None
+    header = json.loads(mapped[_PREFIX.size : _PREFIX.size + header_size])
+
+    rows = header["rows"]
+    view = memoryview(mapped)
+    offset = _data_offset(header_size)
+    ordinals = view[offset : offset + 8 * rows].cast("q")
+    offset += 8 * rows
+    columns = {}
+    for field in header["fields"]:
+        columns[field] = view[offset : offset + 8 * rows].cast("d")
+        offset += 8 * rows
+    return PriceSeries(ordinals, columns), header["meta"]
@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from price_handler.mmap_store import open_series, write_series
+from price_handler.series import PriceSeries
+
+# subdirectories of the files of each active type, so directories of
+# universes of thousands of symbols stay small.
+SHARDS = 256
+
+
+def shard(symbol: str) -> str:
+    """Subdirectory of the cache files of the symbol (stable across runs)."""
+    return f"{zlib.crc32(symbol.upper().encode()) % SHARDS:02x}"
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock of the lock file between processes (not on Windows)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@dataclass
+class CachedSeries:
+    """Daily time series of an active kept in the price cache.
+
+    Args:
+        symbol: Symbol of the active.
+        active: Type of the active ('stock' or 'crypto').
+        series: Daily candles of the active, indexed by date.
+        full: True if the series holds the full history of the active
+            (and not only the last 100 days).
+        fetched_on: Date of the most recent request of the series to the API
+            (None if unknown).
+        refreshed_at: Time (seconds since the epoch) of the most recent
+            request of the series to the API (None if unknown). Watermark to
+            refresh the series once per market close.
+    """
+
+    symbol: str
+    active: str
+    series: PriceSeries
+    full: bool = False
+    fetched_on: Optional[date] = None
+    refreshed_at: Optional[float] = None
+
+    def covers(self, oldest_date: date, newest_date: date) -> bool:
+        """Check if the series has all the data between the two dates.
+
+        Dates older than the first date are covered if the series is the
+        full history of the active (there is no older data). Dates after the
+        latest date are covered until the day before the series was fetched,
+        as no candle exists for them (weekends, holidays).
+        """
+        if not len(self.series):
+            return False
+        covers_oldest = self.full or self.series.first_date <= oldest_date
+        newest_known = self.series.latest_date
+        if self.fetched_on is not None:
+            newest_known = max(newest_known, self.fetched_on - timedelta(days=1))
+        return covers_oldest and newest_date <= newest_known
+
+
+class PriceCache:
+    """Persistent cache of daily time series, one columnar file per active.
+
+    Files live in `<data_dir>/<active>/<shard>/<SYMBOL>.bin` (see `shard` and
+    `mmap_store`) and are memory-mapped when read: opening a series does not
+    parse nor copy it, and worker processes reading the same `data_dir` share
+    a single copy of each series in the page cache. Once a series is opened
+    it is kept in memory, so repeated lookups never touch the disk (nor the
+    network) again.
+
+    Series of the previous caches (`<active>/<SYMBOL>.bin` without shard, and
+    `<active>/<SYMBOL>.json`) are still read, and moved to the sharded
+    columnar files on their next merge.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._series: Dict[Tuple[str, str], CachedSeries] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, active: str) -> str:
+        return os.path.join(self.data_dir, active, shard(symbol), f"{symbol}.bin")
+
+    def _unsharded_path(self, symbol: str, active: str) -> str:
+        return os.path.join(self.data_dir, active, f"{symbol}.bin")
+
+    def _json_path(self, symbol: str, active: str) -> str:
+        return os.path.join(self.data_dir, active, f"{symbol}.json")
+
+    def get(self, symbol: str, active: str) -> Optional[CachedSeries]:
+        """Get the cached series of the active (None if not cached)."""
+        key = (symbol.upper(), active)
+        series = self._series.get(key)
+        if series is None:
+            series = self._load(*key)
+            if series is not None:
+                self._series[key] = series
+        return series
+
+    def merge(
+        self,
+        symbol: str,
+        active: str,
+        series: PriceSeries,
+        full: bool = False,
+        fetched_on: Optional[date] = None,
+        refreshed_at: Optional[float] = None,
+    ) -> CachedSeries:
+        """Merge new daily candles into the cached series and persist it.
+
+        Already cached dates that are not in `series` are kept, so merging
+        a "compact" response does not loose the "full" history. Dates present
+        in both are replaced by the new values.
+
+        The merge holds a lock of the symbol's file (`<file>.lock`) and reads
+        the cached series from disk, so processes sharing `data_dir` merge
+        into the latest file instead of an outdated copy of it.
+
+        Args:
+            symbol: Symbol of the active.
+            active: Type of the active ('stock' or 'crypto').
+            series: New daily candles of the active.
+            full: True if `series` is the full history of the active.
+            fetched_on: Date `series` was requested to the API (default today).
+            refreshed_at: Time `series` was requested to the API (default now).
+        Returns:
+            The merged cached series.
+        """
+        key = (symbol.upper(), active)
+        fetched_on = fetched_on or date.today()
+        refreshed_at = refreshed_at or time.time()
+        with self._lock, file_lock(self._path(*key) + ".lock"):
+            cached = self._load(*key)
+            if cached is not None and cached.fetched_on is not None:
+                fetched_on = max(fetched_on, cached.fetched_on)
+            if cached is not None and cached.refreshed_at is not None:
+                refreshed_at = max(refreshed_at, cached.refreshed_at)
+            merged = CachedSeries(
+                symbol=key[0],
+                active=active,
+                series=cached.series.merge(series) if cached is not None else series,
+                full=full or (cached is not None and cached.full),
+                fetched_on=fetched_on,
+                refreshed_at=refreshed_at,
+            )
+            self._dump(merged)
+            # keep the mapped file in memory (shared with other processes)
+            # instead of the merged copy.
+            merged = self._load(*key) or merged
+            self._series[key] = merged
+        return merged
+
+    def _load(self, symbol: str, active: str) -> Optional[CachedSeries]:
+        mapped = open_series(self._path(symbol, active)) or open_series(
+            self._unsharded_path(symbol, active)
+        )
+        if mapped is not None:
+            series, meta = mapped
+        else:
+            loaded = self._load_json(symbol, active)
+            if loaded is None:
+                return None
+            series, meta = loaded
+
+        fetched_on = meta.get("fetched_on")
+        return CachedSeries(
+            symbol=symbol,
+            active=active,
+            series=series,
+            full=meta.get("full", False),
+            fetched_on=date.fromisoformat(fetched_on) if fetched_on else None,
+            refreshed_at=meta.get("refreshed_at"),
+        )
+
+    def _load_json(
+        self, symbol: str, active: str
+    ) -> Optional[Tuple[PriceSeries, dict]]:
+        """Load a series of the previous (json) cache formats."""
+        try:
+            with open(self._json_path(symbol, active)) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if "time_series" in data:
+            # first cache format: daily candles by date, as the API returns them
+            series = PriceSeries.from_time_series(data["time_series"])
+        else:
+            series = PriceSeries.from_columns(data["dates"], data["columns"])
+        return series, data
+
+    def _dump(self, cached: CachedSeries) -> None:
+        meta = {
+            "full": cached.full,
+            "fetched_on": cached.fetched_on.isoformat() if cached.fetched_on else None,
+            "refreshed_at": cached.refreshed_at,
+        }
+        write_series(self._path(cached.symbol, cached.active), cached.series, meta)
+
+
+_caches: Dict[str, PriceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_price_cache(data_dir: str) -> PriceCache:
+    """Returns the shared price cache for the given data directory."""
+    key = os.path.abspath(data_dir)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = PriceCache(data_dir)
+        return _caches[key]
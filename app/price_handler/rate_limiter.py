@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Iterable, List, Optional
+
+
+class TokenBucket:
+    """Token bucket allowing `capacity` calls every `period` seconds.
+
+    Tokens are refilled continuously, so calls can be made in bursts of up
+    to `capacity` and afterwards at a sustained rate of `capacity / period`.
+    """
+
+    def __init__(self, capacity: int, period: float, clock=time.monotonic):
+        if capacity <= 0 or period <= 0:
+            raise ValueError("capacity and period must be > 0")
+        self.capacity = capacity
+        self.period = period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._tokens = min(
+            self.capacity, self._tokens + elapsed * self.capacity / self.period
+        )
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds to wait until a token is available (0 if available now)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * self.period / self.capacity
+
+    def consume(self) -> None:
+        """Take a token out of the bucket."""
+        self._refill()
+        self._tokens -= 1
+
+    def drain(self) -> None:
+        """Empty the bucket (e.g. when the provider says the limit was hit)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+
+class RateLimiter:
+    """Blocking rate limiter over one or more token buckets.
+
+    Callers waiting for a slot are served by priority (lower value first)
+    and then by arrival order.
+
+    Args:
+        calls_per_minute: Max calls per minute. None for no limit.
+        calls_per_day: Max calls per day. None for no limit.
+        buckets: Extra token buckets to respect.
+    """
+
+    def __init__(
+        self,
+        calls_per_minute: Optional[int] = None,
+        calls_per_day: Optional[int] = None,
+        buckets: Iterable[TokenBucket] = (),
+    ):
+        self._buckets: List[TokenBucket] = list(buckets)
+        if calls_per_minute:
+            self._buckets.append(TokenBucket(calls_per_minute, 60))
+        if calls_per_day:
+            self._buckets.append(TokenBucket(calls_per_day, 24 * 60 * 60))
+        self._cond = threading.Condition()
+        self._queue: list = []
+        self._counter = itertools.count()
+
+    def acquire(self, priority: int = 0) -> None:
+        """Block until a call can be made.
+
+        Args:
+            priority: Priority of the call. Lower values are served first.
+        """
+        with self._cond:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    wait = max((b.wait_time() for b in self._buckets), default=0)
+                    if wait <= 0:
+                        for bucket in self._buckets:
+                            bucket.consume()
+                        heapq.heappop(self._queue)
+                        return
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                self._cond.notify_all()
+
+    def throttled(self) -> None:
+        """Notify the limiter that the provider rejected a call for rate limit.
+
+        Empties the buckets, so the next calls wait for the limit to recover.
+        """
+        with self._cond:
+            for bucket in self._buckets:
+                bucket.drain()
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float) -> float:
+    """Exponential backoff delay (in seconds) for the given retry attempt."""
+    return min(max_delay, base * 2**attempt)
@@ -0,0 +1,206 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, Optional, Union
+
+NAN = float("nan")
+
+# numbered fields of the API (e.g. '4. close', '4a. close (USD)')
+_FIELD_NAME = re.compile(r"^\d+[a-z]?\.\s*(.*?)(?:\s*\([^)]*\))?$")
+
+
+def field_name(field: str) -> str:
+    """Name of a field without its number nor its currency.
+
+    e.g. '4a. close (USD)' -> 'close', '6. market cap (USD)' -> 'market cap'.
+    """
+    match = _FIELD_NAME.match(field.strip())
+    return (match.group(1) if match else field.strip()).lower()
+
+
+class PriceSeries:
+    """Daily time series indexed by date, stored in typed columns.
+
+    Dates are parsed once into a sorted array of date ordinals, so lookups
+    are binary searches (O(log n)) instead of scanning and parsing the dates
+    of the time series on every lookup. Each field of the daily candles
+    (open, close, volume, ...) is a column of floats aligned with the dates.
+
+    Args:
+        ordinals: Sorted (oldest first) date ordinals of the series.
+        columns: Values of each field, aligned with `ordinals`.
+            Missing values are NaN.
+
+    Columns are arrays, or read-only memoryviews of a memory-mapped file
+    (see `mmap_store`). Series are not modified in place: `merge` returns
+    a new series.
+
+    `column` resolves a value (e.g. 'close') to its field once per series,
+    so every later read of that value is a plain index of the column.
+    """
+
+    __slots__ = ("ordinals", "columns", "_resolved")
+
+    def __init__(
+        self,
+        ordinals: Union[array, memoryview],
+        columns: Dict[str, Union[array, memoryview]],
+    ):
+        self.ordinals = ordinals
+        self.columns = columns
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def from_time_series(cls, time_series: dict) -> "PriceSeries":
+        """Build the series from daily candles with dates as keys (YYYY-MM-DD)."""
+        days = sorted(time_series)
+        ordinals = array("l", (date.fromisoformat(day).toordinal() for day in days))
+        columns: Dict[str, array] = {}
+        for i, day in enumerate(days):
+            for field, value in time_series[day].items():
+                if field not in columns:
+                    columns[field] = array("d", [NAN]) * len(days)
+                columns[field][i] = float(value)
+        return cls(ordinals, columns)
+
+    @classmethod
+    def from_columns(
+        cls, ordinals: Iterable[int], columns: Dict[str, Iterable[float]]
+    ) -> "PriceSeries":
+        """Build the series from (possibly unsorted) ordinals and columns."""
+        ordinals = array("l", ordinals)
+        columns = {field: array("d", values) for field, values in columns.items()}
+        if all(a < b for a, b in zip(ordinals, ordinals[1:])):
+            return cls(ordinals, columns)
+
+        # keep the sorted unique dates (the last value of repeated dates wins)
+        positions = {ordinal: i for i, ordinal in enumerate(ordinals)}
+        order = [positions[ordinal] for ordinal in sorted(positions)]
+        return cls(
+            array("l", (ordinals[i] for i in order)),
+            {
+                field: array("d", (values[i] for i in order))
+                for field, values in columns.items()
+            },
+        )
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """New series with the dates of both series.
+
+        Values of `other` replace the values of the same dates in this series.
+        """
+        fields = list(self.columns)
+        fields += [field for field in other.columns if field not in self.columns]
+        ordinals = array("l")
+        columns = {field: array("d") for field in fields}
+
+        def append(series: "PriceSeries", i: int) -> None:
+            ordinals.append(series.ordinals[i])
+            for field in fields:
+                column = series.columns.get(field)
+                columns[field].append(column[i] if column is not None else NAN)
+
+        i, j = 0, 0
+        while i < len(self.ordinals) or j < len(other.ordinals):
+            if j == len(other.ordinals) or (
+                i < len(self.ordinals) and self.ordinals[i] < other.ordinals[j]
+            ):
+                append(self, i)
+                i += 1
+            else:
+                if i < len(self.ordinals) and self.ordinals[i] == other.ordinals[j]:
+                    i += 1
+                append(other, j)
+                j += 1
+        return PriceSeries(ordinals, columns)
+
+    def resolve(self, value: str) -> Optional[str]:
+        """Field of the series of a value (cached per series).
+
+        The first of these rules with a match wins:
+            1. The field is the value (e.g. '4. close').
+            2. The name of the field, without its number and currency, is the
+                value: 'close' matches '4. close' but not '5. adjusted close'.
+            3. The field contains the value.
+        Among many matching fields (e.g. '4a. close (USD)' and '4b. close
+        (USD)' of cryptos), the first one in alphabetical order is chosen,
+        whatever the order of the fields in the response.
+
+        Returns:
+            The field, or None if no field matches.
+        """
+        try:
+            return self._resolved[value]
+        except KeyError:
+            pass
+        fields = sorted(self.columns)
+        name = value.strip().lower()
+        matches = (
+            [field for field in fields if field == value]
+            or [field for field in fields if field_name(field) == name]
+            or [field for field in fields if name in field.lower()]
+        )
+        field = self._resolved[value] = matches[0] if matches else None
+        return field
+
+    def column(self, value: str) -> Optional[Union[array, memoryview]]:
+        """Values of the field of a value (see `resolve`), None if not found."""
+        field = self.resolve(value)
+        return None if field is None else self.columns[field]
+
+    def to_time_series(self) -> dict:
+        """Daily candles with dates as keys, from the most recent date."""
+        return {
+            date.fromordinal(self.ordinals[i]).isoformat(): {
+                field: values[i] for field, values in self.columns.items()
+            }
+            for i in reversed(range(len(self.ordinals)))
+        }
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        return self.ordinals == other.ordinals and self.columns == other.columns
+
+    @property
+    def first_date(self) -> Optional[date]:
+        """Oldest date of the series."""
+        return date.fromordinal(self.ordinals[0]) if self.ordinals else None
+
+    @property
+    def latest_date(self) -> Optional[date]:
+        """Most recent date of the series."""
+        return date.fromordinal(self.ordinals[-1]) if self.ordinals else None
+
+    def date_at(self, i: int) -> date:
+        """Date of the i-th position of the series."""
+        return date.fromordinal(self.ordinals[i])
+
+    def index(self, obs_date: date) -> Optional[int]:
+        """Position of the exact date in the series (None if not found)."""
+        ordinal = obs_date.toordinal()
+        i = bisect_left(self.ordinals, ordinal)
+        if i < len(self.ordinals) and self.ordinals[i] == ordinal:
+            return i
+        return None
+
+    def asof(self, obs_date: date) -> Optional[int]:
+        """Position of the date, or of the previous date of the series.
+
+        Resolves non market days (weekends, holidays) to the previous market
+        day, and dates after the most recent one to the latest date.
+        None if the date is older than the first date of the series.
+        """
+        i = bisect_right(self.ordinals, obs_date.toordinal()) - 1
+        return i if i >= 0 else None
+
+    def window(self, from_date: date, to_date: date) -> range:
+        """Positions of the dates between `from_date` and `to_date` (inclusive)."""
+        return range(
+            bisect_left(self.ordinals, from_date.toordinal()),
+            bisect_right(self.ordinals, to_date.toordinal()),
+        )
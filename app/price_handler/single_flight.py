@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+
+class _Call:
+    """In-flight call shared by all the callers of the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    The first caller of a key runs the function, while the callers that arrive
+    before it finishes wait and get the same result (or exception).
+    The result is shared between callers, so it must be treated as read only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        alternates: Iterable[Hashable] = (),
+    ) -> Any:
+        """Run `fn` once for all the concurrent callers of `key`.
+
+        Args:
+            key: Key identifying the call.
+            fn: Function to run if no call of the key is in flight.
+            alternates: Keys of in-flight calls whose result is also valid
+                for `key` (checked before `key` itself).
+        Returns:
+            Result of `fn` (from this call or the one in flight).
+        """
+        leader = False
+        with self._lock:
+            for _key in (*alternates, key):
+                call = self._calls.get(_key)
+                if call is not None:
+                    break
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
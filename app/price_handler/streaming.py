@@ -0,0 +1,125 @@
+import codecs
+import json
+import re
+from array import array
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Iterable, Optional, Tuple
+
+from price_handler.series import NAN, PriceSeries
+
+# end of the time series: the "}" of its last candle followed by its own "}"
+# (the candles, "2022-04-12": {"1. open": "168.02", ...}, have no nested objects)
+_END = re.compile(r"\}\s*\}")
+
+
+class _ColumnsBuilder:
+    """Append daily candles into typed columns."""
+
+    def __init__(self):
+        self.ordinals = array("l")
+        self.columns: Dict[str, array] = {}
+
+    def append(self, ordinal: int, fields: dict) -> None:
+        n = len(self.ordinals)
+        self.ordinals.append(ordinal)
+        for field, value in fields.items():
+            column = self.columns.get(field)
+            if column is None:
+                column = self.columns[field] = array("d", [NAN]) * n
+            column.append(float(value))
+        for column in self.columns.values():
+            if len(column) == n:
+                column.append(NAN)
+
+    def extend(self, candles: Dict[str, dict]) -> None:
+        """Append the candles of a batch ({"YYYY-MM-DD": {field: value}})."""
+        ordinals = map(date.toordinal, map(date.fromisoformat, candles))
+        rows = list(candles.values())
+        layout = rows[0].keys() if rows else self.columns.keys()
+        if (not self.ordinals or layout == self.columns.keys()) and all(
+            row.keys() == layout for row in rows
+        ):
+            # the same fields in every candle: fill each column at once
+            self.ordinals.extend(ordinals)
+            for field in layout:
+                column = self.columns.setdefault(field, array("d"))
+                column.extend(map(float, map(itemgetter(field), rows)))
+            return
+        for ordinal, row in zip(ordinals, rows):
+            self.append(ordinal, row)
+
+    def build(self) -> PriceSeries:
+        # the API returns the most recent candles first
+        if all(a > b for a, b in zip(self.ordinals, self.ordinals[1:])):
+            self.ordinals.reverse()
+            for column in self.columns.values():
+                column.reverse()
+            return PriceSeries(self.ordinals, self.columns)
+        return PriceSeries.from_columns(self.ordinals, self.columns)
+
+
+def parse_time_series(
+    chunks: Iterable[bytes], time_series_key: str
+) -> Tuple[Optional[PriceSeries], Optional[dict]]:
+    """Parse a daily time series json response while it is downloaded.
+
+    The complete candles of each chunk of the response are parsed at once
+    into typed columns, so only the json of a chunk is built at a time (not
+    the json tree of the whole response, nor the whole response in memory).
+
+    Args:
+        chunks: Chunks of the response body.
+        time_series_key: Key of the time series in the response
+            (e.g. 'Time Series (Daily)').
+    Returns:
+        Tuple of (series, None) if the response has the time series. Else,
+        (None, response) with the parsed json of the response (usually an
+        error message or a note).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    key = f'"{time_series_key}"'
+    buffer = ""
+    start = -1
+    searched = 0
+    builder = None
+
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+
+        if builder is None:
+            # look for the start of the time series object
+            start = buffer.find(key, max(0, searched - len(key)))
+            searched = len(buffer)
+            if start < 0:
+                continue
+            brace = buffer.find("{", start + len(key))
+            if brace < 0:
+                searched = start
+                continue
+            buffer = buffer[brace + 1 :]
+            builder = _ColumnsBuilder()
+
+        buffer = buffer.lstrip()
+        if buffer.startswith(","):  # after the previous batch of candles
+            buffer = buffer[1:]
+        elif buffer.startswith("}"):
+            return builder.build(), None
+
+        end = _END.search(buffer)
+        last = end.start() if end else buffer.rfind("}")
+        if last < 0:
+            continue
+        # the complete candles received so far, parsed at once
+        try:
+            builder.extend(json.loads("{" + buffer[: last + 1] + "}"))
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError(f"Error: malformed time series: {buffer[:100]}")
+        if end:
+            return builder.build(), None
+        buffer = buffer[last + 1 :]
+
+    buffer += decoder.decode(b"", final=True)
+    if builder is not None:
+        raise ValueError("Error: incomplete time series in response.")
+    return None, json.loads(buffer)
@@ -1,7 +1,7 @@
 from price_handler import abstract_handler
-from typing import Optional
-from datetime import date
-from console import console
+from typing import List, Optional, Sequence, Tuple
+from datetime import date, timedelta
+from console import logger
 
 
 class TestPriceHandler(abstract_handler.PriceHandler):
@@ -29,7 +29,39 @@ class TestPriceHandler(abstract_handler.PriceHandler):
         """
         test_price = kwargs.pop("test_price", None)
         if test_price:
-            console.log(f"Test price recieded: {test_price}")
+            logger.debug("Test price recieded: %s", test_price)
             return test_price
 
+        return cls._fake_price(obs_date)
+
+    @classmethod
+    def get_active_price_series(
+        cls,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        dates: Optional[Sequence[date]] = None,
+        value="close",
+        active="stock",
+        **kwargs,
+    ) -> Tuple[List[date], List[Optional[float]]]:
+        """Returns the prices of the active for a window or a list of dates.
+
+        Notes:
+           For a window, every calendar day has a price.
+        """
+        test_price = kwargs.pop("test_price", None)
+        if dates is None:
+            if from_date is None or to_date is None:
+                raise ValueError("Either `dates` or `from_date`/`to_date` needed.")
+            dates = [
+                from_date + timedelta(days=i)
+                for i in range((to_date - from_date).days + 1)
+            ]
+        if test_price:
+            return list(dates), [test_price] * len(dates)
+        return list(dates), [cls._fake_price(obs_date) for obs_date in dates]
+
+    @staticmethod
+    def _fake_price(obs_date: date) -> float:
         return float(obs_date.year + obs_date.month + obs_date.day)
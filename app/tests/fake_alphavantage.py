@@ -0,0 +1,154 @@
+"""Local stand-in of the Alphavantage API, for tests and benchmarks."""
+
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+COMPACT_DAYS = 100
+
+STOCK_FIELDS = ("1. open", "2. high", "3. low", "4. close", "5. volume")
+CRYPTO_FIELDS = (
+    "1a. open (USD)",
+    "1b. open (USD)",
+    "2a. high (USD)",
+    "2b. high (USD)",
+    "3a. low (USD)",
+    "3b. low (USD)",
+    "4a. close (USD)",
+    "4b. close (USD)",
+    "5. volume",
+    "6. market cap (USD)",
+)
+
+THROTTLE_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is"
+    " 5 calls per minute and 500 calls per day."
+)
+
+
+def market_days(end_date: date, days: int) -> list:
+    """Last `days` week days until `end_date`, from the most recent."""
+    dates = []
+    day = end_date
+    while len(dates) < days:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+    return dates
+
+
+def synthetic_close(symbol: str, obs_date: date) -> float:
+    """Deterministic fake close price of the symbol at the date."""
+    base = 10 + sum(map(ord, symbol)) % 90
+    return round(base * (1 + obs_date.toordinal() % 1000 / 1000), 4)
+
+
+def synthetic_response(
+    symbol: str, active: str = "stock", days: int = COMPACT_DAYS, end_date=None
+) -> dict:
+    """Alphavantage like response with a synthetic daily time series."""
+    end_date = end_date or date.today()
+    fields = STOCK_FIELDS if active == "stock" else CRYPTO_FIELDS
+    time_series = {}
+    for day in market_days(end_date, days):
+        close = synthetic_close(symbol, day)
+        time_series[day.isoformat()] = {
+            field: str(close if "volume" not in field else 1000000) for field in fields
+        }
+    if active == "stock":
+        return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": time_series}
+    return {
+        "Meta Data": {"2. Digital Currency Code": symbol},
+        "Time Series (Digital Currency Daily)": time_series,
+    }
+
+
+class FakeAlphavantage:
+    """Local HTTP server answering like the Alphavantage API.
+
+    Args:
+        full_days: Amount of market days returned for 'outputsize=full'.
+        latency: Seconds to wait before answering each request.
+        end_date: Most recent date of the time series (default today).
+
+    Usage:
+        with FakeAlphavantage() as fake:
+            class LocalAlphavantage(Alphavantage):
+                base_url = fake.base_url
+    """
+
+    def __init__(
+        self,
+        full_days: int = 1000,
+        latency: float = 0.0,
+        end_date: Optional[date] = None,
+    ):
+        self.full_days = full_days
+        self.latency = latency
+        self.end_date = end_date
+        self.throttle_next = 0
+        self.requests = []
+        self.connections = 0
+        self._bodies: Dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def body(self, query: dict) -> bytes:
+        """Body of the response for the given query parameters."""
+        with self._lock:
+            self.requests.append(query)
+            if self.throttle_next > 0:
+                self.throttle_next -= 1
+                return json.dumps({"Note": THROTTLE_NOTE}).encode()
+
+        active = "stock" if query["function"] == "TIME_SERIES_DAILY" else "crypto"
+        days = self.full_days if query.get("outputsize") == "full" else COMPACT_DAYS
+        key = (query["symbol"], active, days)
+        if key not in self._bodies:
+            response = synthetic_response(query["symbol"], active, days, self.end_date)
+            self._bodies[key] = json.dumps(response).encode()
+        return self._bodies[key]
+
+    def __enter__(self) -> "FakeAlphavantage":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_GET(self):
+                query = {
+                    k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()
+                }
+                if fake.latency:
+                    time.sleep(fake.latency)
+                body = fake.body(query)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,334 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.price_cache import PriceCache, get_price_cache
+from price_handler.rate_limiter import RateLimiter
+from price_handler.series import PriceSeries
+from tests.fake_alphavantage import FakeAlphavantage, market_days, synthetic_response
+
+
+def _stock_series(closes: dict) -> PriceSeries:
+    return PriceSeries.from_time_series(
+        {
+            day: {"1. open": str(close), "4. close": str(close)}
+            for day, close in closes.items()
+        }
+    )
+
+
+class TestAlphavantageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class CachedAlphavantage(Alphavantage):
+            data_dir = self.tmp_dir.name
+
+        self.handler = CachedAlphavantage
+
+    def test_cached_price_does_not_request_api(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2022, 4, 12),
+            "stock",
+            _stock_series({"2022-04-12": 167.66, "2022-04-11": 165.75}),
+        )
+        with mock.patch.object(
+            self.handler,
+            "_request_active_quote",
+            side_effect=AssertionError("no network"),
+        ):
+            price = self.handler.get_active_price_by_date(
+                "AAPL", obs_date=date(2022, 4, 11)
+            )
+        self.assertEqual(price, 165.75)
+
+    def test_date_before_full_history_does_not_request_api(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2001, 2, 1),
+            "stock",
+            _stock_series({"2001-02-01": 1.0, "2001-02-02": 2.0}),
+            outputsize="full",
+        )
+        with mock.patch.object(
+            self.handler,
+            "_request_active_quote",
+            side_effect=AssertionError("no network"),
+        ):
+            for _ in range(2):
+                price = self.handler.get_active_price_by_date(
+                    "AAPL", obs_date=date(2000, 1, 3)
+                )
+                self.assertIsNone(price)
+
+    def test_weekend_resolves_to_previous_market_day(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2022, 4, 8),
+            "stock",
+            _stock_series({"2022-04-11": 165.75, "2022-04-08": 170.09}),
+        )
+        with mock.patch.object(
+            self.handler,
+            "_request_active_quote",
+            side_effect=AssertionError("no network"),
+        ):
+            dates, prices = self.handler.get_active_price_series(
+                "AAPL", dates=[date(2022, 4, 9), date(2022, 4, 10)]
+            )
+        self.assertEqual(prices, [170.09, 170.09])
+
+    def test_compact_merge_keeps_full_history(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2001, 2, 1),
+            "stock",
+            _stock_series({"2001-02-01": 1.0, "2022-04-11": 2.0}),
+            outputsize="full",
+        )
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2022, 4, 12),
+            "stock",
+            _stock_series({"2022-04-11": 3.0, "2022-04-12": 4.0}),
+        )
+        cached = get_price_cache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertTrue(cached.full)
+        self.assertEqual(
+            list(cached.series.to_time_series()),
+            ["2022-04-12", "2022-04-11", "2001-02-01"],
+        )
+        self.assertEqual(cached.series.columns["4. close"].tolist(), [1.0, 3.0, 4.0])
+
+        # a new process (new cache instance) reads the merged series from disk
+        reloaded = PriceCache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertEqual(reloaded, cached)
+
+    def test_price_series_uses_one_request(self):
+        series = _stock_series(
+            {"2001-02-01": 1.0, "2001-02-02": 2.0, "2001-02-05": 3.0}
+        )
+        with mock.patch.object(
+            self.handler, "_request_active_quote", return_value=series
+        ) as request:
+            dates, prices = self.handler.get_active_price_series(
+                "AAPL", dates=[date(2001, 2, 1), date(2001, 2, 5)]
+            )
+            self.assertEqual(prices, [1.0, 3.0])
+
+            dates, prices = self.handler.get_active_price_series(
+                "AAPL", from_date=date(2001, 2, 2), to_date=date(2001, 2, 5)
+            )
+        self.assertEqual(dates, [date(2001, 2, 2), date(2001, 2, 5)])
+        self.assertEqual(prices, [2.0, 3.0])
+        request.assert_called_once_with(
+            "AAPL", outputsize="full", active_type="stock", priority=0
+        )
+
+    def test_field_resolved_once_per_lookup(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2001, 2, 1),
+            "stock",
+            _stock_series({"2001-02-01": 1.0, "2001-02-02": 2.0, "2001-02-05": 3.0}),
+            outputsize="full",
+        )
+        with mock.patch.object(
+            self.handler, "_resolve_column", wraps=self.handler._resolve_column
+        ) as resolve:
+            _, prices = self.handler.get_active_price_series(
+                "AAPL", from_date=date(2001, 2, 1), to_date=date(2001, 2, 5)
+            )
+            self.assertEqual(prices, [1.0, 2.0, 3.0])
+            _, prices = self.handler.get_active_price_series(
+                "AAPL", dates=[date(2001, 2, 2), date(2001, 2, 4)], value="open"
+            )
+            self.assertEqual(prices, [2.0, 2.0])
+        self.assertEqual(resolve.call_count, 2)
+
+    def test_price_arrays_are_column_slices(self):
+        self.handler._save_new_price_data(
+            "AAPL",
+            date(2001, 2, 1),
+            "stock",
+            _stock_series({"2001-02-01": 1.0, "2001-02-02": 2.0, "2001-02-05": 3.0}),
+            outputsize="full",
+        )
+        ordinals, prices = self.handler.get_active_price_arrays(
+            "AAPL", from_date=date(2001, 2, 2), to_date=date(2001, 2, 6)
+        )
+        self.assertEqual(
+            list(ordinals), [date(2001, 2, 2).toordinal(), date(2001, 2, 5).toordinal()]
+        )
+        self.assertEqual(list(prices), [2.0, 3.0])
+
+    def test_priority_reaches_the_request(self):
+        series = _stock_series({"2001-02-01": 1.0})
+        with mock.patch.object(
+            self.handler, "_request_active_quote", return_value=series
+        ) as request:
+            self.handler.get_active_price_by_date(
+                "AAPL", obs_date=date(2001, 2, 1), priority=3
+            )
+        request.assert_called_once_with(
+            "AAPL", outputsize="full", active_type="stock", priority=3
+        )
+
+
+class TestAlphavantageCacheCoverage(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage(end_date=date(2022, 4, 8)).__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+
+    def test_date_after_latest_candle_is_cached(self):
+        # 2022-04-08 is a Friday, no candle exists for the Saturday
+        for _ in range(3):
+            _, prices = self.handler.get_active_price_series(
+                "AAPL", dates=[date(2022, 4, 9)]
+            )
+            self.assertIsNotNone(prices[0])
+        self.assertEqual(len(self.fake.requests), 1)
+
+        cached = PriceCache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertEqual(cached.fetched_on, date.today())
+        self.assertTrue(cached.covers(date(2022, 4, 9), date(2022, 4, 9)))
+
+    def test_date_after_fetch_is_not_cached(self):
+        get_price_cache(self.tmp_dir.name).merge(
+            "AAPL",
+            "stock",
+            _stock_series({"2022-04-07": 1.0, "2022-04-08": 2.0}),
+            fetched_on=date(2022, 4, 9),
+        )
+        cached = get_price_cache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertTrue(cached.covers(date(2022, 4, 8), date(2022, 4, 8)))
+        self.assertFalse(cached.covers(date(2022, 4, 8), date(2022, 4, 9)))
+
+
+class TestAlphavantageIncrementalRefresh(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+        self.cache = get_price_cache(self.tmp_dir.name)
+
+    def _cache_history(self, days_ago: int) -> None:
+        end_date = market_days(date.today(), days_ago + 1)[-1]
+        response = synthetic_response("AAPL", days=1000, end_date=end_date)
+        self.cache.merge(
+            "AAPL",
+            "stock",
+            PriceSeries.from_time_series(response["Time Series (Daily)"]),
+            full=True,
+            fetched_on=end_date,
+            refreshed_at=1.0,
+        )
+
+    def test_recent_tail_is_fetched_compact(self):
+        self._cache_history(days_ago=10)
+        first_date = self.cache.get("AAPL", "stock").series.first_date
+        yesterday = market_days(date.today() - timedelta(days=1), 1)[0]
+
+        price = self.handler.get_active_price_by_date("AAPL", obs_date=yesterday)
+        self.assertIsNotNone(price)
+        self.assertEqual(
+            [query["outputsize"] for query in self.fake.requests], ["compact"]
+        )
+        cached = self.cache.get("AAPL", "stock")
+        self.assertTrue(cached.full)
+        self.assertEqual(cached.series.first_date, first_date)
+        self.assertEqual(cached.series.latest_date, market_days(date.today(), 1)[0])
+
+    def test_gap_older_than_compact_window_is_fetched_full(self):
+        self._cache_history(days_ago=200)
+        self.handler.get_active_price_by_date("AAPL", obs_date=date.today())
+        self.assertEqual(
+            [query["outputsize"] for query in self.fake.requests], ["full"]
+        )
+
+    def test_refreshed_once_per_market_close(self):
+        for _ in range(3):
+            self.handler.get_active_price_by_date("AAPL", obs_date=date.today())
+        self.assertEqual(len(self.fake.requests), 1)
+        cached = self.cache.get("AAPL", "stock")
+        self.assertTrue(self.handler._is_fresh(cached))
+
+        cached.refreshed_at = self.handler._last_market_close("stock") - 1
+        self.assertFalse(self.handler._is_fresh(cached))
+
+    def test_last_market_close_skips_weekends(self):
+        # Sunday 2022-04-10 at noon UTC: last close on Friday at 21 UTC
+        sunday = datetime(2022, 4, 10, 12, tzinfo=timezone.utc)
+        self.assertEqual(
+            self.handler._last_market_close("stock", sunday),
+            datetime(2022, 4, 8, 21, tzinfo=timezone.utc).timestamp(),
+        )
+        self.assertEqual(
+            self.handler._last_market_close("crypto", sunday),
+            datetime(2022, 4, 10, 0, tzinfo=timezone.utc).timestamp(),
+        )
+
+
+class TestAlphavantageCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage(latency=0.2).__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+
+    def test_concurrent_lookups_fetch_and_merge_once(self):
+        cache = get_price_cache(self.tmp_dir.name)
+        with mock.patch.object(cache, "merge", wraps=cache.merge) as merge:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(
+                    pool.map(
+                        lambda _: self.handler.get_active_price_series(
+                            "AAPL", dates=[date(2022, 4, 11)]
+                        ),
+                        range(8),
+                    )
+                )
+        self.assertEqual(len(self.fake.requests), 1)
+        self.assertEqual(merge.call_count, 1)
+        self.assertEqual(len({tuple(prices) for _, prices in results}), 1)
+
+    def test_lookup_after_the_flight_finished_does_not_refetch(self):
+        self.handler.get_active_price_series("AAPL", dates=[date(2022, 4, 11)])
+        # a caller that missed the cache before the first request finished
+        self.handler._request_time_series(
+            "AAPL", date(2022, 4, 11), "stock", newest_date=date(2022, 4, 11)
+        )
+        self.assertEqual(len(self.fake.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
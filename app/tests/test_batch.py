@@ -0,0 +1,87 @@
+import math
+import unittest
+from datetime import date
+from unittest import mock
+
+from actives.crypto import Crypto
+from actives.stock import Stock
+from analytics.batch import batch_returns
+from portafolio import Portafolio
+from price_handler.tester_handler import TestPriceHandler
+
+
+class TestBatchReturns(unittest.TestCase):
+    def setUp(self):
+        self.symbols = ["AAPL", "MSFT", "TSLA", "ETH"]
+        self.portafolios = [
+            Portafolio(
+                actives=[
+                    Stock(name=s, symbol=s) if s != "ETH" else Crypto(name=s, symbol=s)
+                    for s in self.symbols[i % 3 : i % 3 + 2 + i % 2]
+                ]
+            )
+            for i in range(12)
+        ]
+        self.periods = [(date(2020, 1, 1 + i), date(2022, 4, 1 + i)) for i in range(12)]
+
+    def test_matches_portafolio_returns(self):
+        result = batch_returns(self.portafolios, self.periods)
+        for i, (portafolio, (from_date, to_date)) in enumerate(
+            zip(self.portafolios, self.periods)
+        ):
+            self.assertTrue(
+                math.isclose(
+                    result.overall[i], portafolio.overall_return(from_date, to_date)
+                )
+            )
+            self.assertTrue(
+                math.isclose(
+                    result.annualized[i], portafolio.profit(from_date, to_date)
+                )
+            )
+
+    def test_each_series_fetched_once(self):
+        calls = []
+        original = TestPriceHandler.get_active_price_arrays.__func__
+
+        def count(cls, symbol, *args, **kwargs):
+            calls.append(symbol)
+            return original(cls, symbol, *args, **kwargs)
+
+        with mock.patch.object(
+            TestPriceHandler, "get_active_price_arrays", classmethod(count)
+        ):
+            result = batch_returns(
+                self.portafolios, (date(2021, 1, 1), date(2022, 1, 1)), max_workers=4
+            )
+        self.assertEqual(sorted(calls), sorted(self.symbols))
+        self.assertEqual(len(result.overall), len(self.portafolios))
+
+    def test_missing_prices_and_empty_portafolios(self):
+        class ShortHistory(TestPriceHandler):
+            @classmethod
+            def get_active_price_arrays(cls, symbol, from_date, to_date, **kwargs):
+                return [date(2021, 6, 1).toordinal()], [10.0]
+
+        portafolios = [
+            Portafolio(
+                actives=[Stock(name="New", symbol="NEW", price_handler=ShortHistory)]
+            ),
+            Portafolio(),
+            self.portafolios[0],
+        ]
+        result = batch_returns(portafolios, (date(2021, 1, 1), date(2022, 1, 1)))
+        self.assertTrue(math.isnan(result.overall[0]))
+        self.assertTrue(math.isnan(result.annualized[0]))
+        self.assertEqual(result.overall[1], 0.0)
+        self.assertFalse(math.isnan(result.overall[2]))
+
+    def test_periods_validation(self):
+        with self.assertRaises(ValueError):
+            batch_returns(self.portafolios, self.periods[:2])
+        with self.assertRaises(ValueError):
+            batch_returns(self.portafolios[:1], [(date(2022, 1, 1), date(2021, 1, 1))])
+
+
+if __name__ == "__main__":
+    unittest.main()
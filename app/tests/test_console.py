@@ -0,0 +1,27 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from console import DEBUG, INFO, console, logger_from_env
+
+
+class TestLoggerFromEnv(unittest.TestCase):
+    def setUp(self):
+        console_file = console.file
+        console.file = io.StringIO()
+        self.addCleanup(setattr, console, "file", console_file)
+
+    def test_level_from_env(self):
+        with mock.patch.dict(os.environ, {"FINTUAL_LOG_LEVEL": "DEBUG"}):
+            self.assertEqual(logger_from_env().level, DEBUG)
+
+    def test_unknown_level_falls_back_to_info(self):
+        with mock.patch.dict(os.environ, {"FINTUAL_LOG_LEVEL": "verbose"}):
+            logger = logger_from_env()
+        self.assertEqual(logger.level, INFO)
+        self.assertIn("verbose", console.file.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
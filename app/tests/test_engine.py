@@ -0,0 +1,140 @@
+import math
+import unittest
+from array import array
+from datetime import date, timedelta
+
+import numpy as np
+
+from analytics.engine import PriceMatrix
+from actives.stock import Stock
+from portafolio import Portafolio
+from price_handler.tester_handler import TestPriceHandler
+
+
+class LateHandler(TestPriceHandler):
+    """Test prices starting on Tuesday 2022-01-11."""
+
+    first_date = date(2022, 1, 11)
+
+    @classmethod
+    def get_active_price_series(cls, symbol, from_date=None, to_date=None, **kwargs):
+        dates, prices = super().get_active_price_series(
+            symbol, from_date, to_date, **kwargs
+        )
+        if kwargs.get("dates") is not None:
+            return dates, [
+                p if d >= cls.first_date else None for d, p in zip(dates, prices)
+            ]
+        return (
+            [d for d in dates if d >= cls.first_date],
+            [p for d, p in zip(dates, prices) if d >= cls.first_date],
+        )
+
+
+class TestPriceMatrix(unittest.TestCase):
+    def test_align_series_with_gaps(self):
+        matrix = PriceMatrix.from_series(
+            [
+                ([date(2022, 1, 3), date(2022, 1, 5)], [10.0, 12.0]),
+                ([date(2022, 1, 4), date(2022, 1, 5)], [20.0, None]),
+                ([], []),
+            ],
+            quantities=[1, 1, 0],
+        )
+        np.testing.assert_array_equal(
+            matrix.dates,
+            np.array(["2022-01-03", "2022-01-04", "2022-01-05"], dtype="datetime64[D]"),
+        )
+        # no price before the first one of an active: the date isn't valued
+        np.testing.assert_array_equal(
+            matrix.prices, [[10.0, 0.0, 0.0], [10.0, 20.0, 0.0], [12.0, 20.0, 0.0]]
+        )
+        np.testing.assert_array_equal(matrix.values(), [np.nan, 30.0, 32.0])
+        self.assertTrue(math.isnan(matrix.overall_return()))
+
+        held = PriceMatrix(matrix.ordinals[1:], matrix.prices[1:], matrix.quantities)
+        self.assertAlmostEqual(held.overall_return(), 2 / 30)
+        self.assertAlmostEqual(held.annualized_return(), (1 + 2 / 30) ** 365 - 1)
+
+    def test_align_ordinal_arrays(self):
+        d1, d2, d3 = (date(2022, 1, i).toordinal() for i in (3, 4, 5))
+        same = PriceMatrix.from_series(
+            [
+                (array("l", [d1, d3]), array("d", [10.0, 12.0])),
+                (np.array([d1, d3]), np.array([20.0, float("nan")])),
+            ]
+        )
+        np.testing.assert_array_equal(same.ordinals, [d1, d3])
+        np.testing.assert_array_equal(same.prices, [[10.0, 20.0], [12.0, 20.0]])
+
+        mixed = PriceMatrix.from_series(
+            [
+                (array("l", [d1, d3]), array("d", [10.0, 12.0])),
+                ([date(2022, 1, 4)], [20.0]),
+            ]
+        )
+        np.testing.assert_array_equal(mixed.ordinals, [d1, d2, d3])
+        np.testing.assert_array_equal(
+            mixed.prices, [[10.0, 0.0], [10.0, 20.0], [12.0, 20.0]]
+        )
+
+    def test_matches_portafolio_returns(self):
+        my_portafolio = Portafolio(
+            actives=[Stock(name=f"Stock {i}", symbol=f"S{i}") for i in range(20)]
+        )
+        from_date, to_date = date(2002, 4, 12), date(2022, 4, 12)
+        matrix = my_portafolio.price_matrix(from_date, to_date)
+
+        self.assertEqual(matrix.prices.shape, ((to_date - from_date).days + 1, 20))
+        self.assertTrue(
+            math.isclose(
+                matrix.overall_return(),
+                my_portafolio.overall_return(from_date, to_date),
+            )
+        )
+        self.assertTrue(
+            math.isclose(
+                matrix.annualized_return(), my_portafolio.profit(from_date, to_date)
+            )
+        )
+
+
+class TestPricesStartingLater(unittest.TestCase):
+    def setUp(self):
+        self.portafolio = Portafolio(
+            actives=[
+                Stock(name="Apple", symbol="AAPL"),
+                Stock(name="Microsoft", symbol="MSFT", price_handler=LateHandler),
+            ]
+        )
+
+    def test_not_valued_before_the_first_price(self):
+        matrix = self.portafolio.price_matrix(date(2022, 1, 7), date(2022, 1, 12))
+        self.assertEqual(matrix.priced_from(), 4)
+        self.assertTrue(np.isnan(matrix.values()[:4]).all())
+
+    def test_metrics_fail_as_overall_return(self):
+        with self.assertRaises(ValueError):
+            self.portafolio.overall_return(date(2022, 1, 7), date(2022, 1, 12))
+        with self.assertRaises(ValueError):
+            self.portafolio.metrics(date(2022, 1, 7), date(2022, 1, 12))
+
+    def test_rolling_windows_before_the_first_price_are_invalid(self):
+        rolling = self.portafolio.rolling_returns(
+            date(2022, 1, 12), date(2022, 1, 20), window_days=5
+        )
+        starts = [date.fromordinal(int(o)) for o in rolling.start_ordinals]
+        for start, overall, annualized in zip(
+            starts, rolling.overall, rolling.annualized
+        ):
+            if start < LateHandler.first_date:
+                self.assertTrue(math.isnan(overall) and math.isnan(annualized))
+            else:
+                end = start + timedelta(days=5)
+                self.assertAlmostEqual(
+                    overall, self.portafolio.overall_return(start, end)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import gzip
+import math
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from actives.crypto import Crypto
+from actives.stock import Stock
+from portafolio import Portafolio
+from price_handler import file_handler
+from price_handler.file_handler import FilePriceHandler, PriceStore
+
+DUMP = """symbol,date,type,open,close
+AAPL,2022-04-08,stock,170.0,170.09
+aapl,2022-04-11,stock,168.7,168.0
+MSFT,2022-04-11,,,285.26
+AAPL,2022-04-08,stock,170.0,170.1
+BTC,2022-04-09,crypto,42000.0,42500.0
+"""
+
+
+class TestFilePriceHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        with open(os.path.join(self.tmp_dir.name, "universe.csv"), "w") as f:
+            f.write(DUMP)
+        # a single symbol dump, named after its symbol
+        with gzip.open(os.path.join(self.tmp_dir.name, "googl.csv.gz"), "wt") as f:
+            f.write("date,close\n2022-04-08,2600.0\n2022-04-11,2550.0\n")
+
+        class LocalFiles(FilePriceHandler):
+            paths = (self.tmp_dir.name,)
+
+        self.handler = LocalFiles
+
+    def test_load_indexes_every_active(self):
+        store = self.handler.get_store()
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.rows, 6)
+        self.assertEqual(store.series("googl").latest_date, date(2022, 4, 11))
+        self.assertIsNone(store.series("BTC"))
+        self.assertEqual(len(store.series("BTC", "crypto")), 1)
+
+    def test_lookups_do_not_read_files(self):
+        self.handler.get_store()
+        with mock.patch.object(
+            file_handler, "_open_text", side_effect=AssertionError("no I/O")
+        ):
+            # a weekend resolves to the previous market day
+            price = self.handler.get_active_price_by_date("AAPL", date(2022, 4, 10))
+            dates, prices = self.handler.get_active_price_series(
+                "AAPL", from_date=date(2022, 4, 1), to_date=date(2022, 4, 30)
+            )
+            ordinals, closes = self.handler.get_active_price_arrays(
+                "MSFT", date(2022, 4, 1), date(2022, 4, 30)
+            )
+        # the last row of a repeated date wins
+        self.assertEqual(price, 170.1)
+        self.assertEqual(dates, [date(2022, 4, 8), date(2022, 4, 11)])
+        self.assertEqual(prices, [170.1, 168.0])
+        self.assertEqual(list(ordinals), [date(2022, 4, 11).toordinal()])
+        self.assertEqual(list(closes), [285.26])
+
+    def test_missing_active_or_value(self):
+        self.assertIsNone(
+            self.handler.get_active_price_by_date("TSLA", date(2022, 4, 8))
+        )
+        self.assertIsNone(
+            self.handler.get_active_price_by_date("AAPL", date(2022, 4, 1))
+        )
+        self.assertIsNone(
+            self.handler.get_active_price_by_date("MSFT", date(2022, 4, 11), "open")
+        )
+        _, prices = self.handler.get_active_price_arrays(
+            "AAPL", date(2022, 4, 1), date(2022, 4, 30), value="volume"
+        )
+        self.assertTrue(all(math.isnan(price) for price in prices))
+
+    def test_portafolio_with_file_prices(self):
+        portafolio = Portafolio(
+            actives=[
+                Stock(name="Apple", symbol="AAPL", price_handler=self.handler),
+                Crypto(name="Bitcoin", symbol="BTC", price_handler=self.handler),
+            ]
+        )
+        overall = portafolio.overall_return(date(2022, 4, 9), date(2022, 4, 12))
+        self.assertAlmostEqual(overall, (168.0 + 42500.0) / (170.1 + 42500.0) - 1)
+
+    def test_quoted_csv(self):
+        path = os.path.join(self.tmp_dir.name, "quoted.csv")
+        with open(path, "w") as f:
+            f.write('symbol,date,close\n"BRK.B","2022-04-08","330.5"\n\n')
+        store = PriceStore.load_csv([path])
+        self.assertEqual(list(store.series("BRK.B").columns["close"]), [330.5])
+
+    def test_missing_date_column(self):
+        path = os.path.join(self.tmp_dir.name, "wrong.csv")
+        with open(path, "w") as f:
+            f.write("symbol,close\nAAPL,1.0\n")
+        with self.assertRaises(ValueError):
+            PriceStore.load_csv([path])
+
+
+if __name__ == "__main__":
+    unittest.main()
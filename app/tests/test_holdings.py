@@ -0,0 +1,76 @@
+import math
+import tracemalloc
+import unittest
+from datetime import date
+
+from actives.crypto import Crypto
+from actives.holdings import Holdings
+from actives.stock import Stock
+from portafolio import Portafolio
+
+
+class TestHoldings(unittest.TestCase):
+    def setUp(self):
+        self.actives = [
+            Stock(name="Apple", symbol="AAPL"),
+            Crypto(name="Ethereum", symbol="ETH"),
+            Stock(name="Apple", symbol="aapl"),
+        ]
+
+    def test_positions_are_built_on_read(self):
+        holdings = Holdings(self.actives)
+        holdings.add("Tesla", "TSLA", Stock, quantity=0.5)
+
+        self.assertEqual(len(holdings), 4)
+        self.assertEqual(list(holdings)[:3], self.actives)
+        self.assertEqual(holdings[3], Stock(name="Tesla", symbol="TSLA"))
+        self.assertEqual(holdings.quantities.tolist(), [1.0, 1.0, 1.0, 0.5])
+
+    def test_instruments(self):
+        holdings = Holdings(self.actives)
+        holdings.append(Crypto(name="Ethereum", symbol="ETH"), quantity=2.5)
+        actives, quantities = holdings.instruments()
+        self.assertEqual([a.symbol for a in actives], ["AAPL", "ETH"])
+        self.assertEqual(quantities, [2.0, 3.5])
+
+    def test_portafolio_returns(self):
+        from_date, to_date = date(2020, 2, 1), date(2022, 2, 1)
+        listed = Portafolio(actives=list(self.actives))
+        compact = Portafolio(actives=Holdings())
+        for active in self.actives:
+            compact.add_active(active)
+
+        self.assertTrue(
+            math.isclose(
+                compact.overall_return(from_date, to_date),
+                listed.overall_return(from_date, to_date),
+            )
+        )
+        self.assertTrue(
+            math.isclose(
+                compact.profit(from_date, to_date), listed.profit(from_date, to_date)
+            )
+        )
+        self.assertEqual(compact.price_matrix(from_date, to_date).prices.shape[1], 2)
+
+    def test_memory_per_position(self):
+        symbols = [f"S{i % 500}" for i in range(20000)]
+
+        tracemalloc.start()
+        holdings = Holdings()
+        for symbol in symbols:
+            holdings.add(symbol, symbol)
+        compact, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        actives = [Stock(name=symbol, symbol=symbol) for symbol in symbols]
+        listed, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(len(holdings), len(actives))
+        self.assertLess(compact, listed / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
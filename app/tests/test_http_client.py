@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import requests
+
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.http_client import HttpClient
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage, market_days
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.client = HttpClient(pool_maxsize=2)
+        self.addCleanup(self.client.close)
+
+    def _url(self, symbol: str) -> str:
+        return f"{self.fake.base_url}query?function=TIME_SERIES_DAILY&symbol={symbol}"
+
+    def test_reuses_connection(self):
+        for symbol in ("AAPL", "MSFT", "AAPL"):
+            with self.client.get(self._url(symbol)) as response:
+                self.assertTrue(response.ok)
+                self.assertIn("Time Series (Daily)", response.json())
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertEqual(self.fake.connections, 1)
+
+    def test_asks_for_compressed_responses(self):
+        self.assertIn("gzip", self.client.session.headers["Accept-Encoding"])
+
+    def test_injected_session_keeps_its_adapters(self):
+        session = requests.Session()
+        adapter = session.get_adapter("https://")
+        client = HttpClient(pool_maxsize=2, session=session)
+        self.addCleanup(client.close)
+        self.assertIs(client.session.get_adapter("https://"), adapter)
+
+    def test_timeout(self):
+        self.fake.latency = 0.5
+        client = HttpClient(timeout=(1.0, 0.05))
+        self.addCleanup(client.close)
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.get(self._url("AAPL"))
+
+
+class TestAlphavantageHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.client = HttpClient(pool_maxsize=1)
+        self.addCleanup(self.client.close)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+            http_client = self.client
+
+        self.handler = LocalAlphavantage
+
+    def test_requests_through_injected_client(self):
+        obs_date = market_days(date.today(), 10)[-1]
+        for symbol in ("AAPL", "MSFT", "TSLA"):
+            price = self.handler.get_active_price_by_date(symbol, obs_date=obs_date)
+            self.assertIsNotNone(price)
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertEqual(self.fake.connections, 1)
+        self.assertIs(self.handler.get_http_client(), self.client)
+
+    def test_retries_transport_errors(self):
+        self.handler.transport_retry_backoff = 0.01
+        client = HttpClient(timeout=(1.0, 0.05))
+        self.addCleanup(client.close)
+        self.handler.http_client = client
+        self.fake.latency = 0.2
+        with mock.patch.object(client, "get", wraps=client.get) as get:
+            with self.assertRaises(ValueError):
+                self.handler.get_active_price_by_date("AAPL", obs_date=date.today())
+        self.assertEqual(get.call_count, self.handler.max_retries + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import unittest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cumulative import time budget (microseconds) of the entry points, with
+# room for slow machines. Most of it is numpy.
+IMPORT_BUDGET_US = 500_000
+# heavy modules imported on first use only
+LAZY_MODULES = ("rich", "requests")
+
+
+def import_times(module: str, code: str = "") -> dict:
+    """Cumulative import time (microseconds) of every module imported by
+    `import module` (and running `code` after it) in a new interpreter
+    (`python -X importtime`), with the 'quiet' log level."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import os, {module}\n{code}"],
+        cwd=APP_DIR,
+        env=dict(os.environ, FINTUAL_LOG_LEVEL="quiet"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_points_do_not_import_lazy_modules(self):
+        for module in ("main", "portafolio", "price_handler.alphavantage_wrapper"):
+            with self.subTest(module=module):
+                times = import_times(module)
+                imported = {name.split(".")[0] for name in times}
+                self.assertFalse(imported & set(LAZY_MODULES))
+                self.assertLess(times[module], IMPORT_BUDGET_US)
+
+    def test_quiet_command_does_not_import_lazy_modules(self):
+        code = "main.main(['examples/portafolios.json', '--output', os.devnull])"
+        imported = {name.split(".")[0] for name in import_times("main", code)}
+        self.assertFalse(imported & set(LAZY_MODULES))
+
+    def test_console_is_created_on_first_use(self):
+        code = (
+            "import sys, console; assert 'rich' not in sys.modules;"
+            " console.console.file; assert 'rich' in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from actives.stock import Stock
+from instrumentation import Histogram, Instruments, instruments
+from portafolio import Portafolio
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage
+
+
+class TestInstruments(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        registry = Instruments()
+        registry.incr("requests")
+        registry.observe("request_seconds", 0.1)
+        with registry.timed("block_seconds"):
+            pass
+        self.assertEqual(registry.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_counters_and_ratio(self):
+        registry = Instruments(enabled=True)
+        registry.incr("hits", 3)
+        registry.incr("misses")
+        self.assertEqual(registry.counter("hits"), 3)
+        self.assertEqual(registry.ratio("hits", "misses"), 0.75)
+        self.assertIsNone(registry.ratio("other_hits", "other_misses"))
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        for seconds in [0.001] * 90 + [0.5] * 10:
+            histogram.observe(seconds)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["p50"], 0.001)
+        self.assertEqual(snapshot["p99"], 0.5)
+        self.assertEqual(snapshot["buckets"], {"0.001": 90, "0.5": 10})
+
+    def test_timed_decorator(self):
+        registry = Instruments(enabled=True)
+
+        @registry.timed("call_seconds")
+        def call():
+            return 1
+
+        self.assertEqual(call() + call(), 2)
+        self.assertEqual(registry.snapshot()["histograms"]["call_seconds"]["count"], 2)
+
+    def test_dump(self):
+        registry = Instruments(enabled=True)
+        registry.incr("requests")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "metrics.json")
+            registry.dump(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], {"requests": 1})
+
+
+class TestInstrumentedHandler(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage(end_date=date(2022, 4, 8)).__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+        patcher = mock.patch.object(instruments, "enabled", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        instruments.reset()
+        self.addCleanup(instruments.reset)
+
+    def test_requests_bytes_and_cache_hits(self):
+        for _ in range(3):
+            self.handler.get_active_price_by_date("AAPL", obs_date=date(2022, 4, 7))
+
+        self.assertEqual(instruments.counter("alphavantage.requests"), 1)
+        self.assertGreater(instruments.counter("alphavantage.bytes"), 0)
+        self.assertEqual(
+            instruments.ratio("alphavantage.cache_hits", "alphavantage.cache_misses"),
+            2 / 3,
+        )
+        histograms = instruments.snapshot()["histograms"]
+        self.assertEqual(histograms["alphavantage.request_seconds"]["count"], 1)
+
+    def test_overall_return_latency(self):
+        portafolio = Portafolio(
+            actives=[Stock(name="Apple", symbol="AAPL", price_handler=self.handler)]
+        )
+        portafolio.overall_return(date(2022, 3, 1), date(2022, 4, 7))
+
+        histograms = instruments.snapshot()["histograms"]
+        self.assertEqual(histograms["portafolio.overall_return_seconds"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from console import console
+from instrumentation import instruments
+from main import (
+    _evaluated,
+    _init_worker,
+    _max_workers,
+    parse_args,
+    read_requests,
+    run,
+)
+from price_handler.alphavantage_wrapper import Alphavantage
+
+PORTAFOLIOS = [
+    {
+        "name": "Risky Steve",
+        "from_date": "2021-04-12",
+        "to_date": "2022-04-12",
+        "actives": [{"symbol": "AAPL", "quantity": 2}, "MSFT"],
+    },
+    {
+        "name": "Crypto Carla",
+        "from_date": "2021-04-12",
+        "to_date": "2022-04-12",
+        "actives": [{"symbol": "BTC", "type": "crypto"}],
+    },
+]
+
+CSV = """portafolio,symbol,type,quantity,from_date,to_date
+Risky Steve,AAPL,stock,2,2021-04-12,2022-04-12
+Risky Steve,MSFT,,,2021-04-12,2022-04-12
+Crypto Carla,BTC,crypto,1,2021-04-12,2022-04-12
+"""
+
+
+class TestReadRequests(unittest.TestCase):
+    def test_json_list_ndjson_and_csv_are_equal(self):
+        from_json = list(read_requests(io.StringIO(json.dumps(PORTAFOLIOS))))
+        from_ndjson = list(
+            read_requests(io.StringIO("\n".join(map(json.dumps, PORTAFOLIOS))))
+        )
+        from_csv = list(read_requests(io.StringIO(CSV)))
+        self.assertEqual(from_json, from_ndjson)
+        self.assertEqual(from_json, from_csv)
+
+        self.assertEqual(from_json[0]["from_date"], date(2021, 4, 12))
+        self.assertEqual(
+            from_json[0]["actives"],
+            [("AAPL", "AAPL", "stock", 2.0), ("MSFT", "MSFT", "stock", 1.0)],
+        )
+
+    def test_invalid_portafolio_is_an_error(self):
+        portafolio = dict(PORTAFOLIOS[0], from_date="12/04/2021")
+        requests = list(read_requests(io.StringIO(json.dumps(portafolio))))
+        self.assertEqual(requests[0]["name"], "Risky Steve")
+        self.assertIn("invalid date", requests[0]["error"])
+
+
+class TestWorkers(unittest.TestCase):
+    def test_rate_limits_are_split_without_going_over(self):
+        self.assertEqual(_max_workers("test", 8), 8)
+        self.assertEqual(_max_workers("alphavantage", 8), 5)
+
+        self.addCleanup(setattr, console, "file", console.file)
+        rate_limiter = Alphavantage.rate_limiter
+        self.addCleanup(setattr, Alphavantage, "rate_limiter", rate_limiter)
+        _init_worker("alphavantage", None, 2)
+        buckets = Alphavantage.rate_limiter._buckets
+        self.assertEqual([b.capacity for b in buckets], [2, 250])
+
+    def test_input_is_read_as_results_are_taken(self):
+        class Pool:
+            def apply_async(self, func, args, callback, error_callback):
+                callback(func(*args))
+
+        read = []
+
+        def requests():
+            for i in range(10):
+                read.append(i)
+                yield i
+
+        results = _evaluated(Pool(), lambda i: i * 2, requests(), max_in_flight=3)
+        self.assertEqual(next(results), 0)
+        self.assertEqual(read, [0, 1, 2])
+        self.assertEqual(list(results), [i * 2 for i in range(1, 10)])
+
+
+class TestRun(unittest.TestCase):
+    def setUp(self):
+        console_file = console.file
+        self.addCleanup(setattr, console, "file", console_file)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _input(self, portafolios) -> str:
+        path = os.path.join(self.tmp_dir.name, "portafolios.json")
+        with open(path, "w") as f:
+            json.dump(portafolios, f)
+        return path
+
+    def _run(self, *argv):
+        out = io.StringIO()
+        status = run(parse_args(list(argv)), out)
+        return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_results_of_every_portafolio(self):
+        status, results = self._run(self._input(PORTAFOLIOS))
+        self.assertEqual(status, 0)
+        self.assertEqual([r["name"] for r in results], ["Risky Steve", "Crypto Carla"])
+        self.assertTrue(all("overall_return" in r for r in results))
+
+    def test_workers_give_the_same_results(self):
+        path = self._input(PORTAFOLIOS * 5)
+        _, serial = self._run(path)
+        status, parallel = self._run(path, "--workers", "2")
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(parallel, key=lambda r: r["index"]), serial)
+
+    def test_metrics_of_the_workers_are_collected(self):
+        instruments.reset()
+        self.addCleanup(instruments.reset)
+        with mock.patch.object(instruments, "enabled", True):
+            self._run(self._input(PORTAFOLIOS * 3), "--workers", "2")
+        histograms = instruments.snapshot()["histograms"]
+        self.assertEqual(histograms["portafolio.overall_return_seconds"]["count"], 6)
+
+    def test_failed_portafolio_sets_exit_status(self):
+        wrong = dict(PORTAFOLIOS[0], from_date="2023-01-01")
+        status, results = self._run(self._input([wrong, PORTAFOLIOS[1]]))
+        self.assertEqual(status, 1)
+        self.assertIn("error", results[0])
+        self.assertIn("overall_return", results[1])
+
+    def test_invalid_portafolio_does_not_stop_the_others(self):
+        wrong = dict(PORTAFOLIOS[0], name="Wrong", to_date="2022-13-01")
+        path = self._input([PORTAFOLIOS[0], wrong, PORTAFOLIOS[1]])
+        for workers in ("1", "2"):
+            status, results = self._run(path, "--workers", workers)
+            results.sort(key=lambda r: r["index"])
+            self.assertEqual(status, 1)
+            self.assertEqual([r["index"] for r in results], [0, 1, 2])
+            self.assertEqual(results[1]["name"], "Wrong")
+            self.assertIn("error", results[1])
+            self.assertIn("overall_return", results[2])
+
+    def test_unreadable_input_sets_exit_status(self):
+        path = os.path.join(self.tmp_dir.name, "portafolios.json")
+        with open(path, "w") as f:
+            f.write("{not json")
+        status, results = self._run(path)
+        self.assertEqual(status, 2)
+        self.assertEqual(results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
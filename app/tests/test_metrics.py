@@ -0,0 +1,101 @@
+import math
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from actives.stock import Stock
+from analytics.metrics import compute_metrics
+from portafolio import Portafolio
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage
+
+
+class TestComputeMetrics(unittest.TestCase):
+    def test_known_series(self):
+        values = np.array([100.0, 110.0, 99.0, 121.0])
+        ordinals = np.arange(4) + date(2022, 1, 3).toordinal()
+        metrics = compute_metrics(values, ordinals, periods_per_year=252)
+
+        returns = np.array([0.1, -0.1, 121 / 99 - 1])
+        self.assertAlmostEqual(metrics.overall_return, 0.21)
+        self.assertAlmostEqual(metrics.annualized_return, 1.21 ** (365 / 3) - 1)
+        self.assertAlmostEqual(metrics.daily_annualized_return, 1.21 ** (252 / 3) - 1)
+        self.assertAlmostEqual(
+            metrics.volatility, np.std(returns, ddof=1) * math.sqrt(252)
+        )
+        self.assertAlmostEqual(
+            metrics.sharpe_ratio,
+            returns.mean() / np.std(returns, ddof=1) * math.sqrt(252),
+        )
+        self.assertAlmostEqual(metrics.max_drawdown, -0.1)
+        self.assertEqual((metrics.days, metrics.observations), (3, 4))
+
+    def test_observed_periods_per_year(self):
+        # market days only: 5 values a week
+        ordinals = np.array(
+            [d.toordinal() for d in (date(2022, 1, 3 + i) for i in range(5))]
+            + [date(2022, 1, 10).toordinal()]
+        )
+        metrics = compute_metrics(np.linspace(1, 2, 6), ordinals)
+        self.assertAlmostEqual(metrics.periods_per_year, 5 * 365.25 / 7)
+
+    def test_undefined_metrics(self):
+        metrics = compute_metrics(np.array([10.0]), np.array([1]))
+        self.assertEqual(metrics.overall_return, 0.0)
+        self.assertTrue(math.isnan(metrics.volatility))
+
+
+class TestPortafolioMetrics(unittest.TestCase):
+    def test_matches_portafolio_returns(self):
+        my_portafolio = Portafolio(
+            actives=[Stock(name=f"Stock {i}", symbol=f"S{i}") for i in range(5)]
+        )
+        from_date, to_date = date(2021, 6, 1), date(2022, 2, 1)
+        metrics = my_portafolio.metrics(from_date, to_date)
+        self.assertTrue(
+            math.isclose(
+                metrics.overall_return,
+                my_portafolio.overall_return(from_date, to_date),
+            )
+        )
+        self.assertTrue(
+            math.isclose(
+                metrics.annualized_return, my_portafolio.profit(from_date, to_date)
+            )
+        )
+        self.assertLessEqual(metrics.max_drawdown, 0.0)
+        self.assertGreater(metrics.volatility, 0.0)
+
+    def test_non_market_from_date_as_overall_return(self):
+        fake = FakeAlphavantage(end_date=date(2022, 4, 8)).__enter__()
+        self.addCleanup(fake.__exit__)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = fake.base_url
+            data_dir = tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        my_portafolio = Portafolio(
+            actives=[
+                Stock(name="Apple", symbol="AAPL", price_handler=LocalAlphavantage)
+            ]
+        )
+        # Saturday: valued at the prices of Friday 2022-01-07
+        from_date, to_date = date(2022, 1, 8), date(2022, 1, 12)
+        metrics = my_portafolio.metrics(from_date, to_date)
+        self.assertAlmostEqual(
+            metrics.overall_return, my_portafolio.overall_return(from_date, to_date)
+        )
+        self.assertAlmostEqual(
+            metrics.annualized_return, my_portafolio.profit(from_date, to_date)
+        )
+        self.assertEqual(metrics.days, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
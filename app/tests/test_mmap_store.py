@@ -0,0 +1,138 @@
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from price_handler.mmap_store import open_series, write_series
+from price_handler.price_cache import PriceCache, shard
+from price_handler.series import PriceSeries
+
+
+class TestMmapStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "stock", "AAPL.bin")
+        self.series = PriceSeries.from_time_series(
+            {
+                "2022-04-12": {"4. close": "3", "5. volume": "100"},
+                "2022-04-11": {"4. close": "2"},
+                "2022-04-08": {"4. close": "1", "5. volume": "300"},
+            }
+        )
+
+    def test_round_trip(self):
+        write_series(self.path, self.series, {"full": True})
+        series, meta = open_series(self.path)
+
+        self.assertEqual(meta, {"full": True})
+        self.assertEqual(series.latest_date, date(2022, 4, 12))
+        self.assertEqual(series.ordinals.tolist(), self.series.ordinals.tolist())
+        self.assertEqual(series.columns["4. close"].tolist(), [1.0, 2.0, 3.0])
+        self.assertTrue(math.isnan(series.columns["5. volume"][1]))
+        self.assertEqual(series.asof(date(2022, 4, 10)), 0)
+
+    def test_columns_are_read_only_views(self):
+        write_series(self.path, self.series)
+        series, _ = open_series(self.path)
+        self.assertIsInstance(series.columns["4. close"], memoryview)
+        with self.assertRaises(TypeError):
+            series.columns["4. close"][0] = 10.0
+
+    def test_empty_series(self):
+        write_series(self.path, PriceSeries.from_columns([], {}))
+        series, _ = open_series(self.path)
+        self.assertEqual(len(series), 0)
+
+    def test_missing_or_foreign_file(self):
+        self.assertIsNone(open_series(self.path))
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{}")
+        self.assertIsNone(open_series(self.path))
+
+
+class TestPriceCacheFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_reads_json_cache_and_moves_it_to_columnar_files(self):
+        os.makedirs(os.path.join(self.tmp_dir.name, "stock"))
+        with open(os.path.join(self.tmp_dir.name, "stock", "AAPL.json"), "w") as f:
+            json.dump(
+                {
+                    "full": True,
+                    "dates": [date(2022, 4, 8).toordinal()],
+                    "columns": {"4. close": [1.0]},
+                },
+                f,
+            )
+        cache = PriceCache(self.tmp_dir.name)
+        cached = cache.get("AAPL", "stock")
+        self.assertTrue(cached.full)
+        self.assertEqual(cached.series.latest_date, date(2022, 4, 8))
+
+        merged = cache.merge(
+            "AAPL",
+            "stock",
+            PriceSeries.from_time_series({"2022-04-11": {"4. close": "2"}}),
+        )
+        self.assertIsInstance(merged.series.ordinals, memoryview)
+        reloaded = PriceCache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertTrue(reloaded.full)
+        self.assertEqual(reloaded.series.columns["4. close"].tolist(), [1.0, 2.0])
+
+    def test_files_are_sharded_and_unsharded_files_are_read(self):
+        series = PriceSeries.from_time_series({"2022-04-08": {"4. close": "1"}})
+        write_series(os.path.join(self.tmp_dir.name, "stock", "AAPL.bin"), series)
+        cache = PriceCache(self.tmp_dir.name)
+        self.assertEqual(
+            cache.get("AAPL", "stock").series.latest_date, date(2022, 4, 8)
+        )
+
+        cache.merge("AAPL", "stock", series)
+        path = os.path.join(self.tmp_dir.name, "stock", shard("AAPL"), "AAPL.bin")
+        self.assertIsNotNone(open_series(path))
+        self.assertEqual(shard("aapl"), shard("AAPL"))
+
+    def test_merge_reads_the_file_of_other_processes(self):
+        stale = PriceCache(self.tmp_dir.name)
+        stale.merge(
+            "AAPL",
+            "stock",
+            PriceSeries.from_time_series({"2022-04-08": {"4. close": "1"}}),
+        )
+        # another process merges the full history into the same file
+        PriceCache(self.tmp_dir.name).merge(
+            "AAPL",
+            "stock",
+            PriceSeries.from_time_series({"2000-01-03": {"4. close": "0.5"}}),
+            full=True,
+        )
+        merged = stale.merge(
+            "AAPL",
+            "stock",
+            PriceSeries.from_time_series({"2022-04-11": {"4. close": "2"}}),
+        )
+        self.assertTrue(merged.full)
+        self.assertEqual(merged.series.columns["4. close"].tolist(), [0.5, 1.0, 2.0])
+
+    def test_concurrent_merges_of_processes(self):
+        days = [date(2022, 1, 3 + i).isoformat() for i in range(20)]
+        with multiprocessing.Pool(4) as pool:
+            pool.starmap(_merge_day, [(self.tmp_dir.name, day) for day in days])
+        cached = PriceCache(self.tmp_dir.name).get("AAPL", "stock")
+        self.assertEqual(len(cached.series), len(days))
+
+
+def _merge_day(data_dir: str, day: str) -> None:
+    series = PriceSeries.from_time_series({day: {"4. close": "1"}})
+    PriceCache(data_dir).merge("AAPL", "stock", series)
+
+
+if __name__ == "__main__":
+    unittest.main()
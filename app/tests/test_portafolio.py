@@ -75,6 +75,33 @@ class TestPortafolio(unittest.TestCase):
         )
         self.assertAlmostEqual(r, 0.004, delta=0.01)
 
+    def test_overall_return_concurrent(self):
+        actives = [Stock(name=f"Stock {i}", symbol=f"S{i}") for i in range(50)]
+        actives.append(self.actives["cryptos"]["Ethereum"])
+        my_portafolio = Portafolio(name="Wide Steve", actives=actives)
+
+        serial = my_portafolio.overall_return(
+            from_date=date(2001, 2, 1), to_date=date(2022, 2, 1)
+        )
+        concurrent = my_portafolio.overall_return(
+            from_date=date(2001, 2, 1), to_date=date(2022, 2, 1), max_workers=8
+        )
+        self.assertEqual(serial, concurrent)
+
+        my_portafolio.max_workers = 4
+        self.assertEqual(
+            my_portafolio.profit(from_date=date(2001, 2, 1), to_date=date(2022, 2, 1)),
+            (1 + serial) ** (365 / (date(2022, 2, 1) - date(2001, 2, 1)).days) - 1,
+        )
+
     def test_profit(self):
         """test annualize return"""
-        pass
+        my_portafolio = Portafolio(actives=[self.actives["stocks"]["Apple"]])
+
+        # prices of TestPriceHandler: 2003 + 2 + 1 -> 2023 + 2 + 1
+        r = my_portafolio.profit(from_date=date(2003, 2, 1), to_date=date(2023, 2, 1))
+        self.assertAlmostEqual(r, (2026 / 2006) ** (365 / 7305) - 1)
+
+        self.assertEqual(Portafolio().profit(from_date=date(2003, 2, 1)), 0.0)
+        with self.assertRaises(ValueError):
+            my_portafolio.profit(from_date=date(2023, 2, 1), to_date=date(2003, 2, 1))
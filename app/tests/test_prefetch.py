@@ -0,0 +1,93 @@
+import gc
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+from actives.crypto import Crypto
+from actives.stock import Stock
+from portafolio import Portafolio
+from prefetch import PREFETCH_PRIORITY, PricePrefetcher
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage
+
+
+class TestPricePrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+        self.prefetcher = PricePrefetcher(history_days=60)
+
+    def _stock(self, symbol):
+        return Stock(name=symbol, symbol=symbol, price_handler=self.handler)
+
+    def test_warm_up_serves_profit_from_cache(self):
+        first = Portafolio(actives=[self._stock("AAPL"), self._stock("MSFT")])
+        second = Portafolio(actives=[self._stock("AAPL")])
+        second.buy(self._stock("TSLA"), 1, date.today() - timedelta(days=10))
+        for portafolio in (first, second):
+            self.prefetcher.register(portafolio)
+
+        summary = self.prefetcher.warm_up()
+        self.assertEqual(summary["actives"], 3)
+        self.assertEqual(summary["failed"], [])
+        self.assertEqual(len(self.fake.requests), 3)
+
+        with mock.patch.object(
+            self.handler,
+            "_request_active_quote",
+            side_effect=AssertionError("no network"),
+        ):
+            first.profit(date.today() - timedelta(days=30))
+            second.time_weighted_return(date.today() - timedelta(days=30), date.today())
+
+    def test_requests_with_low_priority(self):
+        portafolio = Portafolio(actives=[self._stock("AAPL")])
+        self.prefetcher.register(portafolio)
+        with mock.patch.object(
+            self.handler, "_request_time_series", return_value=None
+        ) as request:
+            self.prefetcher.warm_up()
+        self.assertEqual(request.call_args[0][-1], PREFETCH_PRIORITY)
+
+    def test_failures_do_not_stop_the_warm_up(self):
+        broken = Crypto(name="Broken", symbol="BRK", price_handler=self.handler)
+        portafolio = Portafolio(actives=[broken, self._stock("AAPL")])
+        self.prefetcher.register(portafolio)
+        with mock.patch.object(
+            Crypto, "price_arrays", side_effect=ValueError("API down")
+        ):
+            summary = self.prefetcher.warm_up()
+        self.assertEqual(summary["failed"], ["BRK"])
+        self.assertEqual(len(self.fake.requests), 1)
+
+    def test_forgets_collected_portafolios(self):
+        self.prefetcher.register(Portafolio(actives=[self._stock("AAPL")]))
+        gc.collect()
+        self.assertEqual(self.prefetcher.actives(), [])
+
+    def test_seconds_until_refresh(self):
+        before = datetime(2022, 4, 8, 21, 30, tzinfo=timezone.utc)
+        after = datetime(2022, 4, 8, 23, 0, tzinfo=timezone.utc)
+        self.assertEqual(self.prefetcher.seconds_until_refresh(before), 30 * 60)
+        self.assertEqual(self.prefetcher.seconds_until_refresh(after), 23 * 3600)
+
+    def test_background_warm_up(self):
+        with mock.patch.object(self.prefetcher, "warm_up") as warm_up:
+            self.prefetcher.start()
+            self.prefetcher.stop(timeout=5)
+        warm_up.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
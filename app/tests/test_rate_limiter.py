@@ -0,0 +1,81 @@
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter, TokenBucket
+from tests.fake_alphavantage import THROTTLE_NOTE, FakeAlphavantage, market_days
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_calls_wait_for_tokens(self):
+        limiter = RateLimiter(buckets=[TokenBucket(capacity=2, period=0.2)])
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        # 2 calls in burst, then 1 call every 0.1 seconds
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_waiting_calls_served_by_priority(self):
+        limiter = RateLimiter(buckets=[TokenBucket(capacity=1, period=0.3)])
+        limiter.acquire()
+        served = []
+
+        def call(priority):
+            limiter.acquire(priority)
+            served.append(priority)
+
+        threads = [threading.Thread(target=call, args=(p,)) for p in (5, 1, 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(served, [1, 3, 5])
+
+
+class TestAlphavantageThrottling(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            retry_backoff = 0.01
+            rate_limiter = RateLimiter(calls_per_minute=600)
+
+        self.handler = LocalAlphavantage
+
+    def test_retries_after_throttling_note(self):
+        self.fake.throttle_next = 2
+        obs_date = market_days(date.today(), 10)[-1]
+        price = self.handler.get_active_price_by_date("AAPL", obs_date=obs_date)
+        self.assertIsNotNone(price)
+        self.assertEqual(len(self.fake.requests), 3)
+
+    def test_throttling_notes(self):
+        self.assertTrue(self.handler._is_throttled({"Note": THROTTLE_NOTE}))
+        daily_limit = (
+            "Thank you for using Alpha Vantage! Our standard API rate limit is"
+            " 25 requests per day."
+        )
+        self.assertTrue(self.handler._is_throttled({"Information": daily_limit}))
+        premium = (
+            "Thank you for using Alpha Vantage! This is a premium endpoint."
+            " You may subscribe to any of the premium plans."
+        )
+        self.assertFalse(self.handler._is_throttled({"Information": premium}))
+
+    def test_raises_when_retries_exhausted(self):
+        self.fake.throttle_next = self.handler.max_retries + 1
+        with self.assertRaises(ValueError):
+            self.handler.get_active_price_by_date("AAPL", obs_date=date.today())
+        self.assertEqual(len(self.fake.requests), self.handler.max_retries + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
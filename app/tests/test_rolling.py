@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from actives.stock import Stock
+from analytics.rolling import rolling_returns
+from portafolio import Portafolio
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage
+
+
+class TestRollingReturns(unittest.TestCase):
+    def test_windows_start_on_previous_market_day(self):
+        # Friday 2022-01-07 is followed by Monday 2022-01-10
+        days = [date(2022, 1, 3 + i) for i in range(5)] + [
+            date(2022, 1, 10),
+            date(2022, 1, 11),
+        ]
+        ordinals = np.array([d.toordinal() for d in days])
+        values = np.array([100.0, 101.0, 102.0, 103.0, 104.0, 105.0, 106.0])
+        rolling = rolling_returns(values, ordinals, window_days=3)
+
+        # the windows ending on 01-03..01-05 start before the first date
+        self.assertEqual(list(rolling.ordinals), list(ordinals[3:]))
+        # 01-10 - 3 days is Friday 01-07; 01-11 - 3 days is Saturday 01-08
+        self.assertEqual(
+            [date.fromordinal(int(o)) for o in rolling.start_ordinals],
+            [date(2022, 1, 3), date(2022, 1, 4), date(2022, 1, 7), date(2022, 1, 7)],
+        )
+        np.testing.assert_allclose(
+            rolling.overall,
+            [103 / 100 - 1, 104 / 101 - 1, 105 / 104 - 1, 106 / 104 - 1],
+        )
+        np.testing.assert_allclose(
+            rolling.annualized, (1 + rolling.overall) ** (365 / 3) - 1
+        )
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            rolling_returns(np.ones(3), np.arange(3), window_days=0)
+
+
+class TestPortafolioRollingReturns(unittest.TestCase):
+    def test_same_as_profit_of_each_day(self):
+        portafolio = Portafolio(
+            actives=[
+                Stock(name="Apple", symbol="AAPL"),
+                Stock(name="Tesla", symbol="TSLA"),
+            ]
+        )
+        from_date, to_date = date(2021, 1, 1), date(2021, 3, 1)
+        rolling = portafolio.rolling_returns(from_date, to_date, window_days=365)
+
+        self.assertEqual(len(rolling), (to_date - from_date).days + 1)
+        for i in range(0, len(rolling), 7):
+            end = date.fromordinal(int(rolling.ordinals[i]))
+            start = end - timedelta(days=365)
+            self.assertAlmostEqual(
+                rolling.overall[i], portafolio.overall_return(start, end)
+            )
+            self.assertAlmostEqual(rolling.annualized[i], portafolio.profit(start, end))
+
+    def test_market_days_of_alphavantage(self):
+        fake = FakeAlphavantage(end_date=date(2022, 4, 8)).__enter__()
+        self.addCleanup(fake.__exit__)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = fake.base_url
+            data_dir = tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        portafolio = Portafolio(
+            actives=[
+                Stock(name="Apple", symbol="AAPL", price_handler=LocalAlphavantage)
+            ]
+        )
+        rolling = portafolio.rolling_returns(
+            date(2022, 3, 1), date(2022, 4, 8), window_days=30
+        )
+        end = date.fromordinal(int(rolling.ordinals[-1]))
+        self.assertEqual(end, date(2022, 4, 8))
+        self.assertAlmostEqual(
+            rolling.overall[-1],
+            portafolio.overall_return(end - timedelta(days=30), end),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
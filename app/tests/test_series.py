@@ -0,0 +1,98 @@
+import math
+import unittest
+from datetime import date
+
+from price_handler.series import PriceSeries, field_name
+
+
+class TestPriceSeries(unittest.TestCase):
+    def setUp(self):
+        # Friday 2022-04-08 to Tuesday 2022-04-12, without the weekend
+        self.series = PriceSeries.from_time_series(
+            {
+                "2022-04-12": {"4. close": "3"},
+                "2022-04-11": {"4. close": "2"},
+                "2022-04-08": {"4. close": "1"},
+            }
+        )
+
+    def test_dates(self):
+        self.assertEqual(len(self.series), 3)
+        self.assertEqual(self.series.first_date, date(2022, 4, 8))
+        self.assertEqual(self.series.latest_date, date(2022, 4, 12))
+        self.assertEqual(self.series.columns["4. close"].tolist(), [1.0, 2.0, 3.0])
+
+    def test_merge(self):
+        other = PriceSeries.from_time_series(
+            {
+                "2022-04-13": {"4. close": "5", "5. volume": "100"},
+                "2022-04-12": {"4. close": "4", "5. volume": "100"},
+            }
+        )
+        merged = self.series.merge(other)
+        self.assertEqual(merged.latest_date, date(2022, 4, 13))
+        self.assertEqual(merged.columns["4. close"].tolist(), [1.0, 2.0, 4.0, 5.0])
+        self.assertEqual(merged.columns["5. volume"][2:].tolist(), [100.0, 100.0])
+        self.assertTrue(math.isnan(merged.columns["5. volume"][0]))
+
+    def test_from_unsorted_columns(self):
+        series = PriceSeries.from_columns([3, 1, 2, 1], {"close": [30, 10, 20, 11]})
+        self.assertEqual(series.ordinals.tolist(), [1, 2, 3])
+        self.assertEqual(series.columns["close"].tolist(), [11.0, 20.0, 30.0])
+
+    def test_exact_lookup(self):
+        self.assertEqual(self.series.index(date(2022, 4, 11)), 1)
+        self.assertIsNone(self.series.index(date(2022, 4, 9)))
+
+    def test_asof_lookup(self):
+        self.assertEqual(self.series.asof(date(2022, 4, 10)), 0)
+        self.assertEqual(self.series.asof(date(2022, 4, 11)), 1)
+        self.assertEqual(self.series.asof(date(2030, 1, 1)), 2)
+        self.assertIsNone(self.series.asof(date(2022, 4, 7)))
+
+    def test_window(self):
+        self.assertEqual(
+            list(self.series.window(date(2022, 4, 9), date(2022, 4, 12))), [1, 2]
+        )
+        self.assertEqual(
+            list(self.series.window(date(2022, 4, 9), date(2022, 4, 10))), []
+        )
+
+
+class TestFieldResolution(unittest.TestCase):
+    CRYPTO_FIELDS = [
+        "1a. open (USD)",
+        "1b. open (USD)",
+        "4a. close (USD)",
+        "4b. close (USD)",
+        "5. volume",
+        "6. market cap (USD)",
+    ]
+
+    def _series(self, fields):
+        return PriceSeries.from_columns(
+            [1], {field: [float(i)] for i, field in enumerate(fields)}
+        )
+
+    def test_field_name(self):
+        self.assertEqual(field_name("4a. close (USD)"), "close")
+        self.assertEqual(field_name("6. market cap (USD)"), "market cap")
+        self.assertEqual(field_name("close"), "close")
+
+    def test_ambiguous_crypto_fields_are_deterministic(self):
+        for fields in (self.CRYPTO_FIELDS, self.CRYPTO_FIELDS[::-1]):
+            series = self._series(fields)
+            self.assertEqual(series.resolve("close"), "4a. close (USD)")
+            self.assertEqual(series.resolve("open"), "1a. open (USD)")
+            self.assertEqual(series.resolve("market cap"), "6. market cap (USD)")
+            self.assertEqual(series.resolve("4b. close (USD)"), "4b. close (USD)")
+            self.assertIsNone(series.resolve("dividend"))
+
+    def test_name_match_before_substring(self):
+        series = self._series(["5. adjusted close", "4. close"])
+        self.assertEqual(series.resolve("close"), "4. close")
+        self.assertEqual(list(series.column("adjusted")), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from price_handler.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = []
+
+    def _slow(self, result):
+        def fn():
+            self.calls.append(result)
+            self.release.wait(5)
+            return result
+
+        return fn
+
+    def _wait_in_flight(self, key):
+        while key not in self.flight._calls:
+            pass
+
+    def test_concurrent_calls_are_coalesced(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            first = pool.submit(self.flight.do, "AAPL", self._slow("first"))
+            self._wait_in_flight("AAPL")
+            others = [
+                pool.submit(self.flight.do, "AAPL", self._slow("other"))
+                for _ in range(7)
+            ]
+            self.release.set()
+            results = [first.result()] + [f.result() for f in others]
+
+        self.assertEqual(self.calls, ["first"])
+        self.assertEqual(results, ["first"] * 8)
+        # once finished, a new call runs again
+        self.assertEqual(self.flight.do("AAPL", lambda: "new"), "new")
+
+    def test_alternate_in_flight_serves_the_call(self):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            full = pool.submit(self.flight.do, "full", self._slow("full"))
+            self._wait_in_flight("full")
+            compact = pool.submit(
+                self.flight.do, "compact", self._slow("compact"), ("full",)
+            )
+            self.release.set()
+
+        self.assertEqual(compact.result(), full.result())
+        self.assertEqual(self.calls, ["full"])
+
+    def test_error_is_shared(self):
+        def fail():
+            self.release.wait(5)
+            raise ValueError("API down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(self.flight.do, "AAPL", fail)
+            self._wait_in_flight("AAPL")
+            second = pool.submit(self.flight.do, "AAPL", self._slow("other"))
+            self.release.set()
+
+        self.assertRaises(ValueError, first.result)
+        self.assertRaises(ValueError, second.result)
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
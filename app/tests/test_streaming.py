@@ -0,0 +1,78 @@
+import json
+import unittest
+from datetime import date
+
+from price_handler.series import PriceSeries
+from price_handler.streaming import parse_time_series
+from tests.fake_alphavantage import THROTTLE_NOTE, synthetic_response
+
+STOCK_KEY = "Time Series (Daily)"
+CRYPTO_KEY = "Time Series (Digital Currency Daily)"
+
+
+def _chunks(data: dict, size: int, indent=None):
+    body = json.dumps(data, indent=indent).encode()
+    return (body[i : i + size] for i in range(0, len(body), size))
+
+
+class TestParseTimeSeries(unittest.TestCase):
+    def test_same_series_as_json_parsing(self):
+        for active, key in (("stock", STOCK_KEY), ("crypto", CRYPTO_KEY)):
+            response = synthetic_response("ETH", active, 300, date(2022, 4, 12))
+            expected = PriceSeries.from_time_series(response[key])
+            for size, indent in ((7, None), (1000, 4), (10**6, None)):
+                series, data = parse_time_series(_chunks(response, size, indent), key)
+                self.assertIsNone(data)
+                self.assertEqual(series, expected)
+                self.assertEqual(series.latest_date, date(2022, 4, 12))
+
+    def test_response_without_time_series(self):
+        response = {"Note": THROTTLE_NOTE}
+        series, data = parse_time_series(_chunks(response, 5), STOCK_KEY)
+        self.assertIsNone(series)
+        self.assertEqual(data, response)
+
+    def test_empty_time_series(self):
+        series, data = parse_time_series(
+            _chunks({"Meta Data": {}, STOCK_KEY: {}}, 3), STOCK_KEY
+        )
+        self.assertEqual(len(series), 0)
+
+    def test_candles_with_different_fields(self):
+        response = {
+            STOCK_KEY: {
+                "2022-04-12": {"4. close": "10", "5. volume": "3"},
+                "2022-04-11": {"4. close": "9"},
+                "2022-04-08": {"1. open": "7", "4. close": "8"},
+            },
+            "Meta Data": {"1. Information": "Daily Prices"},
+        }
+        for size in (7, 40, 1000):
+            series, _ = parse_time_series(_chunks(response, size), STOCK_KEY)
+            self.assertEqual(series.first_date, date(2022, 4, 8))
+            columns = {
+                field: [value if value == value else None for value in column]
+                for field, column in series.columns.items()
+            }
+            self.assertEqual(
+                columns,
+                {
+                    "1. open": [7.0, None, None],
+                    "4. close": [8.0, 9.0, 10.0],
+                    "5. volume": [None, None, 3.0],
+                },
+            )
+
+    def test_malformed_time_series(self):
+        chunks = [b'{"Time Series (Daily)": {"2022-04-12": {"a": {"b": 1}}}}']
+        with self.assertRaises(ValueError):
+            parse_time_series(chunks, STOCK_KEY)
+
+    def test_incomplete_time_series(self):
+        body = json.dumps(synthetic_response("AAPL")).encode()
+        with self.assertRaises(ValueError):
+            parse_time_series([body[: len(body) // 2]], STOCK_KEY)
+
+
+if __name__ == "__main__":
+    unittest.main()
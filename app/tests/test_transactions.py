@@ -0,0 +1,81 @@
+import time
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from actives.crypto import Crypto
+from actives.stock import Stock
+from analytics.engine import time_weighted_return
+from portafolio import Portafolio
+
+
+class TestTimeWeightedReturn(unittest.TestCase):
+    def test_flows_are_not_profit(self):
+        # the active grows 10% a day, while units are bought and sold
+        prices = np.array([[10.0], [11.0], [12.1], [13.31]])
+        flows = np.array([[1.0], [5.0], [-3.0], [0.0]])
+        self.assertAlmostEqual(time_weighted_return(prices, flows), 0.331)
+
+    def test_period_without_holdings(self):
+        prices = np.array([[10.0], [20.0], [22.0]])
+        flows = np.array([[0.0], [2.0], [0.0]])
+        self.assertAlmostEqual(time_weighted_return(prices, flows), 0.1)
+
+
+class TestPortafolioLedger(unittest.TestCase):
+    def setUp(self):
+        self.apple = Stock(name="Apple", symbol="AAPL")
+        self.ethereum = Crypto(name="Ethereum", symbol="ETH")
+
+    def test_single_buy_matches_overall_return(self):
+        from_date, to_date = date(2022, 2, 1), date(2022, 2, 10)
+        my_portafolio = Portafolio()
+        my_portafolio.buy(self.apple, 0.5, date(2021, 1, 1))
+        self.assertAlmostEqual(
+            my_portafolio.time_weighted_return(from_date, to_date),
+            Portafolio(actives=[self.apple]).overall_return(from_date, to_date),
+        )
+
+    def test_sell_validation(self):
+        my_portafolio = Portafolio()
+        with self.assertRaises(ValueError):
+            my_portafolio.sell(self.apple, -1, date(2022, 1, 1))
+
+    def test_sell_more_than_held(self):
+        my_portafolio = Portafolio()
+        my_portafolio.buy(self.apple, 1.0, date(2022, 1, 3))
+        my_portafolio.buy(self.apple, 0.5, date(2022, 1, 10))
+        with self.assertRaises(ValueError):
+            my_portafolio.sell(self.apple, 1.2, date(2022, 1, 5))
+        with self.assertRaises(ValueError):
+            my_portafolio.sell(self.ethereum, 0.1, date(2022, 1, 5))
+
+        my_portafolio.sell(self.apple, 0.3, date(2022, 1, 5))
+        my_portafolio.sell(self.apple, 1.2, date(2022, 1, 10))
+        # an earlier sell can not leave the later holdings negative
+        with self.assertRaises(ValueError):
+            my_portafolio.sell(self.apple, 0.1, date(2022, 1, 4))
+        self.assertEqual(len(my_portafolio.ledger), 4)
+
+    def test_large_ledger(self):
+        start = time.perf_counter()
+        my_portafolio = Portafolio()
+        from_date = date(2012, 1, 1)
+        for i in range(10000):
+            active = self.apple if i % 2 else Stock(name="Apple", symbol="AAPL")
+            if i % 3:
+                active = self.ethereum
+            my_portafolio.buy(active, 0.1, from_date + timedelta(days=i % 3650))
+            if i % 4 == 3:
+                my_portafolio.sell(active, 0.01, from_date + timedelta(days=i % 3650))
+        my_portafolio.sell(self.ethereum, 1.5, date(2015, 1, 1))
+
+        r = my_portafolio.time_weighted_return(from_date, date(2022, 1, 1))
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertTrue(np.isfinite(r))
+        self.assertEqual(len(my_portafolio.ledger.instruments()[0]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from console import console
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.manifest import Manifest
+from price_handler.price_cache import shard
+from price_handler.rate_limiter import RateLimiter
+from tests.fake_alphavantage import FakeAlphavantage, market_days
+from universe import UniversePrefetcher, main, read_symbols
+
+SYMBOLS = [("AAPL", "stock"), ("MSFT", "stock"), ("BTC", "crypto")]
+
+
+class TestReadSymbols(unittest.TestCase):
+    def test_symbols_and_types(self):
+        text = "symbol,type\naapl\n\nBTC, crypto  # bitcoin\nAAPL,stock\n"
+        self.assertEqual(
+            read_symbols(io.StringIO(text)), [("AAPL", "stock"), ("BTC", "crypto")]
+        )
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            read_symbols(io.StringIO("EURUSD,forex\n"))
+
+
+class TestUniversePrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlphavantage().__enter__()
+        self.addCleanup(self.fake.__exit__)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        class LocalAlphavantage(Alphavantage):
+            base_url = self.fake.base_url
+            data_dir = self.tmp_dir.name
+            rate_limiter = RateLimiter()
+
+        self.handler = LocalAlphavantage
+
+    def test_fills_sharded_cache_and_manifest(self):
+        summary = UniversePrefetcher(self.handler, history_days=365).run(SYMBOLS)
+
+        self.assertEqual((summary["fetched"], summary["failed"]), (3, []))
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertTrue(all(q["outputsize"] == "full" for q in self.fake.requests))
+        for symbol, active in SYMBOLS:
+            path = os.path.join(
+                self.tmp_dir.name, active, shard(symbol), f"{symbol}.bin"
+            )
+            self.assertTrue(os.path.exists(path))
+
+        manifest = Manifest(self.tmp_dir.name)
+        self.assertEqual(len(manifest), 3)
+        entry = manifest.get("BTC", "crypto")
+        self.assertTrue(entry["full"])
+        self.assertEqual(
+            entry["latest_date"], market_days(date.today(), 1)[0].isoformat()
+        )
+
+    def test_resumes_without_refetching_completed_symbols(self):
+        original = self.handler.get_active_price_arrays.__func__
+
+        def crash_on_msft(cls, symbol, *args, **kwargs):
+            if symbol == "MSFT":
+                raise ValueError("Error: connection lost.")
+            return original(cls, symbol, *args, **kwargs)
+
+        with mock.patch.object(
+            self.handler, "get_active_price_arrays", classmethod(crash_on_msft)
+        ):
+            summary = UniversePrefetcher(self.handler, history_days=365).run(SYMBOLS)
+        self.assertEqual(summary["failed"], ["stock/MSFT"])
+        self.assertEqual(len(self.fake.requests), 2)
+
+        summary = UniversePrefetcher(self.handler, history_days=365).run(SYMBOLS)
+        self.assertEqual((summary["skipped"], summary["fetched"]), (2, 1))
+        self.assertEqual([q["symbol"] for q in self.fake.requests[2:]], ["MSFT"])
+
+    def test_cached_series_missing_from_manifest_is_not_refetched(self):
+        UniversePrefetcher(self.handler, history_days=365).run(SYMBOLS[:1])
+        # a crash after the series was cached, before the manifest line
+        os.remove(os.path.join(self.tmp_dir.name, "manifest.ndjson"))
+
+        summary = UniversePrefetcher(self.handler, history_days=365).run(SYMBOLS[:1])
+        self.assertEqual(summary["fetched"], 1)
+        self.assertEqual(len(self.fake.requests), 1)
+        self.assertIsNotNone(Manifest(self.tmp_dir.name).get("AAPL", "stock"))
+
+    def test_new_data_dir_without_fetched_symbols(self):
+        data_dir = os.path.join(self.tmp_dir.name, "new")
+        symbols = os.path.join(self.tmp_dir.name, "symbols.txt")
+        with open(symbols, "w") as f:
+            f.write("# no symbols yet\n")
+        self.addCleanup(setattr, console, "file", console.file)
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+            status = main([symbols, "--data-dir", data_dir])
+        self.assertEqual(status, 0)
+        self.assertEqual(json.loads(out.getvalue())["symbols"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
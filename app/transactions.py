@@ -0,0 +1,159 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from actives.abstract import Active
+from analytics.engine import to_ordinals
+
+# units below this are rounding errors of fractional quantities, not holdings
+HOLDINGS_TOLERANCE = 1e-9
+
+
+def active_key(active: Active) -> Hashable:
+    """Key identifying the instrument of an active (same prices, same key)."""
+    return (type(active), active.symbol.upper(), active.price_handler)
+
+
+@dataclass(frozen=True)
+class Transaction:
+    """Movement of an active in a portafolio.
+
+    Args:
+        active: Active bought or sold.
+        quantity: Units of the active. Positive for buys, negative for sells.
+            Can be fractional (0.123 of Tesla's stock for example).
+        transaction_date: Date of the movement. It's valued at the close
+            price of that date.
+    """
+
+    active: Active
+    quantity: float
+    transaction_date: date
+
+
+@dataclass
+class Ledger:
+    """Dated movements (buys and sells) of actives of a portafolio.
+
+    Sells are checked against the running holdings of their instrument:
+    its sorted movement date ordinals and the units held at the end of each
+    one, updated with the transactions added since the previous sell.
+    """
+
+    transactions: List[Transaction] = field(default_factory=list)
+    _held: Dict[Hashable, Tuple[List[int], np.ndarray]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _indexed: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def add(self, active: Active, quantity: float, transaction_date: date) -> None:
+        """Add a movement of `quantity` units (negative for sells)."""
+        if not isinstance(transaction_date, date):
+            raise ValueError("Error: `transaction_date` must be a date object.")
+        self.transactions.append(Transaction(active, quantity, transaction_date))
+
+    def buy(self, active: Active, quantity: float, transaction_date: date) -> None:
+        """Add a buy of `quantity` units of the active."""
+        if quantity <= 0:
+            raise ValueError("Error: `quantity` must be positive.")
+        self.add(active, quantity, transaction_date)
+
+    def sell(self, active: Active, quantity: float, transaction_date: date) -> None:
+        """Add a sell of `quantity` units of the active.
+
+        Raises:
+            ValueError: If the units held of the active would be negative on
+                any date from `transaction_date` on (short selling is not
+                supported).
+        """
+        if quantity <= 0:
+            raise ValueError("Error: `quantity` must be positive.")
+        if not isinstance(transaction_date, date):
+            raise ValueError("Error: `transaction_date` must be a date object.")
+
+        self._index()
+        ordinals, held = self._held.get(active_key(active), ([], np.zeros(0)))
+        ordinal = transaction_date.toordinal()
+        i = bisect_left(ordinals, ordinal)
+        # holdings are checked at the end of each date, as all the movements
+        # of a date are valued together.
+        held_after = held[i:]
+        if i == len(ordinals) or ordinals[i] != ordinal:
+            held_after = np.append(held_after, held[i - 1] if i else 0.0)
+        if held_after.min() - quantity < -HOLDINGS_TOLERANCE:
+            raise ValueError(
+                f"Error: can not sell {quantity} units of {active.symbol}"
+                f" on {transaction_date}, more than the units held."
+            )
+        self.add(active, -quantity, transaction_date)
+
+    def _index(self) -> None:
+        """Add the transactions not indexed yet to the running holdings."""
+        for transaction in self.transactions[self._indexed :]:
+            key = active_key(transaction.active)
+            ordinals, held = self._held.get(key, ([], np.zeros(0)))
+            ordinal = transaction.transaction_date.toordinal()
+            i = bisect_left(ordinals, ordinal)
+            if i == len(ordinals) or ordinals[i] != ordinal:
+                ordinals.insert(i, ordinal)
+                held = np.insert(held, i, held[i - 1] if i else 0.0)
+            held[i:] += transaction.quantity
+            self._held[key] = (ordinals, held)
+        self._indexed = len(self.transactions)
+
+    def instruments(self) -> Tuple[List[Active], Dict[Hashable, int]]:
+        """Distinct instruments of the ledger.
+
+        Returns:
+            List with an active of each instrument and the column index of
+            each instrument key.
+        """
+        actives, columns = [], {}
+        for transaction in self.transactions:
+            key = active_key(transaction.active)
+            if key not in columns:
+                columns[key] = len(actives)
+                actives.append(transaction.active)
+        return actives, columns
+
+    def flows_matrix(
+        self, ordinals: np.ndarray, columns: Dict[Hashable, int]
+    ) -> np.ndarray:
+        """Units moved of each instrument on each date.
+
+        Transactions are assigned to the first date of `ordinals` on or after
+        their date, so those before the first date count from the first date
+        and those on a non market day count from the next market day.
+        Transactions after the last date are ignored.
+
+        Args:
+            ordinals: Sorted date ordinals (rows).
+            columns: Column index of each instrument key.
+        Returns:
+            2-D array (dates x instruments) of moved units.
+        """
+        flows = np.zeros((len(ordinals), len(columns)))
+        if not self.transactions or not len(ordinals):
+            return flows
+        rows = np.searchsorted(
+            ordinals, to_ordinals([t.transaction_date for t in self.transactions])
+        )
+        cols = np.fromiter(
+            (columns[active_key(t.active)] for t in self.transactions),
+            dtype=np.int64,
+            count=len(self.transactions),
+        )
+        quantities = np.fromiter(
+            (t.quantity for t in self.transactions),
+            dtype=np.float64,
+            count=len(self.transactions),
+        )
+        in_range = rows < len(ordinals)
+        np.add.at(flows, (rows[in_range], cols[in_range]), quantities[in_range])
+        return flows
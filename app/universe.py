@@ -0,0 +1,175 @@
+"""Prefetch the daily history of a universe of symbols into the price cache.
+
+Reads a list of symbols (one per line, optionally followed by its active
+type: `AAPL` or `BTC,crypto`) and fetches the history of each one through
+`Alphavantage` into its cache (sharded files under `data_dir`), respecting
+the rate limits of the API. The coverage and freshness of every series is
+recorded in the manifest of the cache (`<data_dir>/manifest.ndjson`).
+
+Symbols already complete (fresh since the last market close and covering
+the history) are skipped, so a run that crashed resumes where it stopped.
+
+Run from the `./app` directory:
+    python3 universe.py symbols.txt --data-dir ./data/alphavantage/
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from console import console, logger
+from prefetch import PREFETCH_PRIORITY
+from price_handler.alphavantage_wrapper import Alphavantage
+from price_handler.manifest import Manifest
+from price_handler.price_cache import get_price_cache
+
+Symbol = Tuple[str, str]
+
+
+def read_symbols(file: TextIO) -> List[Symbol]:
+    """(SYMBOL, active type) of each line of the file, without repeated ones.
+
+    Blank lines, `#` comments and a `symbol,type` header are skipped.
+    """
+    symbols: List[Symbol] = []
+    seen = set()
+    for line in file:
+        line = line.split("#")[0].strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        symbol = fields[0].upper()
+        active = (fields[1] if len(fields) > 1 and fields[1] else "stock").lower()
+        if symbol == "SYMBOL":
+            continue
+        if active not in Alphavantage.active_types:
+            raise ValueError(f"Error: unknown active type {active!r} of {symbol}.")
+        if (symbol, active) not in seen:
+            seen.add((symbol, active))
+            symbols.append((symbol, active))
+    return symbols
+
+
+class UniversePrefetcher:
+    """Fills the price cache of a handler with the history of many symbols.
+
+    Args:
+        handler: `Alphavantage` handler (or subclass) whose cache is filled.
+        history_days: Days of history to fetch (until today).
+        max_workers: Number of threads fetching the series concurrently (they
+            share the rate limiter of the handler).
+    """
+
+    def __init__(
+        self,
+        handler: type = Alphavantage,
+        history_days: int = 20 * 365,
+        max_workers: int = 1,
+    ):
+        self.handler = handler
+        self.history_days = history_days
+        self.max_workers = max_workers
+        self.manifest = Manifest(handler.data_dir)
+
+    def is_complete(self, symbol: str, active: str, from_date: date) -> bool:
+        """Check in the manifest if the series is fresh and covers the history."""
+        entry = self.manifest.get(symbol, active)
+        if entry is None or not entry["rows"]:
+            return False
+        refreshed_at = entry["refreshed_at"]
+        return (
+            refreshed_at is not None
+            and refreshed_at >= self.handler._last_market_close(active)
+            and (entry["full"] or entry["first_date"] <= from_date.isoformat())
+        )
+
+    def run(self, symbols: Iterable[Symbol], to_date: Optional[date] = None) -> dict:
+        """Fetch the series of the symbols that are not complete yet.
+
+        Args:
+            symbols: (SYMBOL, active type) of each series.
+            to_date: Most recent date to fetch (default today).
+        Returns:
+            Summary with the amount of symbols, skipped (already complete) and
+            fetched ones, the symbols that failed and the seconds it took.
+        """
+        to_date = to_date or date.today()
+        from_date = to_date - timedelta(days=self.history_days)
+        symbols = list(symbols)
+        pending = [s for s in symbols if not self.is_complete(*s, from_date)]
+        logger.info(
+            "Prefetching %s symbols (%s already complete)",
+            len(pending),
+            len(symbols) - len(pending),
+        )
+        cache = get_price_cache(self.handler.data_dir)
+
+        def fetch(item: Tuple[int, Symbol]) -> Optional[str]:
+            i, (symbol, active) = item
+            try:
+                self.handler.get_active_price_arrays(
+                    symbol,
+                    from_date=from_date,
+                    to_date=to_date,
+                    active=active,
+                    priority=PREFETCH_PRIORITY,
+                )
+                cached = cache.get(symbol, active)
+                if cached is None or not len(cached.series):
+                    raise ValueError("Error: no prices returned.")
+                self.manifest.record(cached)
+            except Exception as e:  # keep prefetching the other symbols
+                logger.error("Error prefetching %s %s: %s", active, symbol, e)
+                return f"{active}/{symbol}"
+            logger.debug("Prefetched %s/%s: %s", i + 1, len(pending), symbol)
+            return None
+
+        start = time.perf_counter()
+        if self.max_workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                failed = list(executor.map(fetch, enumerate(pending)))
+        else:
+            failed = [fetch(item) for item in enumerate(pending)]
+        self.manifest.compact()
+        failed = [key for key in failed if key is not None]
+        return {
+            "symbols": len(symbols),
+            "skipped": len(symbols) - len(pending),
+            "fetched": len(pending) - len(failed),
+            "failed": failed,
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("symbols", help="file with a symbol per line ('-' for stdin)")
+    parser.add_argument("--data-dir", default=Alphavantage.data_dir)
+    parser.add_argument("--history-days", type=int, default=20 * 365)
+    parser.add_argument("--workers", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    console.file = sys.stderr
+    if args.symbols == "-":
+        symbols = read_symbols(sys.stdin)
+    else:
+        with open(args.symbols) as f:
+            symbols = read_symbols(f)
+
+    class Universe(Alphavantage):
+        data_dir = args.data_dir
+
+    summary = UniversePrefetcher(Universe, args.history_days, args.workers).run(symbols)
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())